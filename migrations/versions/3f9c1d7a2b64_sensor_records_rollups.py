@@ -0,0 +1,54 @@
+"""Roll up the sensor records into hourly and daily tables
+
+Revision ID: 3f9c1d7a2b64
+Revises: e6f6bac2aac8
+Create Date: 2026-10-16 21:12:04.518236
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c1d7a2b64'
+down_revision: Union[str, Sequence[str], None] = 'e6f6bac2aac8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_rollup_table(table_name: str) -> None:
+    op.create_table(
+        table_name,
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('ecosystem_uid', sa.String(length=8), nullable=False),
+        sa.Column('sensor_uid', sa.String(length=16), nullable=False),
+        sa.Column('measure', sa.String(length=16), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('min', sa.Float(precision=2), nullable=False),
+        sa.Column('max', sa.Float(precision=2), nullable=False),
+        sa.Column('mean', sa.Float(precision=2), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'ecosystem_uid', 'sensor_uid', 'measure', 'timestamp',
+            name='_uq_rollup_period'),
+    )
+
+
+def upgrade() -> None:
+    _create_rollup_table('sensor_records_hourly')
+    _create_rollup_table('sensor_records_daily')
+    op.create_table(
+        'compaction_state',
+        sa.Column('name', sa.String(length=32), nullable=False),
+        sa.Column('last_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('compaction_state')
+    op.drop_table('sensor_records_daily')
+    op.drop_table('sensor_records_hourly')
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import asyncio
-from asyncio import Future, Lock, Task, TimerHandle, CancelledError
+from asyncio import Lock, Task, CancelledError
 from contextlib import asynccontextmanager
 import enum
 from datetime import datetime, timezone
@@ -9,20 +9,28 @@ from functools import partial
 import logging
 import time
 import typing
-from typing import cast, Callable, NamedTuple, Type
+from typing import Awaitable, cast, Callable, NamedTuple, Type
 from weakref import WeakValueDictionary
 
 import gaia_validators as gv
 
 from gaia.config import default_actuators
 from gaia.hardware.abc import Actuator, DimmerMixin, SwitchMixin
+from gaia.timer_wheel import (
+    get_timer_wheel, TimerHandle as TimerWheelHandle, TimerWheel)
 
 
 if typing.TYPE_CHECKING:
-    from gaia import Ecosystem
+    from gaia import Ecosystem, Engine
     from gaia.database.models import ActuatorBuffer, ActuatorRecord
 
 
+# Time given to each actuator to apply a command, in seconds
+ACTUATOR_COMMAND_TIMEOUT = 10.0
+# Time during which actuator states are collected before being sent, in seconds
+ACTUATORS_DATA_OUTBOX_WINDOW = 0.5
+
+
 class PIDParameters(NamedTuple):
     Kp: float
     Ki: float
@@ -208,62 +216,157 @@ class HystericalPID:
 
 
 class Timer:
-    __slots__ = (
-        "_countdown",
-        "_future",
-        "_handle",
-        "_start_time",
-        "_task",
-    )
+    """A countdown calling `callback` once it expires
 
-    def __init__(self, callback: Callable, countdown: float) -> None:
-        self._start_time: float = time.monotonic()
-        self._countdown: float = 0.0
-        self._future: Future = Future()
-        self._task: Task = asyncio.create_task(self._job(callback))
-        self._handle: TimerHandle | None = None
-        self.modify_countdown(countdown)
+    The countdown is scheduled on the engine timer wheel so that all the
+    countdowns are driven by a single task.
+    """
+    __slots__ = ("_handle",)
+
+    def __init__(
+            self,
+            callback: Callable,
+            countdown: float,
+            timer_wheel: TimerWheel | None = None,
+    ) -> None:
+        timer_wheel = timer_wheel or get_timer_wheel()
+        self._handle: TimerWheelHandle = timer_wheel.call_later(countdown, callback)
 
     @property
     def done(self) -> bool:
-        return self._task.done()
+        return self._handle.done
 
     @property
     def cancelled(self) -> bool:
-        return self._task.cancelled()
-
-    async def _job(self, callback: Callable) -> None:
-        await self._future
-        if asyncio.iscoroutinefunction(callback):
-            await callback()
-        else:
-            callback()
-        self._handle = None
+        return self._handle.cancelled
 
     def cancel(self) -> None:
-        self._task.cancel()
-        if self._handle is not None:
-            self._handle.cancel()
-        self._future.cancel()
+        self._handle.cancel()
 
     def time_left(self) -> float | None:
-        if self.done or self.cancelled:
-            return None
-        return max(self._start_time + self._countdown - time.monotonic(), 0.0)
+        return self._handle.time_left()
 
     def modify_countdown(self, countdown_delta: float) -> None:
-        if self.done:
-            raise RuntimeError("The task has already been completed")
         if self.cancelled:
             raise CancelledError("The task has been canceled")
-        self._countdown += countdown_delta
-        loop = asyncio.get_running_loop()
-        if self._handle:
-            self._handle.cancel()
-        time_left = self.time_left()
-        if time_left is None or time_left <= 0.0:
-            time_left = 0.0
-        self._handle = loop.call_later(time_left, self._future.set_result, None)
+        if self.done:
+            raise RuntimeError("The task has already been completed")
+        self._handle.adjust(countdown_delta)
+
+
+async def log_actuator_record(
+        engine: Engine,
+        ecosystem_uid: str,
+        data: gv.ActuatorStateRecord,
+        db_model: Type[ActuatorRecord] | Type[ActuatorBuffer],
+) -> None:
+    values = {
+        "ecosystem_uid": ecosystem_uid,
+        "type": data.type,
+        "timestamp": data.timestamp,
+        "active": data.active,
+        "mode": data.mode,
+        "status": data.status,
+        "level": None,
+    }
+    # Write behind when possible so the control loop does not wait for the DB
+    db_writer = engine.db_writer
+    if db_writer is not None:
+        db_writer.add(db_model, **values)
+        return
+    async with engine.db.scoped_session() as session:
+        session.add(db_model(**values))
+        await session.commit()
+
+
+class ActuatorsDataOutbox:
+    """Collect the actuator states to send to Ouranos and send them together
+
+    States put in the outbox during `window` seconds are merged, keeping the
+    last state of each actuator group, and sent in a single 'actuators_data'
+    event covering all the ecosystems. A send is never cancelled: states put
+    while a send is ongoing are sent with the next one. States that could not
+    be sent are buffered in the database, if it is used.
+
+    :param engine: the engine whose event handler is used.
+    :param window: the time during which states are collected, in seconds.
+    """
+    def __init__(self, engine: Engine, window: float = ACTUATORS_DATA_OUTBOX_WINDOW) -> None:
+        self.engine: Engine = engine
+        self.window: float = window
+        self.logger = logging.getLogger("gaia.engine.actuators_outbox")
+        self._pending: dict[tuple[str, str], gv.ActuatorStateRecord] = {}
+        self._flush_lock: Lock = Lock()
+        self._flush_now: asyncio.Event = asyncio.Event()
+        self._task: Task | None = None
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"{self.__class__.__name__}(pending={len(self._pending)})"
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def put(self, ecosystem_uid: str, data: gv.ActuatorStateRecord) -> None:
+        # A newer state of the same actuator group supersedes the pending one
+        self._pending[(ecosystem_uid, data.group)] = data
+        if self._task is None:
+            self._task = asyncio.create_task(
+                self._send_pending(), name="actuators_outbox-send_pending")
+
+    async def _send_pending(self) -> None:
+        try:
+            while self._pending:
+                try:
+                    await asyncio.wait_for(self._flush_now.wait(), self.window)
+                except asyncio.TimeoutError:
+                    pass
+                self._flush_now.clear()
+                await self.flush()
+        finally:
+            self._task = None
+
+    async def flush(self) -> bool:
+        """Send all the pending states now.
+
+        :return: True if the states were sent.
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return True
+            pending, self._pending = self._pending, {}
+            records: dict[str, list[gv.ActuatorStateRecord]] = {}
+            for (ecosystem_uid, _), data in pending.items():
+                records.setdefault(ecosystem_uid, []).append(data)
+            sent: bool = False
+            try:
+                event_handler = self.engine.event_handler
+                if event_handler.is_connected():
+                    payloads = [
+                        gv.ActuatorsDataPayload(uid=ecosystem_uid, data=data).model_dump()
+                        for ecosystem_uid, data in records.items()
+                    ]
+                    sent = await event_handler.emit("actuators_data", data=payloads)
+            except Exception as e:
+                self.logger.error(
+                    f"Encountered an error while sending actuators data. "
+                    f"ERROR msg: `{e.__class__.__name__}: {e}`.")
+            # If the data wasn't sent, and the db is enabled, save it in the db buffer
+            if not sent and self.engine.use_db:
+                from gaia.database.models import ActuatorBuffer
+
+                for ecosystem_uid, ecosystem_records in records.items():
+                    for data in ecosystem_records:
+                        await log_actuator_record(
+                            self.engine, ecosystem_uid, data, ActuatorBuffer)
+            return sent
+
+    async def stop(self) -> None:
+        """Send the pending states without waiting for the window to end."""
+        if self._task is not None:
+            # Don't cancel the task, it could be in the middle of a send
+            self._flush_now.set()
+            await self._task
+        await self.flush()
 
 
 class ActuatorHandler:
@@ -275,7 +378,6 @@ class ActuatorHandler:
         "_last_expected_level",
         "_level",
         "_mode",
-        "_sending_data_task",
         "_status",
         "_timer",
         "_update_lock",
@@ -318,7 +420,6 @@ class ActuatorHandler:
         self._update_lock: Lock = Lock()
         self._updating: bool = False
         self._any_status_change: bool = False
-        self._sending_data_task: Task | None = None
 
     def __repr__(self) -> str:  # pragma: no cover
         uid = self.actuator_hub.ecosystem.uid
@@ -464,15 +565,11 @@ class ActuatorHandler:
                 f"{'on' if self.status else 'off'} as it has no actuator linked "
                 f"to it."
             )
-        failed: list[tuple[str, str]] = []
-        for actuator in actuators_linked:
-            if isinstance(actuator, SwitchMixin):
-                if value:
-                    success = await actuator.turn_on()
-                else:
-                    success = await actuator.turn_off()
-                if not success:
-                    failed.append((actuator.name, actuator.uid))
+        failed = await self._dispatch_command({
+            actuator: actuator.turn_on() if value else actuator.turn_off()
+            for actuator in actuators_linked
+            if isinstance(actuator, SwitchMixin)
+        })
         if failed:
             ids: list[str] = [f"{a_id[0]} ({a_id[1]})" for a_id in failed]
             self.logger.warning(
@@ -484,6 +581,37 @@ class ActuatorHandler:
             f"{'on' if self.status else 'off'}.")
         return True
 
+    async def _apply_command(self, actuator: Actuator, command: Awaitable[bool]) -> bool:
+        try:
+            return await asyncio.wait_for(command, ACTUATOR_COMMAND_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.logger.error(
+                f"Actuator '{actuator.name}' did not answer within "
+                f"{ACTUATOR_COMMAND_TIMEOUT} s.")
+        except Exception as e:
+            self.logger.error(
+                f"Encountered an error while sending a command to actuator "
+                f"'{actuator.name}'. ERROR msg: `{e.__class__.__name__}: {e}`.")
+        return False
+
+    async def _dispatch_command(
+            self,
+            commands: dict[Actuator, Awaitable[bool]],
+    ) -> list[tuple[str, str]]:
+        """Send the commands to all the actuators concurrently.
+
+        :return: The name and uid of the actuators that failed.
+        """
+        results = await asyncio.gather(*[
+            self._apply_command(actuator, command)
+            for actuator, command in commands.items()
+        ])
+        return [
+            (actuator.name, actuator.uid)
+            for actuator, success in zip(commands, results)
+            if not success
+        ]
+
     async def turn_on(self) -> None:
         await self.set_status(True)
 
@@ -504,12 +632,11 @@ class ActuatorHandler:
 
     async def _set_level(self, pwm_level: float) -> bool:
         self._level = pwm_level
-        failed: list[tuple[str, str]] = []
-        for actuator in self.get_linked_actuators():
-            if isinstance(actuator, DimmerMixin):
-                success = await actuator.set_pwm_level(pwm_level)
-                if not success:
-                    failed.append((actuator.name, actuator.uid))
+        failed = await self._dispatch_command({
+            actuator: actuator.set_pwm_level(pwm_level)
+            for actuator in self.get_linked_actuators()
+            if isinstance(actuator, DimmerMixin)
+        })
         if failed:
             ids: list[str] = [f"{a_id[0]} ({a_id[1]})" for a_id in failed]
             self.logger.warning(
@@ -614,19 +741,7 @@ class ActuatorHandler:
             data: gv.ActuatorStateRecord,
             db_model: Type[ActuatorRecord] | Type[ActuatorBuffer],
     ) -> None:
-        async with self.ecosystem.engine.db.scoped_session() as session:
-            session.add(
-                db_model(
-                    ecosystem_uid=self.ecosystem.uid,
-                    type=data.type,
-                    timestamp=data.timestamp,
-                    active=data.active,
-                    mode=data.mode,
-                    status=data.status,
-                    level=None,
-                )
-            )
-            await session.commit()
+        await log_actuator_record(self.ecosystem.engine, self.ecosystem.uid, data, db_model)
 
     async def log_actuator_state(
             self,
@@ -644,48 +759,23 @@ class ActuatorHandler:
             self,
             data: gv.ActuatorStateRecord | None = None,
     ) -> None:
+        """Send the actuator state to Ouranos right away."""
+        await self.schedule_send_actuator_state(data)
+        await self.ecosystem.engine.actuators_outbox.flush()
+
+    async def schedule_send_actuator_state(
+            self,
+            data: gv.ActuatorStateRecord | None = None,
+    ) -> None:
+        """Queue the actuator state in the engine outbox, which sends the
+        states of all the actuators changed during a short window at once."""
         # Check if we use the message broker
         if not self.ecosystem.engine.use_message_broker:
             return
         # Get the actuator data if needed
         if data is None:
             data = self.as_record(datetime.now(timezone.utc))
-        # Check whether we can send the actuator data
-        sent: bool = False
-        try:
-            # Can be cancelled if it takes too long
-            if self.ecosystem.event_handler.is_connected():
-                payload = gv.ActuatorsDataPayload(
-                    uid=self.ecosystem.uid,
-                    data=[data],
-                ).model_dump()
-                sent = await self.ecosystem.engine.event_handler.emit(
-                    "actuators_data",
-                    data=[payload],
-                )
-        # If the data wasn't sent, and the db is enabled, save the data in the db buffer
-        finally:
-            if not sent and self.ecosystem.engine.use_db:
-                from gaia.database.models import ActuatorBuffer
-
-                await self._log_actuator_state(data, ActuatorBuffer)
-
-    async def schedule_send_actuator_state(
-            self,
-            data: gv.ActuatorStateRecord | None = None,
-    ) -> None:
-        if not (
-                self._sending_data_task is None
-                or self._sending_data_task.done()
-        ):
-            self.logger.warning(
-                "There is already an actuator state sending task running. It "
-                "will be cancelled to start a new one."
-            )
-            self._sending_data_task.cancel()
-        task_name = f"{self.ecosystem.uid}-{self.group}_actuator-send_data"
-        self._sending_data_task = asyncio.create_task(
-            self.send_actuator_state(data), name=task_name)
+        self.ecosystem.engine.actuators_outbox.put(self.ecosystem.uid, data)
 
     def compute_expected_status(self, expected_level: float) -> bool:
         self._last_expected_level = expected_level
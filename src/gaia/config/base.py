@@ -30,6 +30,13 @@ class BaseConfig:
     VIRTUALIZATION_PARAMETERS = {"world": {}, "ecosystems": {}}
 
     USE_DATABASE = False
+    DATABASE_WRITE_BATCH_SIZE = 64  # the number of pending rows triggering a write
+    DATABASE_WRITE_INTERVAL = 5.0  # in s, the longest time a row waits to be written
+    DATABASE_STORAGE_PROFILE = "balanced"  # SQLite only: default, balanced or low_memory
+    DATABASE_PRAGMAS: dict[str, str | int] = {}  # SQLite PRAGMAs overriding the profile ones
+    DATABASE_CHECKPOINT_PERIOD = 300.0  # in s, the period of the SQLite WAL checkpoints
+    DATABASE_COMPACTION_PERIOD = 3600.0  # in s, the period of the records rollups
+    DATABASE_RECORDS_RETENTION: float | None = 365  # in days, None to keep the raw records
 
     @property
     def SQLALCHEMY_DATABASE_URI(self):
@@ -54,6 +61,7 @@ class BaseConfig:
     PICTURE_TRANSFER_METHOD = os.environ.get("PICTURE_TRANSFER_METHOD", "broker")  # broker or upload
     SENSORS_LOOP_PERIOD = 10.0  # in s
     SENSORS_LOGGING_PERIOD = "*/10"  # in minute, cron-style
+    SENSORS_HISTORY_WINDOW = 6 * 60 * 60  # in s, the recent history kept in memory
 
     HARDWARE_WEBSOCKET_PORT: int = 19171
     HARDWARE_WEBSOCKET_PASSWORD: str = "gaia"
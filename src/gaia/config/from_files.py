@@ -30,6 +30,7 @@ from gaia.config.default_actuators import Direction, EnvironmentDirection, Envir
 from gaia.exceptions import (
     EcosystemNotFound, HardwareNotFound, PlantNotFound, UndefinedParameter)
 from gaia.hardware import hardware_models, Hardware
+from gaia.hardware.abc import SensorMixin
 from gaia.hardware.multiplexers import multiplexer_models, Multiplexer
 from gaia.subroutines import subroutine_dict
 from gaia.utils import (
@@ -222,13 +223,27 @@ class EnvironmentConfigDict(TypedDict):
     weather: dict[gv.WeatherParameter, gv.AnonymousWeatherConfigDict]
 
 
+class AnonymousHardwareConfigValidator(gv.AnonymousHardwareConfig):
+    # Only used by sensors, defaults to the sensors loop period
+    sampling_period: float | None = Field(default=None, gt=0)
+
+
+class AnonymousHardwareConfigDict(gv.AnonymousHardwareConfigDict):
+    sampling_period: float | None
+
+
+class HardwareConfigDict(gv.HardwareConfigDict):
+    sampling_period: float | None
+
+
 class EcosystemConfigValidator(gv.BaseModel):
     name: str
     status: bool = False
     management: gv.ManagementConfig = Field(default_factory=gv.ManagementConfig)
     environment: EnvironmentConfigValidator = Field(
         default_factory=EnvironmentConfigValidator)
-    hardware: dict[str, gv.AnonymousHardwareConfig] = Field(default_factory=dict, validation_alias="IO")
+    hardware: dict[str, AnonymousHardwareConfigValidator] = Field(
+        default_factory=dict, validation_alias="IO")
     plants: dict[str, gv.AnonymousPlantConfig] = Field(default_factory=dict)
 
 
@@ -237,7 +252,7 @@ class EcosystemConfigDict(TypedDict):
     status: bool
     management: gv.ManagementConfigDict
     environment: EnvironmentConfigDict
-    hardware: dict[str, gv.AnonymousHardwareConfigDict]
+    hardware: dict[str, AnonymousHardwareConfigDict]
     plants: dict[str, gv.AnonymousPlantConfigDict]
 
 
@@ -256,7 +271,7 @@ class _SerializableMeasure(gv.Measure):
         return f"{self.name}|{self.unit if self.unit is not None else ''}"
 
 
-class _SerializableAnonymousHardwareConfig(gv.AnonymousHardwareConfig):
+class _SerializableAnonymousHardwareConfig(AnonymousHardwareConfigValidator):
     measures: list[_SerializableMeasure] = Field(default_factory=list, validation_alias="measure")
 
 
@@ -279,6 +294,7 @@ class AnonymousHardwareConfigDictInput(TypedDict):
     measures: list[str | gv.MeasureDict] | None
     plants: list[str] | None
     multiplexer_model: str | None
+    sampling_period: float | None
 
 
 class HardwareConfigDictInput(AnonymousHardwareConfigDictInput):
@@ -435,10 +451,21 @@ class EngineConfig(metaclass=SingletonMeta):
         self._config_files_lock = Lock()
         self._watchdog: ConfigWatchdog = ConfigWatchdog(self, self._checksum_tracker)
         self.configs_loaded: bool = False
+        self._generation: int = 0
 
     def __repr__(self) -> str:  # pragma: no cover
         return f"EngineConfig(watchdog={self.started})"
 
+    @property
+    def generation(self) -> int:
+        """Incremented each time the engine-wide config (ecosystems list,
+        places, chaos memory) changes. See `EcosystemConfig.generation` for
+        the changes specific to an ecosystem."""
+        return self._generation
+
+    def _bump_generation(self) -> None:
+        self._generation += 1
+
     # ---------------------------------------------------------------------------
     #   Properties and common utilities
     # ---------------------------------------------------------------------------
@@ -588,6 +615,7 @@ class EngineConfig(metaclass=SingletonMeta):
         self._ecosystems_config_dict = validated
         # Update the checksum
         await self._checksum_tracker.update(config_path, checksum)
+        self._bump_generation()
         # Reset ecosystems caches
         for ecosystem_config in self.ecosystems_config.values():
             ecosystem_config.reset_caches()
@@ -614,6 +642,7 @@ class EngineConfig(metaclass=SingletonMeta):
             raise e
         # Room for possible future data logic validation
         self._private_config = validated
+        self._bump_generation()
         # Update the checksum
         await self._checksum_tracker.update(config_path, checksum)
 
@@ -639,6 +668,7 @@ class EngineConfig(metaclass=SingletonMeta):
                 incomplete = True
                 validated.update(self._create_chaos_memory(ecosystem_uid))
         self._chaos_memory = validated
+        self._bump_generation()
         if incomplete:
             await self._dump_chaos_memory()
 
@@ -841,6 +871,7 @@ class EngineConfig(metaclass=SingletonMeta):
         uid = self._create_new_ecosystem_uid()
         ecosystem_cfg = EcosystemConfigValidator(name=ecosystem_name).model_dump()
         self.ecosystems_config_dict.update({uid: ecosystem_cfg})
+        self._bump_generation()
 
     def update_ecosystem_base_info(
             self,
@@ -854,10 +885,12 @@ class EngineConfig(metaclass=SingletonMeta):
         status = updating_values.get("status")
         if status and not gv.is_missing(status):
             self.ecosystems_config_dict[ecosystem_ids.uid]["status"] = status
+        self._bump_generation()
 
     def delete_ecosystem(self, ecosystem_id: str) -> None:
         ecosystem_ids = self.get_IDs(ecosystem_id)
         del self.ecosystems_config_dict[ecosystem_ids.uid]
+        self._bump_generation()
 
     def get_ecosystems_expected_to_run(self) -> set[str]:
         return {
@@ -926,6 +959,7 @@ class EngineConfig(metaclass=SingletonMeta):
                 longitude=coordinates["longitude"],
             )
         self.places[place] = validated_coordinates
+        self._bump_generation()
 
     def update_place(
             self,
@@ -947,6 +981,7 @@ class EngineConfig(metaclass=SingletonMeta):
                 f"No location named '{place}' was found in the private "
                 f"configuration file."
             )
+        self._bump_generation()
 
     @property
     def home_coordinates(self) -> gv.Coordinates:
@@ -1126,6 +1161,7 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
         self._nycthemeral_span_hours: gv.NycthemeralSpanConfig | None = None
         self._lighting_method: gv.LightingMethod | None = None
         self._lighting_hours: gv.LightingHours | None = None
+        self._generation: int = 0
 
     def __repr__(self) -> str:  # pragma: no cover
         return (
@@ -1155,6 +1191,7 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
     @name.setter
     def name(self, value: str) -> None:
         self._config_dict["name"] = value
+        self._bump_generation()
 
     @property
     def status(self) -> bool:
@@ -1163,11 +1200,22 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
     @status.setter
     def status(self, value: bool) -> None:
         self._config_dict["status"] = value
+        self._bump_generation()
 
     async def save(self) -> None:
         """Persist the ecosystem configuration to the ecosystems.cfg file."""
         await self._engine_config.save(ConfigType.ecosystems)
 
+    @property
+    def generation(self) -> int:
+        """Incremented each time the config changes in a way that invalidates
+        the values derived from it. Compare it to a previously seen value to
+        know if these need to be recomputed."""
+        return self._generation
+
+    def _bump_generation(self) -> None:
+        self._generation += 1
+
     def reset_nycthemeral_caches(self) -> None:
         """Clear cached nycthemeral span and lighting values.
 
@@ -1177,6 +1225,7 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
         self._nycthemeral_span_hours = None
         self._lighting_method = None
         self._lighting_hours = None
+        self._bump_generation()
 
     def reset_caches(self) -> None:
         """Clear all cached configuration values."""
@@ -1192,6 +1241,7 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
     @managements.setter
     def managements(self, value: gv.ManagementConfigDict) -> None:
         self._config_dict["management"] = gv.ManagementConfig(**value).model_dump()
+        self._bump_generation()
 
     @property
     def management_flag(self) -> int:
@@ -1241,6 +1291,7 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
                     f"{management_name.upper()} management has unmet dependencies: "
                     f"{dep}. This might lead to issues if it is not enabled.")
         self._config_dict["management"][management_name] = value  # ty: ignore[invalid-key]
+        self._bump_generation()
 
     def get_subroutines_enabled(self) -> list[str]:
         """Return the list of subroutine names that are enabled for this ecosystem."""
@@ -1489,6 +1540,18 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
             now or datetime.now().time(),
         )
 
+    def get_time_to_phase_change(self, now: datetime | None = None) -> float:
+        """Return the number of seconds until the next day/night switch."""
+        nycthemeral_span = self.nycthemeral_span_hours
+        now = now or datetime.now()
+        time_to_changes: list[float] = []
+        for change in (nycthemeral_span.day, nycthemeral_span.night):
+            change_dt = datetime.combine(now.date(), change)
+            if change_dt <= now:
+                change_dt += timedelta(days=1)
+            time_to_changes.append((change_dt - now).total_seconds())
+        return min(time_to_changes)
+
     def _compute_lighting_method(self) -> gv.LightingMethod:
         lighting_method: gv.LightingMethod = safe_enum_from_name(
             gv.LightingMethod, self.nycthemeral_cycle["lighting"])
@@ -1640,6 +1703,7 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
                 f"ERROR msg(s): `{format_pydantic_error(e)}`."
             )
         self.environment["chaos"] = validated_values
+        self._bump_generation()
 
     @property
     def chaos_time_window(self) -> gv.TimeWindowDict:
@@ -1684,6 +1748,7 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
             },
             "last_update": date.today()
         }
+        self._bump_generation()
         await self.general.save(CacheType.chaos)
 
     def get_chaos_factor(self, now: datetime | None = None) -> float:
@@ -1774,6 +1839,7 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
                 f"ERROR msg(s): `{format_pydantic_error(e)}`."
             )
         self.climate[parameter] = validated_value
+        self._bump_generation()
 
     def update_climate_parameter(
             self,
@@ -1812,6 +1878,7 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
             raise UndefinedParameter(
                 f"No climate parameter {parameter} was found for ecosystem "
                 f"'{self.name}' in ecosystems configuration file")
+        self._bump_generation()
 
     def get_scaled_climate_target(
             self,
@@ -1883,6 +1950,7 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
                 f"ERROR msg(s): `{format_pydantic_error(e)}`."
             )
         self.weather[parameter] = validated_value
+        self._bump_generation()
 
     def update_weather_parameter(
             self,
@@ -1922,6 +1990,7 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
                 f"No weather parameter {parameter} was found for ecosystem "
                 f"'{self.name}' in ecosystems configuration file"
             )
+        self._bump_generation()
 
     # ---------------------------------------------------------------------------
     #   Actuator couples
@@ -1984,7 +2053,7 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
     #   Hardware parameters
     # ---------------------------------------------------------------------------
     @property
-    def hardware_dict(self) -> dict[str, gv.AnonymousHardwareConfigDict]:
+    def hardware_dict(self) -> dict[str, AnonymousHardwareConfigDict]:
         """
         Returns the hardware present in the ecosystem
         """
@@ -2034,7 +2103,7 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
     def validate_hardware_dict(
             hardware_dict: gv.HardwareConfigDict | HardwareConfigDictInput,
             addresses_used: list,
-    ) -> gv.HardwareConfigDict:
+    ) -> HardwareConfigDict:
         """Validate a hardware configuration dictionary.
 
         Note: This method modifies hardware_dict in place, updating the
@@ -2074,6 +2143,21 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
             raise ValueError(
                 f"Multiplexer model '{multiplexer_model}' is not supported."
             )
+        # Check sampling period, which is not part of `gv.HardwareConfig`
+        sampling_period = hardware_dict.get("sampling_period")
+        if sampling_period is not None:
+            if not issubclass(hardware_cls, SensorMixin):
+                raise ValueError("Only sensors can have a sampling period.")
+            sampling_period = float(sampling_period)
+            if sampling_period <= 0.0:
+                raise ValueError("Sampling period should be a positive number.")
+            if sampling_period < hardware_cls.min_sampling_period:
+                raise ValueError(
+                    f"Sampling period should be at least "
+                    f"{hardware_cls.min_sampling_period} s for hardware model "
+                    f"'{hardware_config.model}'."
+                )
+        validated_config["sampling_period"] = sampling_period
         return validated_config
 
     def create_new_hardware(
@@ -2089,6 +2173,7 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
             plants: list | None = None,
             active: bool = True,
             multiplexer_model: str | None = None,
+            sampling_period: float | None = None,
     ) -> None:
         """
         Create a new hardware
@@ -2101,6 +2186,9 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
         :param plants: list: the name of the plant linked to the hardware
         :param active: bool: the status of the hardware. True (active/in use) by default.
         :param multiplexer_model: str: the model of the multiplexer used if there is one
+        :param sampling_period: float: the interval between two reads of a
+                                sensor, in seconds. Uses the sensors loop
+                                period if None
         """
         uid = self._create_new_short_uid()
         hardware_dict = HardwareConfigDictInput(
@@ -2115,10 +2203,12 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
             measures=measures,
             plants=plants,
             multiplexer_model=multiplexer_model,
+            sampling_period=sampling_period,
         )
         hardware_dict = self.validate_hardware_dict(hardware_dict, self._used_addresses())
         uid = hardware_dict["uid"]
         self.hardware_dict[uid] = gv.to_anonymous(hardware_dict, "uid")
+        self._bump_generation()
 
     def update_hardware(
             self,
@@ -2147,6 +2237,7 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
         used_addresses = self._used_addresses() if "address" in updating_values else []
         hardware_dict = self.validate_hardware_dict(hardware_dict, used_addresses)
         self.hardware_dict[uid] = gv.to_anonymous(hardware_dict, "uid")
+        self._bump_generation()
 
     def delete_hardware(self, uid: str) -> None:
         """
@@ -2159,6 +2250,7 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
             raise HardwareNotFound(
                 f"No hardware with uid '{uid}' found in the hardware config."
             )
+        self._bump_generation()
 
     def get_hardware_uid(self, name: str) -> str:
         """Get the UID of a hardware by its name.
@@ -2190,6 +2282,20 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
                 f"No hardware with uid '{uid}' found in the hardware config."
             )
 
+    def get_hardware_sampling_period(self, uid: str) -> float | None:
+        """Get the interval between two reads of a sensor, in seconds.
+
+        :param uid: The UID of the hardware.
+        :return: The sampling period, or None if the default one should be used.
+        :raises HardwareNotFound: If no hardware with the given UID exists.
+        """
+        try:
+            return self.hardware_dict[uid].get("sampling_period")
+        except KeyError:
+            raise HardwareNotFound(
+                f"No hardware with uid '{uid}' found in the hardware config."
+            )
+
     @staticmethod
     def supported_hardware() -> list[str]:
         """Return the list of supported hardware model names."""
@@ -2240,6 +2346,7 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
                 f"ERROR msg(s): `{format_pydantic_error(e)}`"
             )
         self.plants_dict[uid] = gv.to_anonymous(plant_dict, "uid")
+        self._bump_generation()
 
     def update_plant(
             self,
@@ -2268,6 +2375,7 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
                 f"ERROR msg(s): `{format_pydantic_error(e)}`"
             )
         self.plants_dict[uid] = gv.to_anonymous(plant_dict, "uid")
+        self._bump_generation()
 
     def delete_plant(self, uid: str) -> None:
         """Delete a plant from the configuration.
@@ -2281,6 +2389,7 @@ class EcosystemConfig(metaclass=_MetaEcosystemConfig):
             raise PlantNotFound(
                 f"No plant with uid '{uid}' found in the plant config."
             )
+        self._bump_generation()
 
     def get_plant_uid(self, name: str) -> str:
         """Get the UID of a plant by its name.
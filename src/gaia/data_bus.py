@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+from asyncio import Event, Task
+from collections import Counter, deque
+from logging import getLogger, Logger
+import typing as t
+from typing import Any, Awaitable, Callable, Literal, NamedTuple
+
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from gaia.sensors_frame import SensorsFrame
+
+
+Topic = Literal["sensors_frame"]
+Callback = Callable[[Any], Awaitable[None]]
+
+
+DEFAULT_QUEUE_SIZE = 8
+
+
+class SensorsFrameMessage(NamedTuple):
+    ecosystem_uid: str
+    # None when no sensor could be read
+    frame: SensorsFrame | None
+    # Uids of the sensors that have been read for this frame, the reads of the
+    #  other sensors have been carried forward from a previous frame
+    fresh_sensor_uids: frozenset[str]
+
+
+def _get_ecosystem_uid(message: Any) -> str | None:
+    return getattr(message, "ecosystem_uid", None)
+
+
+class Subscription:
+    """A subscriber to a data bus topic
+
+    Messages are queued and handed to the callback, one at a time, by a
+    dedicated task. Messages are grouped by the ecosystem they come from, and
+    when more than `maxsize` messages of an ecosystem are waiting, the oldest
+    one of this ecosystem is dropped, so that a subscriber lagging behind
+    always works on the most recent data without losing the data of the other
+    ecosystems.
+
+    :param ecosystem_uid: if given, only the messages of this ecosystem are
+                          queued.
+    """
+    def __init__(
+            self,
+            topic: Topic,
+            name: str,
+            callback: Callback,
+            maxsize: int = DEFAULT_QUEUE_SIZE,
+            ecosystem_uid: str | None = None,
+    ) -> None:
+        self.topic: Topic = topic
+        self.name: str = name
+        self.ecosystem_uid: str | None = ecosystem_uid
+        self.maxsize: int = maxsize
+        self.logger: Logger = getLogger(f"gaia.engine.data_bus.{name}")
+        self._callback: Callback = callback
+        self._queue: deque[Any] = deque()
+        self._queued_per_ecosystem: Counter[str | None] = Counter()
+        self._message_available: Event = Event()
+        self._task: Task | None = None
+        self._closed: bool = False
+        self.dropped: int = 0
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"{self.__class__.__name__}({self.topic}, name={self.name})"
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def _drop_oldest(self, ecosystem_uid: str | None) -> None:
+        for message in self._queue:
+            if _get_ecosystem_uid(message) == ecosystem_uid:
+                self._queue.remove(message)
+                break
+        self._queued_per_ecosystem[ecosystem_uid] -= 1
+        self.dropped += 1
+        self.logger.debug(
+            f"Subscriber '{self.name}' is lagging behind, dropping its "
+            f"oldest message. {self.dropped} messages dropped so far.")
+
+    def put(self, message: Any) -> bool:
+        """Queue a message for the callback.
+
+        :return: Whether the message was queued or filtered out.
+        """
+        ecosystem_uid = _get_ecosystem_uid(message)
+        if self.ecosystem_uid is not None and ecosystem_uid != self.ecosystem_uid:
+            return False
+        if self.maxsize and self._queued_per_ecosystem[ecosystem_uid] >= self.maxsize:
+            self._drop_oldest(ecosystem_uid)
+        self._queue.append(message)
+        self._queued_per_ecosystem[ecosystem_uid] += 1
+        self._message_available.set()
+        return True
+
+    async def _get(self) -> Any:
+        while not self._queue:
+            self._message_available.clear()
+            await self._message_available.wait()
+        message = self._queue.popleft()
+        ecosystem_uid = _get_ecosystem_uid(message)
+        self._queued_per_ecosystem[ecosystem_uid] -= 1
+        if not self._queued_per_ecosystem[ecosystem_uid]:
+            del self._queued_per_ecosystem[ecosystem_uid]
+        return message
+
+    async def _consume(self) -> None:
+        while not self._closed:
+            message = await self._get()
+            try:
+                await self._callback(message)
+            except Exception as e:
+                self.logger.error(
+                    f"Encountered an error while handling a '{self.topic}' "
+                    f"message. ERROR msg: `{e.__class__.__name__}: {e}`.")
+
+    def start(self) -> None:
+        if self._task is not None:  # pragma: no cover
+            raise RuntimeError(f"Subscriber '{self.name}' is already running.")
+        self._closed = False
+        self._task = asyncio.create_task(
+            self._consume(), name=f"data_bus-{self.topic}-{self.name}")
+
+    def stop(self) -> None:
+        if self._task is None:
+            return
+        self._closed = True
+        # A subscriber can unsubscribe from within its own callback (e.g. a
+        #  subroutine stopping itself), don't cancel it mid-callback then. It
+        #  will exit once the callback returns.
+        if self._task is not asyncio.current_task():
+            self._task.cancel()
+        self._task = None
+
+
+class DataBus:
+    """An in-process publish/subscribe bus shared by the ecosystems of an engine
+
+    Publishing never blocks: messages are pushed to the bounded queue of each
+    subscriber, which handles them in its own task. Subscribers only
+    interested in one ecosystem can subscribe with its uid to skip the
+    messages of the others.
+    """
+    def __init__(self) -> None:
+        self.logger: Logger = getLogger("gaia.engine.data_bus")
+        self._subscriptions: dict[Topic, dict[str, Subscription]] = {}
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"{self.__class__.__name__}(topics={[*self._subscriptions.keys()]})"
+
+    def subscribe(
+            self,
+            topic: Topic,
+            name: str,
+            callback: Callback,
+            maxsize: int = DEFAULT_QUEUE_SIZE,
+            ecosystem_uid: str | None = None,
+    ) -> Subscription:
+        subscriptions = self._subscriptions.setdefault(topic, {})
+        if name in subscriptions:
+            raise ValueError(f"'{name}' is already subscribed to '{topic}'.")
+        subscription = Subscription(topic, name, callback, maxsize, ecosystem_uid)
+        subscription.start()
+        subscriptions[name] = subscription
+        self.logger.debug(f"'{name}' subscribed to '{topic}'.")
+        return subscription
+
+    def unsubscribe(self, topic: Topic, name: str) -> None:
+        subscription = self._subscriptions.get(topic, {}).pop(name, None)
+        if subscription is None:
+            return
+        subscription.stop()
+        self.logger.debug(f"'{name}' unsubscribed from '{topic}'.")
+
+    def is_subscribed(self, topic: Topic, name: str) -> bool:
+        return name in self._subscriptions.get(topic, {})
+
+    def get_subscriptions(self, topic: Topic) -> list[Subscription]:
+        return [*self._subscriptions.get(topic, {}).values()]
+
+    def publish(self, topic: Topic, message: Any) -> int:
+        """Push a message to all the subscribers of a topic.
+
+        :return: The number of subscribers the message was pushed to.
+        """
+        pushed = 0
+        for subscription in self._subscriptions.get(topic, {}).values():
+            pushed += subscription.put(message)
+        return pushed
+
+    def clear(self) -> None:
+        for topic in [*self._subscriptions.keys()]:
+            for name in [*self._subscriptions[topic].keys()]:
+                self.unsubscribe(topic, name)
+        self._subscriptions.clear()
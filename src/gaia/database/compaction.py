@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+from asyncio import sleep
+from datetime import datetime, timedelta, timezone
+from logging import getLogger, Logger
+import typing as t
+from typing import Type
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from gaia.database.models import (
+    ActuatorRecord, BaseSensorRollup, CompactionState, SensorDailyRollup,
+    SensorHourlyRollup, SensorRecord)
+
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy_wrapper import AsyncSQLAlchemyWrapper
+
+
+db_logger: Logger = getLogger("gaia.engine.db")
+
+
+# Number of rows rolled up or deleted per transaction
+COMPACTION_BATCH_SIZE = 2000
+# Pause between two transactions, to let the writers access the database
+COMPACTION_PAUSE = 0.1  # in s
+# Name of the sensor records rollup in the compaction state table
+SENSORS_ROLLUP = "sensor_records_rollup"
+
+RollupKey = tuple[str, str, str, datetime]  # ecosystem, sensor, measure, period
+
+
+class _Aggregate:
+    __slots__ = ("min", "max", "sum", "count")
+
+    def __init__(self, value: float) -> None:
+        self.min: float = value
+        self.max: float = value
+        self.sum: float = value
+        self.count: int = 1
+
+    def add(self, value: float) -> None:
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.sum += value
+        self.count += 1
+
+    def merge_into(self, rollup: BaseSensorRollup) -> None:
+        count = rollup.count + self.count
+        rollup.mean = (rollup.mean * rollup.count + self.sum) / count
+        rollup.min = min(rollup.min, self.min)
+        rollup.max = max(rollup.max, self.max)
+        rollup.count = count
+
+    def to_rollup(self, rollup_model: Type[BaseSensorRollup], key: RollupKey) -> BaseSensorRollup:
+        ecosystem_uid, sensor_uid, measure, timestamp = key
+        return rollup_model(
+            ecosystem_uid=ecosystem_uid,
+            sensor_uid=sensor_uid,
+            measure=measure,
+            timestamp=timestamp,
+            min=self.min,
+            max=self.max,
+            mean=self.sum / self.count,
+            count=self.count,
+        )
+
+
+async def _get_last_id(session: AsyncSession, name: str) -> int:
+    state = await session.get(CompactionState, name)
+    return 0 if state is None else state.last_id
+
+
+async def _set_last_id(session: AsyncSession, name: str, last_id: int) -> None:
+    state = await session.get(CompactionState, name)
+    if state is None:
+        session.add(CompactionState(name=name, last_id=last_id))
+    else:
+        state.last_id = last_id
+
+
+async def _merge_rollups(
+        session: AsyncSession,
+        rollup_model: Type[BaseSensorRollup],
+        aggregates: dict[RollupKey, _Aggregate],
+) -> None:
+    ecosystem_uids = {key[0] for key in aggregates}
+    periods = {key[3] for key in aggregates}
+    stmt = (
+        select(rollup_model)
+        .where(rollup_model.ecosystem_uid.in_(ecosystem_uids))
+        .where(rollup_model.timestamp.in_(periods))
+    )
+    result = await session.execute(stmt)
+    existing: dict[RollupKey, BaseSensorRollup] = {
+        (rollup.ecosystem_uid, rollup.sensor_uid, rollup.measure, rollup.timestamp): rollup
+        for rollup in result.scalars().all()
+    }
+    for key, aggregate in aggregates.items():
+        rollup = existing.get(key)
+        if rollup is None:
+            session.add(aggregate.to_rollup(rollup_model, key))
+        else:
+            aggregate.merge_into(rollup)
+
+
+async def _roll_up_sensor_records_batch(
+        db: AsyncSQLAlchemyWrapper,
+        batch_size: int,
+) -> int:
+    async with db.scoped_session() as session:
+        session: AsyncSession
+        last_id = await _get_last_id(session, SENSORS_ROLLUP)
+        stmt = (
+            select(
+                SensorRecord.id, SensorRecord.ecosystem_uid, SensorRecord.sensor_uid,
+                SensorRecord.measure, SensorRecord.timestamp, SensorRecord.value,
+            )
+            .where(SensorRecord.id > last_id)
+            .order_by(SensorRecord.id)
+            .limit(batch_size)
+        )
+        result = await session.execute(stmt)
+        rows = result.all()
+        if not rows:
+            return 0
+        hourly: dict[RollupKey, _Aggregate] = {}
+        daily: dict[RollupKey, _Aggregate] = {}
+        for _, ecosystem_uid, sensor_uid, measure, timestamp, value in rows:
+            hour = timestamp.replace(minute=0, second=0, microsecond=0)
+            for aggregates, period in (
+                    (hourly, hour),
+                    (daily, hour.replace(hour=0)),
+            ):
+                key = (ecosystem_uid, sensor_uid, measure, period)
+                aggregate = aggregates.get(key)
+                if aggregate is None:
+                    aggregates[key] = _Aggregate(value)
+                else:
+                    aggregate.add(value)
+        await _merge_rollups(session, SensorHourlyRollup, hourly)
+        await _merge_rollups(session, SensorDailyRollup, daily)
+        # Store the progress in the same transaction as the rollups so that
+        #  no row is ever rolled up twice
+        await _set_last_id(session, SENSORS_ROLLUP, rows[-1][0])
+        await session.commit()
+        return len(rows)
+
+
+async def roll_up_sensor_records(
+        db: AsyncSQLAlchemyWrapper,
+        batch_size: int = COMPACTION_BATCH_SIZE,
+) -> int:
+    """Aggregate the new sensor records into the hourly and daily rollups.
+
+    The records are processed in order of insertion, `batch_size` at a time,
+    each batch in its own transaction. The rollups of a period are updated
+    when new records of this period are logged.
+
+    :return: The number of records rolled up.
+    """
+    total = 0
+    while True:
+        rolled_up = await _roll_up_sensor_records_batch(db, batch_size)
+        if not rolled_up:
+            return total
+        total += rolled_up
+        await sleep(COMPACTION_PAUSE)
+
+
+async def _get_prune_bound(
+        session: AsyncSession,
+        db_model: Type[SensorRecord] | Type[ActuatorRecord],
+        before: datetime,
+) -> int | None:
+    """Get the id below which the records can be deleted.
+
+    The records are logged in chronological order, so the records older than
+    `before` are the ones before the first recent one. Finding it only scans
+    the old records once, the deletions then use the primary key.
+
+    The last record is never deleted: SQLite gives new rows the id following
+    the highest one, emptying the table would make it reuse the ids below the
+    rollup watermark.
+    """
+    stmt = (
+        select(db_model.id)
+        .where(db_model.timestamp >= before)
+        .order_by(db_model.id)
+        .limit(1)
+    )
+    result = await session.execute(stmt)
+    first_recent_id = result.scalar_one_or_none()
+    if first_recent_id is not None:
+        return first_recent_id
+    result = await session.execute(select(func.max(db_model.id)))
+    return result.scalar_one_or_none()
+
+
+async def prune_records(
+        db: AsyncSQLAlchemyWrapper,
+        db_model: Type[SensorRecord] | Type[ActuatorRecord],
+        before: datetime,
+        max_id: int | None = None,
+        batch_size: int = COMPACTION_BATCH_SIZE,
+) -> int:
+    """Delete the records older than `before`, `batch_size` at a time.
+
+    :param max_id: if given, only delete the records with an id lower or
+                   equal, used to keep the records not rolled up yet.
+    :return: The number of records deleted.
+    """
+    async with db.scoped_session() as session:
+        session: AsyncSession
+        bound = await _get_prune_bound(session, db_model, before)
+    if bound is None:
+        return 0
+    if max_id is not None:
+        bound = min(bound, max_id + 1)
+    total = 0
+    while True:
+        async with db.scoped_session() as session:
+            session: AsyncSession
+            stmt = (
+                select(db_model.id)
+                .where(db_model.id < bound)
+                .order_by(db_model.id)
+                .limit(batch_size)
+            )
+            result = await session.execute(stmt)
+            ids = result.scalars().all()
+            if not ids:
+                return total
+            await session.execute(delete(db_model).where(db_model.id.in_(ids)))
+            await session.commit()
+        total += len(ids)
+        await sleep(COMPACTION_PAUSE)
+
+
+async def compact_database(
+        db: AsyncSQLAlchemyWrapper,
+        retention: float | None,
+) -> None:
+    """Roll up the sensor records and delete the old raw records
+
+    :param db: the database to compact.
+    :param retention: the number of days raw sensor and actuator records are
+                      kept. Sensor records are only deleted once rolled up. If
+                      None, the raw records are kept forever.
+    """
+    try:
+        rolled_up = await roll_up_sensor_records(db)
+        pruned = 0
+        if retention is not None:
+            before = datetime.now(timezone.utc) - timedelta(days=retention)
+            async with db.scoped_session() as session:
+                session: AsyncSession
+                last_id = await _get_last_id(session, SENSORS_ROLLUP)
+            pruned += await prune_records(db, SensorRecord, before, last_id)
+            pruned += await prune_records(db, ActuatorRecord, before)
+    except Exception as e:
+        db_logger.error(
+            f"Encountered an error while compacting the database. "
+            f"ERROR msg: `{e.__class__.__name__}: {e}`.")
+        return
+    db_logger.debug(
+        f"Database compacted: {rolled_up} sensor records rolled up, {pruned} "
+        f"raw records deleted.")
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 from logging import getLogger, Logger
-from typing import AsyncGenerator, NamedTuple, Self, Sequence, Type, TypeVar
+from typing import (
+    AsyncGenerator, Mapping, NamedTuple, Self, Sequence, Type, TypedDict, TypeVar)
 from uuid import UUID, uuid4
 
 import sqlalchemy as sa
@@ -21,6 +22,9 @@ BT = TypeVar("BT", bound=gv.BufferedDataPayload)
 
 db_logger: Logger = getLogger("gaia.engine.db")
 
+# Name of the unique constraint preventing to log the same record twice
+NO_REPOST_CONSTRAINT = "_uq_no_repost_constraint"
+
 
 db = AsyncSQLAlchemyWrapper(
     engine_options={
@@ -67,6 +71,65 @@ class DataBufferMixin(Base):  # ty: ignore[unsupported-base]
     ) -> AsyncGenerator[gv.BufferedDataPayload]:
         raise NotImplementedError("This method must be implemented in a subclass")  # pragma: no cover
 
+    @classmethod
+    async def get_buffered_page(
+            cls,
+            session: AsyncSession,
+            after_id: int = 0,
+            per_page: int = 50,
+    ) -> tuple[gv.BufferedDataPayload, int] | None:
+        raise NotImplementedError("This method must be implemented in a subclass")  # pragma: no cover
+
+    @classmethod
+    async def _get_buffered_page(
+            cls,
+            buffered_record_class: Type[NamedTuple],
+            buffered_payload_model: Type[BT],
+            session: AsyncSession,
+            after_id: int = 0,
+            per_page: int = 50,
+    ) -> tuple[BT, int] | None:
+        """Get the next buffered rows not part of an exchange and assign them
+        to a new exchange.
+
+        Rows are paginated on their id (keyset pagination) so getting a page
+        does not depend on the number of rows before it.
+
+        :return: The payload of the exchange and the id of its last row, or
+                 None if there is no more buffered data.
+        """
+        stmt = (
+            select(cls)
+            .where(cls.exchange_uuid == None)  # noqa: E711
+            .where(cls.id > after_id)
+            .order_by(cls.id)
+            .limit(per_page)
+        )
+        result = await session.execute(stmt)
+        buffered_data: Sequence[Self] = result.scalars().all()
+        if not buffered_data:
+            return None
+        # Create an exchange uuid ...
+        exchange_uuid = uuid4()
+        # ... store it in the db ...
+        stmt = (
+            update(cls)
+            .where(cls.id.in_([row.id for row in buffered_data]))
+            .values({
+                "exchange_uuid": exchange_uuid,
+            })
+        )
+        await session.execute(stmt)
+        # ... and use it in the payload
+        payload = buffered_payload_model(
+            uuid=exchange_uuid,
+            data=[
+                buffered_record_class(*row.tuple_repr)
+                for row in buffered_data
+            ]
+        )
+        return payload, buffered_data[-1].id
+
     @classmethod
     async def _get_buffered_data(
             cls,
@@ -75,41 +138,17 @@ class DataBufferMixin(Base):  # ty: ignore[unsupported-base]
             session: AsyncSession,
             per_page: int = 50,
     ) -> AsyncGenerator[BT]:
-        page: int = 0
+        last_id: int = 0
         try:
             while True:
-                # Get buffered data
-                stmt = (
-                    select(cls)
-                    .where(cls.exchange_uuid == None)  # noqa: E711
-                    .offset(per_page * page)
-                    .limit(per_page)
-                )
-                result = await session.execute(stmt)
-                buffered_data: Sequence[Self] = result.scalars().all()
-                if not buffered_data:
+                page = await cls._get_buffered_page(
+                    buffered_record_class, buffered_payload_model, session,
+                    last_id, per_page)
+                if page is None:
                     break
-                # Create an exchange uuid ...
-                exchange_uuid = uuid4()
-                # ... store it in the db ...
-                stmt = (
-                    update(cls)
-                    .where(cls.id.in_([row.id for row in buffered_data]))
-                    .values({
-                        "exchange_uuid": exchange_uuid,
-                    })
-                )
-                await session.execute(stmt)
-                # ... and use it in the payload
-                yield buffered_payload_model(
-                    uuid=exchange_uuid,
-                    data=[
-                        buffered_record_class(*row.tuple_repr)
-                        for row in buffered_data
-                    ]
-                )
+                payload, last_id = page
+                yield payload
                 await session.commit()
-                page += 1
         except Exception as e:
             db_logger.error(
                 f"Encountered an error while retrieving buffered data for "
@@ -156,12 +195,47 @@ class DataBufferMixin(Base):  # ty: ignore[unsupported-base]
         await session.execute(stmt)
 
 
+def _insert_skipping_reposts(session: AsyncSession, db_model: Type[Base]) -> sa.Insert:
+    """Get an INSERT statement skipping the rows that would violate the
+    `NO_REPOST_CONSTRAINT` of the model table.
+
+    Falls back to a plain INSERT on the dialects without ON CONFLICT support.
+    """
+    table: sa.Table = db_model.__table__
+    dialect = session.get_bind(mapper=db_model).dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+        constraint = next(
+            constraint for constraint in table.constraints
+            if constraint.name == NO_REPOST_CONSTRAINT
+        )
+        assert isinstance(constraint, UniqueConstraint)
+        # SQLite cannot target a constraint by name, target its columns
+        return sqlite_insert(table).on_conflict_do_nothing(
+            index_elements=[*constraint.columns])
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+
+        return postgresql_insert(table).on_conflict_do_nothing(
+            constraint=NO_REPOST_CONSTRAINT)
+    return sa.insert(table)
+
+
+class SensorRecordDict(TypedDict):
+    ecosystem_uid: str
+    sensor_uid: str
+    measure: str
+    timestamp: datetime
+    value: float
+
+
 class BaseSensorRecord(Base):  # ty: ignore[unsupported-base]
     __abstract__ = True
     __table_args__ = (
         UniqueConstraint(
             "measure", "timestamp", "value", "ecosystem_uid", "sensor_uid",
-            name="_uq_no_repost_constraint",
+            name=NO_REPOST_CONSTRAINT,
         ),
     )
 
@@ -192,6 +266,22 @@ class BaseSensorRecord(Base):  # ty: ignore[unsupported-base]
             self.timestamp,
         )
 
+    @classmethod
+    async def insert_many(
+            cls,
+            session: AsyncSession,
+            records: Sequence[Mapping] | Sequence[SensorRecordDict],
+    ) -> None:
+        """Insert records with a single executemany INSERT, bypassing the ORM.
+
+        The records already logged are skipped instead of failing the whole
+        transaction.
+        """
+        if not records:
+            return
+        stmt = _insert_skipping_reposts(session, cls)
+        await session.execute(stmt, records, bind_arguments={"mapper": cls})
+
 
 class SensorRecord(BaseSensorRecord):
     __tablename__ = "sensor_records"
@@ -213,6 +303,58 @@ class SensorBuffer(BaseSensorRecord, DataBufferMixin):
             per_page=per_page,
         )
 
+    @classmethod
+    async def get_buffered_page(
+            cls,
+            session: AsyncSession,
+            after_id: int = 0,
+            per_page: int = 50,
+    ) -> tuple[gv.BufferedSensorsDataPayload, int] | None:
+        return await cls._get_buffered_page(
+            buffered_record_class=gv.BufferedSensorRecord,
+            buffered_payload_model=gv.BufferedSensorsDataPayload,
+            session=session,
+            after_id=after_id,
+            per_page=per_page,
+        )
+
+
+class BaseSensorRollup(Base):  # ty: ignore[unsupported-base]
+    """The aggregated values of a sensor measure over a period"""
+    __abstract__ = True
+    __table_args__ = (
+        UniqueConstraint(
+            "ecosystem_uid", "sensor_uid", "measure", "timestamp",
+            name="_uq_rollup_period",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(nullable=False, primary_key=True)
+    ecosystem_uid: Mapped[str] = mapped_column(sa.String(length=8))
+    sensor_uid: Mapped[str] = mapped_column(sa.String(length=16))
+    measure: Mapped[str] = mapped_column(sa.String(length=16))
+    timestamp: Mapped[datetime] = mapped_column(UtcDateTime)  # Start of the period
+    min: Mapped[float] = mapped_column(sa.Float(precision=2))
+    max: Mapped[float] = mapped_column(sa.Float(precision=2))
+    mean: Mapped[float] = mapped_column(sa.Float(precision=2))
+    count: Mapped[int] = mapped_column()
+
+
+class SensorHourlyRollup(BaseSensorRollup):
+    __tablename__ = "sensor_records_hourly"
+
+
+class SensorDailyRollup(BaseSensorRollup):
+    __tablename__ = "sensor_records_daily"
+
+
+class CompactionState(Base):  # ty: ignore[unsupported-base]
+    """The progress of a database compaction task"""
+    __tablename__ = "compaction_state"
+
+    name: Mapped[str] = mapped_column(sa.String(length=32), primary_key=True)
+    last_id: Mapped[int] = mapped_column(default=0)  # The last row processed
+
 
 def _get_actuator_group(context) -> str:
     params = context.get_current_parameters()
@@ -286,3 +428,18 @@ class ActuatorBuffer(BaseActuatorRecord, DataBufferMixin):
             session=session,
             per_page=per_page,
         )
+
+    @classmethod
+    async def get_buffered_page(
+            cls,
+            session: AsyncSession,
+            after_id: int = 0,
+            per_page: int = 50,
+    ) -> tuple[gv.BufferedActuatorsStatePayload, int] | None:
+        return await cls._get_buffered_page(
+            buffered_record_class=gv.BufferedActuatorRecord,
+            buffered_payload_model=gv.BufferedActuatorsStatePayload,
+            session=session,
+            after_id=after_id,
+            per_page=per_page,
+        )
@@ -1,55 +1,103 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import typing as t
 
+from apscheduler.triggers.cron import CronTrigger
 from sqlalchemy.ext.asyncio import AsyncSession
 
-import gaia_validators as gv
-
-from gaia.database.models import SensorBuffer, SensorRecord
-from gaia.utils import humanize_list
+from gaia.database.models import SensorBuffer, SensorRecord, SensorRecordDict
 
 
 if t.TYPE_CHECKING:  # pragma: no cover
+    from gaia.data_bus import SensorsFrameMessage
     from gaia.engine import Engine
+    from gaia.sensors_frame import SensorsFrame
+
+
+def _format_sensors_frame(
+        ecosystem_uid: str,
+        sensors_frame: SensorsFrame,
+) -> list[SensorRecordDict]:
+    timestamp: datetime = sensors_frame.timestamp
+    timestamp = timestamp.astimezone(timezone.utc)
+    timestamp.replace(second=0, microsecond=0)  # cleaner format
+    return [
+        {
+            "sensor_uid": sensor_uid,
+            "ecosystem_uid": ecosystem_uid,
+            "measure": measure,
+            "timestamp": timestamp,
+            "value": value,
+        }
+        for sensor_uid, measure, value in sensors_frame
+    ]
 
 
-async def log_sensors_data(
+async def _add_sensors_records(
+        session: AsyncSession,
         engine: Engine,
-) -> None:
-    logged_ecosystem: set[str] = set()
-    # This function should never be called when the DB is not enabled
-    assert engine._db is not None
-    async with engine.db.scoped_session() as session:
-        session: AsyncSession
-        for ecosystem_uid, ecosystem in engine.ecosystems.items():
-            sensors_data = ecosystem.sensors_data
-            database_management = ecosystem.config.get_management("database")
-            if isinstance(sensors_data, gv.SensorsData) and database_management:
-                timestamp: datetime = sensors_data.timestamp
-                timestamp = timestamp.astimezone(timezone.utc)
-                timestamp.replace(second=0, microsecond=0)  # cleaner format
-                for sensor_record in sensors_data.records:
-                    if sensor_record.value is None:
-                        continue
-                    formatted_data = {
-                        "sensor_uid": sensor_record.sensor_uid,
-                        "ecosystem_uid": ecosystem_uid,
-                        "measure": sensor_record.measure,
-                        "timestamp": timestamp,
-                        "value": sensor_record.value,
-                    }
-                    sensor_record = SensorRecord(**formatted_data)
-                    session.add(sensor_record)
-                    if (
-                            engine.message_broker_started
-                            and not engine.event_handler.is_connected()
-                    ) or engine.config.app_config.TESTING:
-                        sensor_buffer = SensorBuffer(**formatted_data)
-                        session.add(sensor_buffer)
-                    logged_ecosystem.add(ecosystem_uid)
-        await session.commit()
-    if logged_ecosystem:
-        engine.logger.debug(
-            f"Logged sensors data for {humanize_list(list(logged_ecosystem))}.")
+        records: list[SensorRecordDict],
+) -> bool:
+    if not records:
+        return False
+    buffer_data = (
+        engine.message_broker_started
+        and not engine.event_handler.is_connected()
+    ) or engine.config.app_config.TESTING
+    await SensorRecord.insert_many(session, records)
+    if buffer_data:
+        await SensorBuffer.insert_many(session, records)
+    return True
+
+
+class SensorsDataLogger:
+    """Log the sensors frames published on the engine data bus
+
+    Only the first frame published at or after each time slot of the cron
+    expression is logged, so the logging cadence is independent of the sensors
+    loop period.
+
+    :param engine: the engine whose database is used.
+    :param cron_minute: the minute field of the cron expression defining the
+                        logging slots.
+    """
+    def __init__(self, engine: Engine, cron_minute: str) -> None:
+        self.engine: Engine = engine
+        self._trigger: CronTrigger = CronTrigger(
+            minute=cron_minute, second=0, timezone=timezone.utc)
+        self._next_slots: dict[str, datetime] = {}
+
+    def _get_next_slot(self, after: datetime) -> datetime:
+        next_slot = self._trigger.get_next_fire_time(
+            None, after + timedelta(microseconds=1))
+        assert next_slot is not None
+        return next_slot
+
+    def is_due(self, ecosystem_uid: str, timestamp: datetime) -> bool:
+        try:
+            next_slot = self._next_slots[ecosystem_uid]
+        except KeyError:
+            # First frame of the ecosystem, wait for the next slot
+            self._next_slots[ecosystem_uid] = self._get_next_slot(timestamp)
+            return False
+        return timestamp >= next_slot
+
+    async def __call__(self, message: SensorsFrameMessage) -> None:
+        ecosystem_uid = message.ecosystem_uid
+        sensors_frame = message.frame
+        if sensors_frame is None:
+            return
+        if not self.is_due(ecosystem_uid, sensors_frame.timestamp):
+            return
+        self._next_slots[ecosystem_uid] = self._get_next_slot(sensors_frame.timestamp)
+        ecosystem = self.engine.ecosystems.get(ecosystem_uid)
+        if ecosystem is None or not ecosystem.config.get_management("database"):
+            return
+        records = _format_sensors_frame(ecosystem_uid, sensors_frame)
+        async with self.engine.db.scoped_session() as session:
+            session: AsyncSession
+            logged = await _add_sensors_records(session, self.engine, records)
+            await session.commit()
+        if logged:
+            self.engine.logger.debug(f"Logged sensors data for {ecosystem_uid}.")
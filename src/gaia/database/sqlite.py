@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from logging import getLogger, Logger
+import typing as t
+from typing import Any, Literal, Type
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine as SQLEngine
+
+from gaia.utils import humanize_list
+
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy_wrapper import AsyncSQLAlchemyWrapper
+
+    from gaia.database.models import Base
+
+
+db_logger: Logger = getLogger("gaia.engine.db")
+
+
+CheckpointMode = Literal["PASSIVE", "FULL", "RESTART", "TRUNCATE"]
+
+
+# PRAGMAs applied on every new SQLite connection, by storage profile
+STORAGE_PROFILES: dict[str, dict[str, str | int]] = {
+    # Keep the SQLite defaults
+    "default": {},
+    # Readers and writers do not block each other and the data is only synced
+    #  to the disk at checkpoints, which suits SD cards
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16_000,  # in KiB as it is negative
+        "mmap_size": 64 * 1024 ** 2,  # in bytes
+        "temp_store": "MEMORY",
+        "busy_timeout": 5_000,  # in ms
+    },
+    # Same as 'balanced' with a smaller memory footprint
+    "low_memory": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -2_000,  # in KiB as it is negative
+        "mmap_size": 0,  # in bytes
+        "temp_store": "MEMORY",
+        "busy_timeout": 5_000,  # in ms
+    },
+}
+
+
+def get_sqlite_pragmas(
+        profile: str,
+        overrides: dict[str, str | int] | None = None,
+) -> dict[str, str | int]:
+    """Get the PRAGMAs of a storage profile, updated with `overrides`."""
+    try:
+        pragmas = STORAGE_PROFILES[profile]
+    except KeyError:
+        raise ValueError(
+            f"Unknown database storage profile '{profile}'. Valid profiles "
+            f"are {humanize_list([*STORAGE_PROFILES.keys()])}."
+        )
+    pragmas = {**pragmas, **(overrides or {})}
+    for name, value in pragmas.items():
+        # PRAGMAs cannot be parametrized, only allow plain values
+        if not name.isidentifier() or not str(value).lstrip("-").isalnum():
+            raise ValueError(f"Invalid PRAGMA '{name}={value}'.")
+    return pragmas
+
+
+def set_sqlite_pragmas(engine: SQLEngine, pragmas: dict[str, str | int]) -> None:
+    """Apply `pragmas` on every new connection of `engine`."""
+    statements = [f"PRAGMA {name}={value}" for name, value in pragmas.items()]
+
+    def apply_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    event.listen(engine, "connect", apply_pragmas)
+
+
+async def configure_sqlite(
+        db: AsyncSQLAlchemyWrapper,
+        db_model: Type[Base],
+        pragmas: dict[str, str | int],
+) -> bool:
+    """Apply `pragmas` on the new connections of the database, if it uses
+    SQLite.
+
+    Should be called before the database is first used, as the connections
+    already opened are not modified.
+
+    :param db: the database to configure.
+    :param db_model: a model of the database, used to find its engine.
+    :param pragmas: the PRAGMAs to apply.
+    :return: Whether the database uses SQLite.
+    """
+    async with db.scoped_session() as session:
+        bind = session.get_bind(mapper=db_model)
+    if bind.dialect.name != "sqlite":
+        return False
+    if pragmas:
+        set_sqlite_pragmas(bind.engine, pragmas)
+        db_logger.debug(
+            f"SQLite connections will use the PRAGMAs "
+            f"{humanize_list([f'{name}={value}' for name, value in pragmas.items()])}.")
+    return True
+
+
+async def checkpoint_wal(
+        db: AsyncSQLAlchemyWrapper,
+        db_model: Type[Base],
+        mode: CheckpointMode = "PASSIVE",
+) -> None:
+    """Copy the content of the SQLite write-ahead log into the database.
+
+    A 'PASSIVE' checkpoint does not wait for the readers and writers, a
+    'TRUNCATE' one waits for them and empties the log file.
+
+    :param db: the database to checkpoint.
+    :param db_model: a model of the database, used to find its engine.
+    :param mode: the checkpoint mode.
+    """
+    try:
+        async with db.scoped_session() as session:
+            result = await session.execute(
+                text(f"PRAGMA wal_checkpoint({mode})"),
+                bind_arguments={"mapper": db_model},
+            )
+            busy, log_pages, checkpointed_pages = result.one()
+    except Exception as e:
+        db_logger.error(
+            f"Encountered an error while checkpointing the database. "
+            f"ERROR msg: `{e.__class__.__name__}: {e}`.")
+        return
+    db_logger.debug(
+        f"Database checkpoint: {checkpointed_pages}/{log_pages} pages of the "
+        f"write-ahead log copied{' (busy)' if busy else ''}.")
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import asyncio
+from asyncio import Event, Task
+from collections import deque
+from logging import getLogger, Logger
+from time import monotonic
+import typing as t
+from typing import Any, Type
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy_wrapper import AsyncSQLAlchemyWrapper
+
+    from gaia.database.models import Base
+
+
+# Rows kept in memory while the database cannot be written to
+MAX_PENDING_ROWS = 10_000
+# Minimal time between two warnings about dropped rows
+DROP_WARNING_INTERVAL = 60.0  # in s
+
+PendingRow = tuple[Type["Base"], dict[str, Any]]
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether a failed write is worth retrying as is later."""
+    if not isinstance(error, OperationalError):
+        return False
+    if error.connection_invalidated:
+        return True
+    message = str(error.orig).lower()
+    return "locked" in message or "busy" in message
+
+
+class WriteBehindQueue:
+    """Buffer database rows and write them in batches
+
+    Rows are added without waiting for the database and written in a single
+    transaction when `batch_size` rows are pending or every `flush_interval`
+    seconds, whichever comes first. Stopping the queue writes the rows still
+    pending.
+
+    Batches failing because the database is temporarily unavailable are
+    retried at the next flush, other failing batches are written row by row
+    and the invalid rows are dropped. When more than `MAX_PENDING_ROWS` rows
+    are pending, the oldest ones are dropped.
+
+    :param db: the database the rows are written to.
+    :param batch_size: the number of pending rows triggering a write.
+    :param flush_interval: the longest time a row is kept pending, in seconds.
+    """
+    def __init__(
+            self,
+            db: AsyncSQLAlchemyWrapper,
+            batch_size: int = 64,
+            flush_interval: float = 5.0,
+    ) -> None:
+        self.db: AsyncSQLAlchemyWrapper = db
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+        self.logger: Logger = getLogger("gaia.engine.db_writer")
+        self._pending: deque[PendingRow] = deque()
+        self._batch_ready: Event = Event()
+        self._flush_lock: asyncio.Lock = asyncio.Lock()
+        self._task: Task | None = None
+        self._closing: bool = False
+        self._dropped: int = 0
+        self._last_drop_warning: float = -DROP_WARNING_INTERVAL
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"{self.__class__.__name__}(pending={len(self._pending)})"
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def _drop_oldest(self) -> None:
+        overflow = len(self._pending) - MAX_PENDING_ROWS
+        if overflow <= 0:
+            return
+        for _ in range(overflow):
+            self._pending.popleft()
+        self._dropped += overflow
+        now = monotonic()
+        if now - self._last_drop_warning >= DROP_WARNING_INTERVAL:
+            self.logger.warning(
+                f"Too many rows pending, dropped the {self._dropped} oldest "
+                f"ones.")
+            self._dropped = 0
+            self._last_drop_warning = now
+
+    def add(self, db_model: Type[Base], **values: Any) -> None:
+        """Queue a row to be written."""
+        self._pending.append((db_model, values))
+        self._drop_oldest()
+        if len(self._pending) >= self.batch_size:
+            self._batch_ready.set()
+
+    async def _write(self, rows: list[PendingRow]) -> None:
+        async with self.db.scoped_session() as session:
+            session: AsyncSession
+            session.add_all([
+                db_model(**values) for db_model, values in rows
+            ])
+            await session.commit()
+
+    async def _write_row_by_row(self, rows: list[PendingRow]) -> int:
+        written = 0
+        for row in rows:
+            try:
+                await self._write([row])
+            except Exception as e:
+                db_model, values = row
+                self.logger.error(
+                    f"Encountered an error while writing a row in "
+                    f"'{db_model.__tablename__}', it will be dropped. Row: "
+                    f"{values}. ERROR msg: `{e.__class__.__name__}: {e}`.")
+            else:
+                written += 1
+        return written
+
+    async def flush(self) -> int:
+        """Write all the pending rows in a single transaction.
+
+        :return: The number of rows written.
+        """
+        async with self._flush_lock:
+            self._batch_ready.clear()
+            if not self._pending:
+                return 0
+            rows = [*self._pending]
+            self._pending.clear()
+            try:
+                await self._write(rows)
+            except Exception as e:
+                if _is_transient(e):
+                    self.logger.warning(
+                        f"Could not write {len(rows)} rows, they will be "
+                        f"retried later. ERROR msg: "
+                        f"`{e.__class__.__name__}: {e}`.")
+                    # Put the rows back in front of the ones added in the
+                    #  meantime, the oldest ones are dropped on overflow
+                    self._pending.extendleft(reversed(rows))
+                    self._drop_oldest()
+                    return 0
+                self.logger.error(
+                    f"Encountered an error while writing {len(rows)} rows, "
+                    f"writing them one by one. ERROR msg: "
+                    f"`{e.__class__.__name__}: {e}`.")
+                written = await self._write_row_by_row(rows)
+            else:
+                written = len(rows)
+            self.logger.debug(f"Wrote {written} rows.")
+            return written
+
+    async def _flush_loop(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(
+                    self._batch_ready.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is not None:  # pragma: no cover
+            raise RuntimeError("The write-behind queue is already running.")
+        self._closing = False
+        self._task = asyncio.create_task(
+            self._flush_loop(), name="db_writer-flush_loop")
+
+    async def stop(self) -> None:
+        """Stop the background flushes and write the rows still pending."""
+        if self._task is not None:
+            # Don't cancel the loop, it could be in the middle of a write
+            self._closing = True
+            self._batch_ready.set()
+            await self._task
+            self._task = None
+        await self.flush()
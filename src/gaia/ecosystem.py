@@ -20,6 +20,8 @@ from gaia.virtual import VirtualEcosystem
 if typing.TYPE_CHECKING:  # pragma: no cover
     from gaia.engine import Engine
     from gaia.events import Events
+    from gaia.sensors_frame import SensorsFrame
+    from gaia.time_series import SensorsHistory
 
 
 class _EcosystemPayloads:
@@ -537,6 +539,13 @@ class Ecosystem:
             if in_config is None:
                 # Hardware was removed from config, go to next
                 continue
+            # The sampling period is handled by the Sensors subroutine, a
+            #  change does not require to remount the hardware
+            in_config = {
+                key: value
+                for key, value in in_config.items()
+                if key != "sampling_period"
+            }
             # /!\ Do not hold a reference to hardware or its reference count will never reach 0
             current = gv.to_anonymous(self.hardware[hardware_uid].dict_repr(), "uid")
             # When virtualization is enabled, the mounted hardware's model gets
@@ -565,6 +574,9 @@ class Ecosystem:
         for pid in self.actuator_hub.pids.values():
             pid.reset()
             pid.reset_direction()
+        # Invalidate the values derived from the hardware, including the
+        #  cached payloads
+        self.config._bump_generation()
 
     async def terminate_hardware(self) -> None:
         """Terminate and dismount all hardware.
@@ -712,6 +724,20 @@ class Ecosystem:
             return sensors_subroutine.sensors_data
         return gv.Empty()
 
+    @property
+    def sensors_frame(self) -> SensorsFrame | None:
+        if self.get_subroutine_status("sensors"):
+            sensors_subroutine: Sensors = self.get_subroutine("sensors")
+            return sensors_subroutine.sensors_frame
+        return None
+
+    @property
+    def sensors_history(self) -> SensorsHistory | None:
+        if self.get_subroutine_status("sensors"):
+            sensors_subroutine: Sensors = self.get_subroutine("sensors")
+            return sensors_subroutine.history
+        return None
+
     # Light
     async def _send_nycthemeral_info(self) -> None:
         try:
@@ -5,19 +5,24 @@ from asyncio import Event, sleep, Task
 from enum import Enum
 import logging
 import logging.config
-from math import ceil
 import signal
 import threading
 import typing as t
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 
 import gaia_validators as gv
 
+from gaia.actuator_handler import ActuatorsDataOutbox
 from gaia.config.from_files import CacheType, EngineConfig
+from gaia.data_bus import DataBus
 from gaia.ecosystem import Ecosystem
 from gaia.hardware.abc import WebSocketAddressMixin
+from gaia.hardware.utils import stop_i2c_bus_scheduler
+from gaia.picture_encoder import stop_picture_encoder
+from gaia.timer_wheel import get_timer_wheel, stop_timer_wheel, TimerWheel
 from gaia.utils import humanize_list, SingletonMeta
 from gaia.virtual import VirtualWorld
 
@@ -26,6 +31,8 @@ if t.TYPE_CHECKING:  # pragma: no cover
     from dispatcher import AsyncDispatcher
     from sqlalchemy_wrapper import AsyncSQLAlchemyWrapper
 
+    from gaia.data_bus import SensorsFrameMessage
+    from gaia.database.write_behind import WriteBehindQueue
     from gaia.events import Events
 
 
@@ -61,6 +68,8 @@ class Engine(metaclass=SingletonMeta):
         self._uid: str = self.config.app_config.ENGINE_UID
         self._virtual_world: VirtualWorld | None = None
         self._scheduler: AsyncIOScheduler = AsyncIOScheduler()
+        self._data_bus: DataBus = DataBus()
+        self._actuators_outbox: ActuatorsDataOutbox = ActuatorsDataOutbox(self)
         if self.config.app_config.VIRTUALIZATION:
             self.logger.info("Using ecosystem virtualization.")
             virtual_cfg = self.config.app_config.VIRTUALIZATION_PARAMETERS
@@ -70,6 +79,8 @@ class Engine(metaclass=SingletonMeta):
         self._event_handler: Events | None = None
         self._db: AsyncSQLAlchemyWrapper | None = None
         self._db_started: bool = False
+        self._db_is_sqlite: bool = False
+        self._db_writer: WriteBehindQueue | None = None
         self.plugins_initialized: bool = False
         self._task: Task | None = None
         self._stop_event = Event()
@@ -116,6 +127,14 @@ class Engine(metaclass=SingletonMeta):
         # Stop background tasks (scheduler.running is an APScheduler property)
         if self.scheduler.running:
             self.stop_background_tasks()
+        # Stop the data bus subscribers
+        self.data_bus.clear()
+        # Release the I2C bus worker thread
+        await stop_i2c_bus_scheduler()
+        # Cancel the pending countdowns
+        await stop_timer_wheel()
+        # Stop the picture encoding workers
+        await stop_picture_encoder()
         # Reset references
         WebSocketAddressMixin._websocket_manager = None
         self._db = None
@@ -142,6 +161,18 @@ class Engine(metaclass=SingletonMeta):
     def scheduler(self) -> AsyncIOScheduler:
         return self._scheduler
 
+    @property
+    def data_bus(self) -> DataBus:
+        return self._data_bus
+
+    @property
+    def actuators_outbox(self) -> ActuatorsDataOutbox:
+        return self._actuators_outbox
+
+    @property
+    def timer_wheel(self) -> TimerWheel:
+        return get_timer_wheel()
+
     # ---------------------------------------------------------------------------
     #   Events dispatcher
     # ---------------------------------------------------------------------------
@@ -214,12 +245,24 @@ class Engine(metaclass=SingletonMeta):
         self.message_broker.register_event_handler(events_handler)
         self.event_handler = events_handler
 
+    async def _send_sensors_data(self, message: SensorsFrameMessage) -> None:
+        await self.event_handler.send_payload_if_connected(
+            "sensors_data", ecosystem_uids=[message.ecosystem_uid])
+
     async def start_message_broker(self) -> None:
         self.logger.info("Starting the event dispatcher.")
         await self.message_broker.start(retry=True, block=False)
+        self.data_bus.subscribe("sensors_frame", "ouranos", self._send_sensors_data)
 
     async def stop_message_broker(self) -> None:
         self.logger.info("Stopping the event dispatcher.")
+        self.data_bus.unsubscribe("sensors_frame", "ouranos")
+        # Save and send the changes of the last CRUD requests
+        await self.event_handler.flush_crud_changes()
+        # Send (or buffer) the actuators states still pending
+        await self.actuators_outbox.stop()
+        await self.event_handler.stop_outbound_queue()
+        await self.event_handler.close_http_session()
         await self.message_broker.stop()
 
     @property
@@ -279,6 +322,15 @@ class Engine(metaclass=SingletonMeta):
             if key.isupper()
         }
         self.db.init(dict_cfg)
+        # Configure the SQLite connections before the first one is opened
+        from gaia.database.models import SensorRecord
+        from gaia.database.sqlite import configure_sqlite, get_sqlite_pragmas
+
+        pragmas = get_sqlite_pragmas(
+            self.config.app_config.DATABASE_STORAGE_PROFILE,
+            self.config.app_config.DATABASE_PRAGMAS,
+        )
+        self._db_is_sqlite = await configure_sqlite(self.db, SensorRecord, pragmas)
         await self.db.create_all()
 
     async def _reset_db_exchanges_uuid(self) -> None:
@@ -293,36 +345,77 @@ class Engine(metaclass=SingletonMeta):
     async def start_database(self) -> None:
         self.logger.info("Starting the database.")
         await self._reset_db_exchanges_uuid()
+        # Start the write-behind queue used for frequent small writes
+        from gaia.database.write_behind import WriteBehindQueue
+
+        self._db_writer = WriteBehindQueue(
+            self.db,
+            batch_size=self.config.app_config.DATABASE_WRITE_BATCH_SIZE,
+            flush_interval=self.config.app_config.DATABASE_WRITE_INTERVAL,
+        )
+        self._db_writer.start()
+        # Regularly copy the SQLite write-ahead log into the database
+        checkpoint_period = self.config.app_config.DATABASE_CHECKPOINT_PERIOD
+        if self._db_is_sqlite and checkpoint_period:
+            from gaia.database.models import SensorRecord
+            from gaia.database.sqlite import checkpoint_wal
+
+            self.scheduler.add_job(
+                func=checkpoint_wal,
+                args=(self.db, SensorRecord),
+                id="checkpoint_database",
+                trigger=IntervalTrigger(seconds=checkpoint_period),
+                misfire_grace_time=checkpoint_period,
+            )
+        # Regularly roll up the sensor records and delete the old raw records
+        compaction_period = self.config.app_config.DATABASE_COMPACTION_PERIOD
+        if compaction_period:
+            from gaia.database.compaction import compact_database
+
+            self.scheduler.add_job(
+                func=compact_database,
+                args=(self.db, self.config.app_config.DATABASE_RECORDS_RETENTION),
+                id="compact_database",
+                trigger=IntervalTrigger(seconds=compaction_period),
+                misfire_grace_time=compaction_period,
+            )
         # Set up logging routines
         from gaia.database import routines
 
         if self.config.app_config.SENSORS_LOGGING_PERIOD is not None:
             cron_minute: str = self.config.app_config.SENSORS_LOGGING_PERIOD
-            loop_period = self.config.app_config.SENSORS_LOOP_PERIOD
-            seconds_offset = ceil(loop_period * 1.5)
-            self.scheduler.add_job(
-                func=routines.log_sensors_data,
-                kwargs={"engine": self},
-                id="log_sensors_data",
-                trigger=CronTrigger(
-                    minute=cron_minute,
-                    second=seconds_offset,
-                    jitter=1.5,
-                ),
-                misfire_grace_time=10,
-            )
+            # Log the first sensors frame published in each logging period
+            sensors_data_logger = routines.SensorsDataLogger(self, cron_minute)
+            self.data_bus.subscribe("sensors_frame", "db_logger", sensors_data_logger)
         self._db_started = True
 
     async def stop_database(self) -> None:
         self.logger.info("Stopping the database.")
-        if self.config.app_config.SENSORS_LOGGING_PERIOD:
-            self.scheduler.remove_job("log_sensors_data")
+        self.data_bus.unsubscribe("sensors_frame", "db_logger")
+        # Write the rows still pending
+        if self._db_writer is not None:
+            await self._db_writer.stop()
+            self._db_writer = None
+        for job_id in ("checkpoint_database", "compact_database"):
+            if self.scheduler.get_job(job_id) is not None:
+                self.scheduler.remove_job(job_id)
+        if self._db_is_sqlite:
+            # Leave an empty write-ahead log behind
+            from gaia.database.models import SensorRecord
+            from gaia.database.sqlite import checkpoint_wal
+
+            await checkpoint_wal(self.db, SensorRecord, "TRUNCATE")
         self._db_started = False
 
     @property
     def db_started(self) -> bool:
         return self._db_started
 
+    @property
+    def db_writer(self) -> WriteBehindQueue | None:
+        """The write-behind queue of the database, None if it is not started."""
+        return self._db_writer
+
     @property
     def db(self) -> AsyncSQLAlchemyWrapper:
         if self._db is None:
@@ -405,7 +498,9 @@ class Engine(metaclass=SingletonMeta):
             ecosystem_uids: str | list[str] | None = None,
     ) -> None:
         if self.message_broker_started and self.event_handler.registered:
-            await self.event_handler.send_ecosystems_info(ecosystem_uids=ecosystem_uids)
+            # Ouranos already has the info that did not change since last sent
+            await self.event_handler.send_ecosystems_info(
+                ecosystem_uids=ecosystem_uids, only_changed=True)
 
     async def _loop(self) -> None:
         while True:
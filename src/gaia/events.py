@@ -8,6 +8,7 @@ import asyncio
 from asyncio import sleep, Task
 from datetime import datetime, timezone
 from functools import wraps
+import hashlib
 import inspect
 import logging
 from time import monotonic
@@ -15,20 +16,30 @@ import typing as t
 from typing import Callable, cast, Iterator, Literal, NamedTuple, Type, TypeVar
 from uuid import UUID
 
-from pydantic import RootModel, ValidationError
+from anyio.to_thread import run_sync
+import orjson
+from pydantic import Field, RootModel, ValidationError
 
 from dispatcher import AsyncEventHandler
 import gaia_validators as gv
 
 from gaia import Ecosystem, Engine
 from gaia.config.from_files import ConfigType
-from gaia.dependencies.camera import SerializableImagePayload
 from gaia.ecosystem import _EcosystemPayloads
+from gaia.outbound_queue import OutboundQueue, Priority
+from gaia.picture_encoder import get_picture_encoder
 from gaia.utils import humanize_list, local_ip_address
+from gaia.wire_format import (
+    COMPACT_SENSORS_DATA, compress_serialized_payload, COMPRESSED_PAYLOADS,
+    COMPRESSION_THRESHOLD, encode_sensors_frames, SensorsDataDictionary, serialize_payload, SUPPORTED_WIRE_FORMATS)
 
 
 if t.TYPE_CHECKING:  # pragma: no cover
+    from aiohttp import ClientSession
     from gaia_validators.image import SerializableImage
+
+    from gaia.database.models import DataBufferMixin
+    from gaia.timer_wheel import TimerHandle
     from sqlalchemy_wrapper import AsyncSQLAlchemyWrapper
 
 
@@ -52,8 +63,71 @@ PayloadName = Literal[
 
 
 ENGINE_PAYLOADS: frozenset[PayloadName] = frozenset({"places_list"})
+# Payloads only derived from the configuration. They are served from a cache
+#  until the config generation changes
+CACHED_PAYLOADS: frozenset[PayloadName] = frozenset({
+    "base_info",
+    "chaos_parameters",
+    "climate",
+    "hardware",
+    "management",
+    "nycthemeral_info",
+    "places_list",
+    "plants",
+    "weather",
+})
 HEARTBEAT_TIMEOUT: float = 30.0
 PING_INTERVAL: float = 15.0
+# Priority class of the events emitted, the events not listed are 'control'
+EVENT_PRIORITIES: dict[str, Priority] = {
+    "actuators_data": Priority.state,
+    "buffered_actuators_data": Priority.data,
+    "buffered_sensors_data": Priority.data,
+    "health_data": Priority.data,
+    "sensors_data": Priority.data,
+    "compact_sensors_data": Priority.data,
+    "picture_arrays": Priority.bulk,
+}
+# Events whose payloads can be large enough to be worth compressing, the other
+#  ones are not even serialized to check their size
+COMPRESSIBLE_EVENTS: frozenset[str] = frozenset({
+    "buffered_actuators_data",
+    "buffered_sensors_data",
+    "climate",
+    "hardware",
+    "plants",
+})
+# Buffered data exchanges sent and not yet acknowledged by Ouranos
+BUFFERED_DATA_WINDOW: int = 4
+# Time to wait for an acknowledgment before pausing the buffered data replay
+BUFFERED_DATA_ACK_TIMEOUT: float = 60.0
+# Bounds of the number of rows per buffered data exchange ...
+BUFFERED_DATA_MIN_PAGE: int = 50
+BUFFERED_DATA_MAX_PAGE: int = 2000
+# ... which grows while exchanges are acknowledged faster than this, in seconds
+BUFFERED_DATA_TARGET_RTT: float = 1.0
+# Estimated serialized size of a buffered record, in bytes
+BUFFERED_RECORD_SIZE: int = 160
+# Maximum number of pictures uploaded at the same time
+MAX_CONCURRENT_UPLOADS: int = 4
+# Time given to a picture upload, in seconds
+UPLOAD_TIMEOUT: float = 3.0
+# Quiet time after a CRUD request before the config is saved, the ecosystems
+#  refreshed and the updated payloads sent, in seconds ...
+CRUD_SETTLE_DELAY: float = 0.5
+# ... unless the changes of a burst of requests are pending for longer than this
+CRUD_MAX_DELAY: float = 5.0
+# Maximum number of events emitted at the same time when sending ecosystems info
+MAX_CONCURRENT_EMITS: int = 4
+# Payloads sent by `Events.send_ecosystems_info()`, the payloads of a stage are
+#  emitted once the ones of the previous stage have been emitted
+ECOSYSTEMS_INFO_PAYLOADS: tuple[tuple[PayloadName, ...], ...] = (
+    ("places_list", "base_info"),
+    (
+        "management", "chaos_parameters", "nycthemeral_info", "climate",
+        "weather", "hardware", "plants", "actuators_data",
+    ),
+)
 
 
 payload_classes_dict: dict[PayloadName, Type[gv.EcosystemPayload]] = {
@@ -72,6 +146,50 @@ payload_classes_dict: dict[PayloadName, Type[gv.EcosystemPayload]] = {
 }
 
 
+def _hash_payload(payload_dict: gv.EcosystemPayloadDict) -> tuple[bytes, int]:
+    """Get the hash of a payload and its serialized size, in bytes."""
+    serialized = orjson.dumps(
+        payload_dict,
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+        default=str,
+    )
+    return hashlib.blake2b(serialized, digest_size=16).digest(), len(serialized)
+
+
+class _BufferedExchange(NamedTuple):
+    buffer_cls: Type[DataBufferMixin]
+    sent_at: float
+
+
+class _PreparedPayload(NamedTuple):
+    payload_name: PayloadName
+    # None if the payload did not change since last sent
+    payload: gv.EcosystemPayloadDict | list[gv.EcosystemPayloadDict] | None
+    hashes: dict[str, bytes]
+    # Serialized size of the payload of each ecosystem, in bytes
+    sizes: dict[str, int]
+
+    @property
+    def size(self) -> int:
+        payload = self.payload
+        if payload is None:
+            return 0
+        return sum(
+            self.sizes[payload_dict["uid"]]
+            for payload_dict in (payload if isinstance(payload, list) else [payload])
+        )
+
+
+class EngineRegistrationAckDict(gv.EngineRegistrationAckDict):
+    wire_formats: list[str]
+
+
+class EngineRegistrationAck(gv.EngineRegistrationAck):
+    # The wire formats Ouranos accepts on top of the default payloads. Empty if
+    #  Ouranos predates their negotiation
+    wire_formats: list[str] = Field(default_factory=list)
+
+
 class CrudLinks(NamedTuple):
     func_or_attr_name: str
     payload_name: PayloadName
@@ -172,6 +290,34 @@ class Events(AsyncEventHandler):
         app_config = self.engine.config.app_config
         self._compression_format: str | None = app_config.PICTURE_COMPRESSION_FORMAT
         self._resize_ratio: float = app_config.PICTURE_RESIZE_RATIO
+        # {(payload name, ecosystem or engine uid): (version, payload)}
+        self._payload_cache: dict[
+            tuple[PayloadName, str], tuple[tuple, gv.EcosystemPayloadDict]] = {}
+        # {(payload name, ecosystem or engine uid): hash of the last payload sent}
+        self._sent_payload_hashes: dict[tuple[PayloadName, str], bytes] = {}
+        self._outbound_queue: OutboundQueue = OutboundQueue(self._emit_now)
+        # Wire formats negotiated during the registration
+        self.wire_formats: frozenset[str] = frozenset()
+        self._sensors_data_dictionary: SensorsDataDictionary = SensorsDataDictionary()
+        self._sent_dictionary_version: int | None = None
+        # Buffered data replay
+        self._buffered_exchanges: dict[UUID, _BufferedExchange] = {}
+        self._buffered_data_window: asyncio.Semaphore = asyncio.Semaphore(BUFFERED_DATA_WINDOW)
+        self._buffered_page_size: int = BUFFERED_DATA_MIN_PAGE
+        # Set when the replay stopped before all the data was sent, a late
+        #  acknowledgment resumes it
+        self._buffered_replay_paused: bool = False
+        self._buffered_replay_task: Task | None = None
+        # CRUD requests coalescing
+        # {payload name: uids of the ecosystems to send it for, None for all}
+        self._pending_crud_payloads: dict[PayloadName, set[str] | None] = {}
+        self._crud_flush_handle: TimerHandle | None = None
+        self._crud_burst_start: float = 0.0
+        self._crud_flush_lock: asyncio.Lock = asyncio.Lock()
+        # Pictures upload
+        self._http_session: ClientSession | None = None
+        self._http_session_token: str | None = None
+        self._http_session_lock: asyncio.Lock = asyncio.Lock()
         self.logger = logging.getLogger("gaia.engine.events_handler")
 
     @property
@@ -196,6 +342,80 @@ class Events(AsyncEventHandler):
     def _format_error(e: Exception) -> str:
         return f"ERROR msg: `{e.__class__.__name__}: {e}`"
 
+    # ---------------------------------------------------------------------------
+    #   Outbound queue
+    # ---------------------------------------------------------------------------
+    @property
+    def outbound_metrics(self) -> dict[str, dict[str, int]]:
+        return self._outbound_queue.metrics
+
+    async def _emit_now(self, event: str, **kwargs: t.Any) -> bool:
+        return await super().emit(event, **kwargs)
+
+    async def emit(
+            self,
+            event: str,
+            priority: Priority | None = None,
+            size: int | None = None,
+            **kwargs: t.Any,
+    ) -> bool:
+        """Emit an event through the outbound queue
+
+        The event is queued in its priority class, so control messages are
+        sent before the data and pictures already waiting. If Ouranos accepts
+        compressed payloads, the large data of the `COMPRESSIBLE_EVENTS` is
+        compressed first.
+
+        :param event: the name of the event.
+        :param priority: the priority class of the event. Defaults to the one
+                         from `EVENT_PRIORITIES`.
+        :param size: the serialized size of the data, in bytes, if known. Used
+                     for the back-pressure of the outbound queue.
+        :param kwargs: the arguments of the dispatcher `emit()` method.
+        :return: Whether the event was sent. False if it was dropped or
+                 expired while waiting in the queue.
+        """
+        if priority is None:
+            priority = EVENT_PRIORITIES.get(event, Priority.control)
+        if (
+                event in COMPRESSIBLE_EVENTS
+                and COMPRESSED_PAYLOADS in self.wire_formats
+                and "data" in kwargs
+        ):
+            kwargs["data"], data_size = await self._compress_payload(
+                event, kwargs["data"])
+            if data_size is not None:
+                size = data_size
+        return await self._outbound_queue.put(event, priority, size, **kwargs)
+
+    async def _compress_payload(self, event: str, data: t.Any) -> tuple[t.Any, int | None]:
+        """Compress the data of an event if it is worth it.
+
+        :return: The data to send and its size in bytes, if it is known.
+        """
+        if data is None or isinstance(data, (bytes, bytearray, memoryview)):
+            # Pictures and compact data are already encoded
+            return data, None
+        try:
+            serialized = serialize_payload(data)
+        except orjson.JSONEncodeError as e:
+            self.logger.warning(
+                f"Could not serialize event '{event}' data for compression, "
+                f"sending it uncompressed. {self._format_error(e)}.")
+            return data, None
+        if len(serialized) < COMPRESSION_THRESHOLD:
+            return data, len(serialized)
+        compressed = await run_sync(compress_serialized_payload, serialized)
+        if compressed is None:
+            return data, len(serialized)
+        self.logger.debug(
+            f"Event '{event}' data compressed from {len(serialized)} to "
+            f"{len(compressed)} bytes.")
+        return compressed, len(compressed)
+
+    async def stop_outbound_queue(self) -> None:
+        await self._outbound_queue.stop()
+
     # ---------------------------------------------------------------------------
     #   Background jobs
     # ---------------------------------------------------------------------------
@@ -274,12 +494,21 @@ class Events(AsyncEventHandler):
         self.logger.debug(
             f"Getting '{payload_name}' payload for {humanize_list(uids)}.")
         for uid in uids:
-            data = getattr(self.ecosystems[uid]._payloads, payload_name)
-            if isinstance(data, gv.Empty):
-                continue
-            payload_class = payload_classes_dict[payload_name]
-            payload: gv.EcosystemPayload = payload_class.from_base(uid, data)
-            payload_dict: gv.EcosystemPayloadDict = payload.model_dump()
+            ecosystem = self.ecosystems[uid]
+            version = (
+                self.engine.config.generation,
+                ecosystem.config.generation,
+                ecosystem.started,  # Used in 'base_info'
+            )
+            payload_dict = self._get_cached_payload(payload_name, uid, version)
+            if payload_dict is None:
+                data = getattr(ecosystem._payloads, payload_name)
+                if isinstance(data, gv.Empty):
+                    continue
+                payload_class = payload_classes_dict[payload_name]
+                payload: gv.EcosystemPayload = payload_class.from_base(uid, data)
+                payload_dict = payload.model_dump()
+                self._cache_payload(payload_name, uid, version, payload_dict)
             rv.append(payload_dict)
         return rv
 
@@ -292,40 +521,176 @@ class Events(AsyncEventHandler):
             self.logger.error(f"Payload for event '{payload_name}' is not defined.")
             return None
         # Get the data
-        data = getattr(self.engine, payload_name)
-        payload_class = payload_classes_dict[payload_name]
-        payload: gv.EcosystemPayload = payload_class.from_base(self.engine.uid, data)
-        payload_dict: gv.EcosystemPayloadDict = payload.model_dump()
+        version = (self.engine.config.generation, )
+        payload_dict = self._get_cached_payload(payload_name, self.engine.uid, version)
+        if payload_dict is None:
+            data = getattr(self.engine, payload_name)
+            payload_class = payload_classes_dict[payload_name]
+            payload: gv.EcosystemPayload = payload_class.from_base(self.engine.uid, data)
+            payload_dict = payload.model_dump()
+            self._cache_payload(payload_name, self.engine.uid, version, payload_dict)
         return payload_dict
 
+    def _get_cached_payload(
+            self,
+            payload_name: PayloadName,
+            uid: str,
+            version: tuple,
+    ) -> gv.EcosystemPayloadDict | None:
+        try:
+            cached_version, payload_dict = self._payload_cache[(payload_name, uid)]
+        except KeyError:
+            return None
+        if cached_version != version:
+            return None
+        return payload_dict
+
+    def _cache_payload(
+            self,
+            payload_name: PayloadName,
+            uid: str,
+            version: tuple,
+            payload_dict: gv.EcosystemPayloadDict,
+    ) -> None:
+        if payload_name in CACHED_PAYLOADS:
+            self._payload_cache[(payload_name, uid)] = (version, payload_dict)
+
+    def _filter_unchanged_payload(
+            self,
+            payload_name: PayloadName,
+            payload: gv.EcosystemPayloadDict | list[gv.EcosystemPayloadDict],
+            hashes: dict[str, bytes],
+    ) -> gv.EcosystemPayloadDict | list[gv.EcosystemPayloadDict] | None:
+        def changed(payload_dict: gv.EcosystemPayloadDict) -> bool:
+            uid = payload_dict["uid"]
+            return self._sent_payload_hashes.get((payload_name, uid)) != hashes[uid]
+
+        if isinstance(payload, list):
+            return [payload_dict for payload_dict in payload if changed(payload_dict)]
+        return payload if changed(payload) else None
+
+    def reset_sent_payloads(self) -> None:
+        """Forget which payloads were sent so the next ones are sent in full."""
+        self._sent_payload_hashes.clear()
+
+    def _prepare_payload(
+            self,
+            payload_name: PayloadName,
+            ecosystem_uids: str | list[str] | None = None,
+            only_changed: bool = False,
+    ) -> _PreparedPayload | None:
+        payload = self.get_payload(payload_name, ecosystem_uids)
+        if not payload:
+            self.logger.debug(f"No payload for event '{payload_name}' found.")
+            return None
+        hashes: dict[str, bytes] = {}
+        sizes: dict[str, int] = {}
+        for payload_dict in (payload if isinstance(payload, list) else [payload]):
+            uid = payload_dict["uid"]
+            hashes[uid], sizes[uid] = _hash_payload(payload_dict)
+        if only_changed:
+            payload = self._filter_unchanged_payload(payload_name, payload, hashes)
+            if not payload:
+                self.logger.debug(
+                    f"Payload for event '{payload_name}' unchanged since last sent.")
+                return _PreparedPayload(payload_name, None, hashes, sizes)
+        return _PreparedPayload(payload_name, payload, hashes, sizes)
+
+    async def _emit_prepared_payload(
+            self,
+            prepared: _PreparedPayload,
+            ttl: int | None = None,
+    ) -> bool:
+        payload_name, payload, hashes, _ = prepared
+        if payload is None:
+            # Unchanged since last sent
+            return True
+        try:
+            result = await self.emit(
+                payload_name, size=prepared.size, data=payload, ttl=ttl)  # ty: ignore[invalid-argument-type]
+        except Exception as e:
+            self.logger.error(
+                f"Encountered an error while emitting event '{payload_name}'. "
+                f"{self._format_error(e)}.")
+            return False
+        if result:
+            self.logger.debug(f"Payload for event '{payload_name}' sent.")
+            for payload_dict in (payload if isinstance(payload, list) else [payload]):
+                uid = payload_dict["uid"]
+                self._sent_payload_hashes[(payload_name, uid)] = hashes[uid]
+        else:
+            self.logger.warning(
+                f"Payload for event '{payload_name}' could not be sent.")
+        return result
+
     async def send_payload(
             self,
             payload_name: PayloadName,
             ecosystem_uids: str | list[str] | None = None,
             ttl: int | None = None,
+            only_changed: bool = False,
     ) -> bool:
+        """Emit a payload
+
+        :param payload_name: the name of the payload to emit.
+        :param ecosystem_uids: the uids of the ecosystems to include. Defaults
+                               to all the ecosystems.
+        :param ttl: the time to live of the event, in seconds.
+        :param only_changed: if True, the ecosystems whose payload is the same
+                             as the last one successfully sent are skipped.
+        """
         if payload_name == "picture_arrays":
             raise ValueError("'picture_arrays' need to be sent via a specific method.")
         self.logger.debug(f"Requested to emit event '{payload_name}'.")
-        payload = self.get_payload(payload_name, ecosystem_uids)
-        if payload:
-            try:
-                result = await self.emit(payload_name, data=payload, ttl=ttl)  # ty: ignore[invalid-argument-type]
-            except Exception as e:
-                self.logger.error(
-                    f"Encountered an error while emitting event '{payload_name}'. "
-                    f"{self._format_error(e)}.")
+        if payload_name == "sensors_data" and COMPACT_SENSORS_DATA in self.wire_formats:
+            return await self.send_compact_sensors_data(ecosystem_uids, ttl)
+        prepared = self._prepare_payload(payload_name, ecosystem_uids, only_changed)
+        if prepared is None:
+            return False
+        return await self._emit_prepared_payload(prepared, ttl)
+
+    async def send_compact_sensors_data(
+            self,
+            ecosystem_uids: str | list[str] | None = None,
+            ttl: int | None = None,
+    ) -> bool:
+        """Emit the sensors data in the compact format
+
+        The sensors frames are packed by `encode_sensors_frames()`. The
+        dictionary of the strings interned is emitted first when it gained
+        entries since it was last sent.
+
+        :param ecosystem_uids: the uids of the ecosystems to include. Defaults
+                               to all the ecosystems.
+        :param ttl: the time to live of the event, in seconds.
+        """
+        frames = [
+            (uid, frame)
+            for uid in self.filter_uids(ecosystem_uids)
+            if (frame := self.ecosystems[uid].sensors_frame) is not None
+        ]
+        if not frames:
+            self.logger.debug("No payload for event 'compact_sensors_data' found.")
+            return False
+        dictionary = self._sensors_data_dictionary
+        data = encode_sensors_frames(frames, dictionary)
+        if self._sent_dictionary_version != dictionary.version:
+            version = dictionary.version
+            result = await self.emit(
+                "sensors_data_dictionary", data=dictionary.as_dict())  # ty: ignore[invalid-argument-type]
+            if not result:
+                self.logger.warning(
+                    "Sensors data dictionary could not be sent, dropping the "
+                    "sensors data.")
                 return False
-            else:
-                if result:
-                    self.logger.debug(f"Payload for event '{payload_name}' sent.")
-                else:
-                    self.logger.warning(
-                        f"Payload for event '{payload_name}' could not be sent.")
-                return result
+            self._sent_dictionary_version = max(self._sent_dictionary_version or 0, version)
+        result = await self.emit("compact_sensors_data", data=data, ttl=ttl)
+        if result:
+            self.logger.debug("Payload for event 'compact_sensors_data' sent.")
         else:
-            self.logger.debug(f"No payload for event '{payload_name}' found.")
-            return False
+            self.logger.warning(
+                "Payload for event 'compact_sensors_data' could not be sent.")
+        return result
 
     async def send_payload_if_connected(
             self,
@@ -343,32 +708,61 @@ class Events(AsyncEventHandler):
     async def send_ecosystems_info(
             self,
             ecosystem_uids: str | list[str] | None = None,
+            only_changed: bool = False,
     ) -> None:
-        await self.send_payload("places_list")
+        """Send the info of the ecosystems
+
+        All the payloads are built first, then emitted concurrently, at most
+        `MAX_CONCURRENT_EMITS` at a time. The places and the ecosystems base
+        info are emitted before the other payloads as these depend on them.
+
+        :param ecosystem_uids: the uids of the ecosystems whose info to send.
+                               Defaults to all the ecosystems.
+        :param only_changed: if True, only the payloads that changed since they
+                             were last successfully sent are sent.
+        """
         uids = self.filter_uids(ecosystem_uids)
-        await self.send_payload("base_info", uids)
-        await self.send_payload("management", uids)
-        await self.send_payload("chaos_parameters", uids)
-        await self.send_payload("nycthemeral_info", uids)
-        await self.send_payload("climate", uids)
-        await self.send_payload("weather", uids)
-        await self.send_payload("hardware", uids)
-        await self.send_payload("plants", uids)
-        await self.send_payload("actuators_data", uids)
+        prepared_stages: list[list[_PreparedPayload]] = []
+        for stage in ECOSYSTEMS_INFO_PAYLOADS:
+            prepared_stage: list[_PreparedPayload] = []
+            for payload_name in stage:
+                payload_uids = None if payload_name in ENGINE_PAYLOADS else uids
+                prepared = self._prepare_payload(payload_name, payload_uids, only_changed)
+                if prepared is not None:
+                    prepared_stage.append(prepared)
+            prepared_stages.append(prepared_stage)
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_EMITS)
+
+        async def emit(prepared: _PreparedPayload) -> bool:
+            async with semaphore:
+                return await self._emit_prepared_payload(prepared)
+
+        for prepared_stage in prepared_stages:
+            await asyncio.gather(*[emit(prepared) for prepared in prepared_stage])
 
     # ---------------------------------------------------------------------------
     #   Events for connection and initial handshake
     # ---------------------------------------------------------------------------
     async def register(self) -> None:
+        # A replay still running would wait for the acknowledgments of the
+        #  previous connection
+        await self._cancel_buffered_replay()
         if self.engine.use_db:
             # Reset exchanges uuid as Ouranos could have failed through data exchange
             await self.engine._reset_db_exchanges_uuid()
+            self._reset_buffered_exchanges()
         self._resent_initialization_data = False
+        # Use the default payloads until Ouranos acknowledges the formats it
+        #  supports. Its copy of the dictionary could be outdated, resend it
+        self.wire_formats = frozenset()
+        self._sent_dictionary_version = None
         data = gv.EnginePayload(
             engine_uid=self.engine.config.app_config.ENGINE_UID,
             address=local_ip_address(),
             contract_version=self.engine.config.app_config.GAIA_CONTRACT,
         ).model_dump()
+        data["wire_formats"] = sorted(SUPPORTED_WIRE_FORMATS)
         result = await self.emit("register_engine", data=data, ttl=15)  # ty: ignore[invalid-argument-type]
         if result:
             self.logger.debug("Registration request sent.")
@@ -385,9 +779,13 @@ class Events(AsyncEventHandler):
 
     async def on_disconnect(self, *_args) -> None:
         self.logger.debug("Received a disconnection request.")
+        # Ouranos might have lost track of the ecosystems, resync them fully
+        #  on reconnection
+        self.reset_sent_payloads()
         if self._ping_task is not None:
             self._ping_task.cancel()
             self._ping_task = None
+        await self._cancel_buffered_replay()
         if self.engine.stopped:
             self.logger.info("Engine requested to disconnect from the broker.")
             return  # The Engine takes care to shut down the scheduler and the jobs running
@@ -402,8 +800,8 @@ class Events(AsyncEventHandler):
         await sleep(0.25)  # Allow to finish engine initialization in some cases
         await self.register()
 
-    @validate_payload(gv.EngineRegistrationAck)
-    async def on_registration_ack(self, data: gv.EngineRegistrationAckDict) -> None:
+    @validate_payload(EngineRegistrationAck)
+    async def on_registration_ack(self, data: EngineRegistrationAckDict) -> None:
         uuid = data["host_uid"] if isinstance(data["host_uid"], UUID) else UUID(data["host_uid"])
         if self.dispatcher.host_uid != uuid:
             self.logger.warning(
@@ -416,6 +814,10 @@ class Events(AsyncEventHandler):
                 f"Registration refused: contract mismatch. Gaia uses v.{own_contract}, "
                 f"Ouranos v.{ouranos_contract}.")
             return
+        self.wire_formats = SUPPORTED_WIRE_FORMATS.intersection(data["wire_formats"])
+        if self.wire_formats:
+            self.logger.info(
+                f"Using the wire formats {humanize_list(sorted(self.wire_formats))}.")
         self.logger.info(
             "Engine registration successful, sending initial ecosystems info.")
         await self.send_initialization_data()
@@ -426,6 +828,7 @@ class Events(AsyncEventHandler):
         self.camera_token = camera_token
 
     async def send_initialization_data(self) -> None:
+        self.reset_sent_payloads()
         await self.send_ecosystems_info()
         self.logger.info("Initial ecosystems info sent.")
         await sleep(1.0)  # Allow Ouranos to handle all the initialization data
@@ -437,7 +840,8 @@ class Events(AsyncEventHandler):
             self.registered = True
             self.logger.info("Ouranos successfully received ecosystems info.")
             if self.use_db:
-                await self.send_buffered_data()
+                # The replay waits for acknowledgments, which are events too
+                self._start_buffered_replay()
         else:
             self.logger.warning(
                 f"Ouranos did not receive all the initial ecosystems info. "
@@ -539,13 +943,20 @@ class Events(AsyncEventHandler):
         event_name: CrudEventName = cast(CrudEventName, f"{action.name}_{target}")
         self.logger.info(f"Received CRUD request '{crud_uuid}' from Ouranos.")
 
+        if (
+                ecosystem_uid is not None
+                and ecosystem_uid not in self.ecosystems
+                and self._pending_crud_payloads
+        ):
+            # The ecosystem might be created by a pending request
+            await self.flush_crud_changes()
+
         # Treat the CRUD request
         try:
             crud_function = self._get_crud_function(action, target, ecosystem_uid)
             result = crud_function(**data["kwargs"])
             if inspect.isawaitable(result):
                 result = await result
-            await self.engine.config.save(ConfigType.ecosystems)
         except Exception as e:
             self.logger.error(
                 f"Encountered an error while treating CRUD request "
@@ -569,16 +980,125 @@ class Events(AsyncEventHandler):
             )
             self.logger.info(f"CRUD request '{crud_uuid}' was successfully treated.")
 
-        # Send back the updated info
-        await self.engine.refresh_ecosystems(send_info=False)
+        # Save the config and send back the updated info once the burst of
+        #  requests is over
         crud_link = crud_links_dict[event_name]
-        await self.send_payload(
-            payload_name=crud_link.payload_name, ecosystem_uids=ecosystem_uid)
+        self._schedule_crud_flush(crud_link.payload_name, ecosystem_uid)
+
+    def _schedule_crud_flush(
+            self,
+            payload_name: PayloadName,
+            ecosystem_uid: str | None,
+    ) -> None:
+        if ecosystem_uid is None:
+            self._pending_crud_payloads[payload_name] = None
+        else:
+            uids = self._pending_crud_payloads.setdefault(payload_name, set())
+            if uids is not None:
+                uids.add(ecosystem_uid)
+        now = monotonic()
+        handle = self._crud_flush_handle
+        if handle is None or handle.done:
+            self._crud_burst_start = now
+            self._crud_flush_handle = self.engine.timer_wheel.call_later(
+                CRUD_SETTLE_DELAY, self.flush_crud_changes)
+        else:
+            deadline = min(now + CRUD_SETTLE_DELAY, self._crud_burst_start + CRUD_MAX_DELAY)
+            handle.adjust(deadline - handle.deadline)
+
+    async def flush_crud_changes(self) -> None:
+        """Apply the side effects of the CRUD requests treated
+
+        Save the ecosystems config, refresh the ecosystems and send the payloads
+        modified by the requests treated since the last flush, once for the
+        whole burst of requests.
+        """
+        if self._crud_flush_handle is not None:
+            self._crud_flush_handle.cancel()
+            self._crud_flush_handle = None
+        if not self._pending_crud_payloads:
+            return
+        pending_payloads = self._pending_crud_payloads
+        self._pending_crud_payloads = {}
+        async with self._crud_flush_lock:
+            try:
+                await self.engine.config.save(ConfigType.ecosystems)
+            except Exception as e:
+                self.logger.error(
+                    f"Encountered an error while saving the ecosystems config "
+                    f"after CRUD requests. {self._format_error(e)}.")
+            await self.engine.refresh_ecosystems(send_info=False)
+            for payload_name, uids in pending_payloads.items():
+                await self.send_payload(
+                    payload_name=payload_name,
+                    ecosystem_uids=None if uids is None else [*uids],
+                )
 
     # ---------------------------------------------------------------------------
     #   Events for buffered data
     # ---------------------------------------------------------------------------
+    def _reset_buffered_exchanges(self) -> None:
+        # The exchanges in flight will never be acknowledged, their rows are
+        #  made available again by `Engine._reset_db_exchanges_uuid()`
+        self._buffered_exchanges.clear()
+        self._buffered_data_window = asyncio.Semaphore(BUFFERED_DATA_WINDOW)
+        self._buffered_replay_paused = False
+
+    async def _fail_buffered_exchanges(self) -> None:
+        """Make the rows of the exchanges not acknowledged available again."""
+        exchanges = self._buffered_exchanges
+        self._reset_buffered_exchanges()
+        self._buffered_page_size = BUFFERED_DATA_MIN_PAGE
+        if not exchanges:
+            return
+        async with self.db.scoped_session() as session:
+            for exchange_uuid, exchange in exchanges.items():
+                await exchange.buffer_cls.mark_exchange_as_failed(session, exchange_uuid)
+            await session.commit()
+
+    @property
+    def _buffered_replay_running(self) -> bool:
+        return (
+            self._buffered_replay_task is not None
+            and not self._buffered_replay_task.done()
+        )
+
+    def _start_buffered_replay(self) -> None:
+        if self._buffered_replay_running:
+            return
+        self._buffered_replay_task = asyncio.create_task(
+            self.send_buffered_data(), name="events-buffered_data_replay")
+
+    def _resume_buffered_replay(self) -> None:
+        self._buffered_replay_paused = False
+        if self._buffered_replay_running:
+            return
+        self.logger.info("Resuming the buffered data replay.")
+        self._start_buffered_replay()
+
+    async def _cancel_buffered_replay(self) -> None:
+        task = self._buffered_replay_task
+        self._buffered_replay_task = None
+        if task is None or task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
     async def send_buffered_data(self) -> None:
+        """Replay the buffered data to Ouranos
+
+        The buffered rows are sent in exchanges of an adaptive number of rows,
+        with up to `BUFFERED_DATA_WINDOW` exchanges waiting for their
+        acknowledgment. Acknowledged rows are deleted, so a replay interrupted
+        by a disconnection resumes at the first row not acknowledged.
+
+        If Ouranos stops acknowledging the exchanges, their rows are made
+        available again and the replay is paused until the next
+        acknowledgment or registration.
+        """
         if not self.use_db:
             raise RuntimeError(
                 "The database is not enabled. To enable it, set configuration "
@@ -589,10 +1109,61 @@ class Events(AsyncEventHandler):
             (SensorBuffer, "buffered_sensors_data"),
             (ActuatorBuffer, "buffered_actuators_data"),
         ]
-        async with self.db.scoped_session() as session:
-            for buffer_cls, event_name in buffers:
-                async for payload in await buffer_cls.get_buffered_data(session):
-                    await self.emit(event=event_name, data=payload.model_dump())  # ty: ignore[invalid-argument-type]
+        for buffer_cls, event_name in buffers:
+            if not await self._replay_buffer(buffer_cls, event_name):
+                break
+
+    async def _replay_buffer(
+            self,
+            buffer_cls: Type[DataBufferMixin],
+            event_name: str,
+    ) -> bool:
+        last_id: int = 0
+        while True:
+            window = self._buffered_data_window
+            try:
+                await asyncio.wait_for(window.acquire(), BUFFERED_DATA_ACK_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.logger.warning(
+                    "Ouranos did not acknowledge the buffered data exchanges in "
+                    "time, pausing the buffered data replay.")
+                await self._fail_buffered_exchanges()
+                self._buffered_replay_paused = True
+                return False
+            async with self.db.scoped_session() as session:
+                page = await buffer_cls.get_buffered_page(
+                    session, last_id, self._buffered_page_size)
+                await session.commit()
+            if page is None:
+                window.release()
+                return True
+            payload, last_id = page
+            self._buffered_exchanges[payload.uuid] = _BufferedExchange(
+                buffer_cls, monotonic())
+            sent = await self.emit(
+                event=event_name,
+                size=len(payload.data) * BUFFERED_RECORD_SIZE,
+                data=payload.model_dump(),  # ty: ignore[invalid-argument-type]
+            )
+            if not sent:
+                self.logger.warning(
+                    "Could not send buffered data, pausing the buffered data replay.")
+                async with self.db.scoped_session() as session:
+                    await buffer_cls.mark_exchange_as_failed(session, payload.uuid)
+                    await session.commit()
+                if self._buffered_exchanges.pop(payload.uuid, None) is not None:
+                    window.release()
+                self._buffered_replay_paused = True
+                return False
+
+    def _adapt_buffered_page_size(self, exchange: _BufferedExchange, success: bool) -> None:
+        rtt = monotonic() - exchange.sent_at
+        if success and rtt < BUFFERED_DATA_TARGET_RTT:
+            self._buffered_page_size = min(
+                self._buffered_page_size * 2, BUFFERED_DATA_MAX_PAGE)
+        elif not success or rtt > 2 * BUFFERED_DATA_TARGET_RTT:
+            self._buffered_page_size = max(
+                self._buffered_page_size // 2, BUFFERED_DATA_MIN_PAGE)
 
     @validate_payload(gv.RequestResult)
     async def on_buffered_data_ack(self, data: gv.RequestResultDict) -> None:
@@ -600,10 +1171,11 @@ class Events(AsyncEventHandler):
             raise RuntimeError(
                 "The database is not enabled. To enable it, set configuration "
                 "parameter 'USE_DATABASE' to 'True'.")
-        from gaia.database.models import ActuatorBuffer, DataBufferMixin, SensorBuffer
+        from gaia.database.models import ActuatorBuffer, SensorBuffer
 
+        success = data["status"] == gv.Result.success
         async with self.db.scoped_session() as session:
-            if data["status"] == gv.Result.success:
+            if success:
                 for db_model in (ActuatorBuffer, SensorBuffer):
                     await db_model.mark_exchange_as_success(session, data["uuid"])
             else:
@@ -612,6 +1184,15 @@ class Events(AsyncEventHandler):
                 self.logger.error(
                     f"Encountered an error while treating buffered data "
                     f"exchange `{data['uuid']}`. ERROR msg: `{data['message']}`.")
+        # Advance the exchanges window
+        exchange_uuid = data["uuid"] if isinstance(data["uuid"], UUID) else UUID(data["uuid"])
+        exchange = self._buffered_exchanges.pop(exchange_uuid, None)
+        if exchange is not None:
+            self._adapt_buffered_page_size(exchange, success)
+            self._buffered_data_window.release()
+        # Ouranos handles the exchanges again
+        if self._buffered_replay_paused:
+            self._resume_buffered_replay()
 
     # ---------------------------------------------------------------------------
     #   Pictures
@@ -632,41 +1213,58 @@ class Events(AsyncEventHandler):
             self,
             ecosystem_uids: str | list[str] | None = None,
     ) -> None:
+        picture_encoder = get_picture_encoder()
         for uid, picture_arrays in self._iter_picture_arrays(ecosystem_uids):
-            if self._resize_ratio != 1.0:
-                picture_arrays = [
-                    picture_array.resize(ratio=self._resize_ratio)
-                    for picture_array in picture_arrays
-                ]
-            ecosystem_payload = SerializableImagePayload(
-                uid=uid,
-                data=picture_arrays,
-            )
+            encoded_payload = await picture_encoder.encode_payload(
+                uid, picture_arrays, self._resize_ratio, self._compression_format)
             await self.emit(
                 "picture_arrays",
-                data=ecosystem_payload.serialize(
-                    compression_format=self._compression_format),
+                data=encoded_payload,
                 namespace="aggregator-stream",
             )
 
+    async def _get_http_session(self) -> ClientSession:
+        from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+        # `camera_token` should be assigned before any method using
+        #  `_upload_image()` is ever called
+        assert self.camera_token is not None
+        async with self._http_session_lock:
+            if (
+                    self._http_session is not None
+                    and not self._http_session.closed
+                    and self._http_session_token == self.camera_token
+            ):
+                return self._http_session
+            # The token is part of the session headers, a new token requires a
+            #  new session
+            await self.close_http_session()
+            self._http_session = ClientSession(
+                headers={"token": self.camera_token},
+                connector=TCPConnector(limit=MAX_CONCURRENT_UPLOADS),
+                timeout=ClientTimeout(total=UPLOAD_TIMEOUT),
+            )
+            self._http_session_token = self.camera_token
+            return self._http_session
+
+    async def close_http_session(self) -> None:
+        if self._http_session is not None:
+            await self._http_session.close()
+            self._http_session = None
+            self._http_session_token = None
+
     async def _upload_image(self, image: "SerializableImage") -> None:
-        from aiohttp import ClientSession
         # Format data
-        if self._resize_ratio != 1.0:
-            image = image.resize(ratio=self._resize_ratio)
-        to_send = image.serialize(compression_format=self._compression_format)
-        # `camera_token` should be assigned before any method using `_upload_image()`
-        #  is ever called
-        assert self.camera_token is not None
-        headers = {"token": self.camera_token}
+        to_send = await get_picture_encoder().encode_image(
+            image, self._resize_ratio, self._compression_format)
         base_url = self.engine.config.app_config.AGGREGATOR_SERVER_URL
         url = f"{base_url}/upload_camera_image"
         # Upload data
         try:
-            async with ClientSession(headers=headers) as session:
-                async with session.post(url, data=to_send, timeout=3.0) as resp:
-                    response = await resp.json()
-                    self.logger.debug(f"Image sent. Response: {response}")
+            session = await self._get_http_session()
+            async with session.post(url, data=to_send) as resp:
+                response = await resp.json()
+                self.logger.debug(f"Image sent. Response: {response}")
         except Exception as e:
             self.logger.error(
                 f"Encountered an error while uploading image. "
@@ -680,7 +1278,15 @@ class Events(AsyncEventHandler):
         if self.camera_token is None:
             self.logger.error("No camera token found, cannot send picture arrays.")
             return
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_UPLOADS)
+
+        async def upload_image(image: SerializableImage) -> None:
+            async with semaphore:
+                await self._upload_image(image)
+
+        uploads = []
         for uid, picture_arrays in self._iter_picture_arrays(ecosystem_uids):
             for image in picture_arrays:
                 image.metadata["ecosystem_uid"] = uid
-                await self._upload_image(image)
+                uploads.append(upload_image(image))
+        await asyncio.gather(*uploads)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+from asyncio import AbstractEventLoop, Future
+from logging import getLogger, Logger
+import queue
+import threading
+from typing import Any, Callable, NamedTuple, TypeVar
+
+
+T = TypeVar("T")
+
+# Time to wait for the jobs already queued when stopping, in seconds. The
+#  worker is a daemon thread, a device stuck in a transaction does not prevent
+#  Gaia from exiting
+STOP_TIMEOUT = 5.0
+
+
+class _BusJob(NamedTuple):
+    func: Callable[..., Any]
+    args: tuple
+    loop: AbstractEventLoop
+    future: Future
+
+
+class _BusJobOutcome(NamedTuple):
+    future: Future
+    result: Any
+    exception: BaseException | None
+
+
+def _resolve_futures(outcomes: list[_BusJobOutcome]) -> None:
+    # Called in the event loop thread
+    for outcome in outcomes:
+        if outcome.future.done():
+            # The awaiting task has been cancelled in the meantime
+            continue
+        if outcome.exception is not None:
+            outcome.future.set_exception(outcome.exception)
+        else:
+            outcome.future.set_result(outcome.result)
+
+
+class I2CBusScheduler:
+    """Run all the blocking calls made on a physical I2C bus in one thread.
+
+    Devices sharing a bus, including the ones behind a multiplexer, cannot be
+    read in parallel. Instead of doing one thread hop per read, the requests
+    are queued and a single worker thread drains the queue in batches. All
+    the futures of a batch are then resolved with one event loop wake-up.
+    """
+    def __init__(self, name: str, max_batch_size: int = 32) -> None:
+        self.name: str = name
+        self.logger: Logger = getLogger(f"gaia.hardware.i2c.{name}")
+        self._max_batch_size: int = max_batch_size
+        self._queue: queue.SimpleQueue[_BusJob | None] = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._thread_lock = threading.Lock()
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"{self.__class__.__name__}({self.name}, running={self.running})"
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _ensure_started(self) -> None:
+        if self.running:
+            return
+        with self._thread_lock:
+            if self.running:  # pragma: no cover
+                return
+            self.logger.debug(f"Starting the worker thread for I2C bus '{self.name}'.")
+            self._thread = threading.Thread(
+                target=self._worker, name=f"i2c-bus-{self.name}", daemon=True)
+            self._thread.start()
+
+    def _get_batch(self) -> tuple[list[_BusJob], bool]:
+        # Block until at least one job is available, then drain what is queued
+        job = self._queue.get()
+        if job is None:
+            return [], True
+        batch: list[_BusJob] = [job]
+        while len(batch) < self._max_batch_size:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                return batch, True
+            batch.append(job)
+        return batch, False
+
+    def _run_batch(self, batch: list[_BusJob]) -> None:
+        outcomes: dict[AbstractEventLoop, list[_BusJobOutcome]] = {}
+        for job in batch:
+            if job.future.done():
+                # Cancelled before reaching the bus, no need to use it
+                continue
+            try:
+                outcome = _BusJobOutcome(job.future, job.func(*job.args), None)
+            except BaseException as e:
+                outcome = _BusJobOutcome(job.future, None, e)
+            outcomes.setdefault(job.loop, []).append(outcome)
+        for loop, loop_outcomes in outcomes.items():
+            try:
+                loop.call_soon_threadsafe(_resolve_futures, loop_outcomes)
+            except RuntimeError:  # pragma: no cover
+                # The event loop has been closed, nobody is waiting anymore
+                pass
+
+    def _worker(self) -> None:
+        stop = False
+        while not stop:
+            batch, stop = self._get_batch()
+            if batch:
+                self._run_batch(batch)
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Queue a blocking call on the bus and wait for its result."""
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        future: Future[T] = loop.create_future()
+        self._queue.put(_BusJob(func, args, loop, future))
+        return await future
+
+    def stop(self, timeout: float | None = STOP_TIMEOUT) -> None:
+        """Stop the worker thread once the jobs already queued are done.
+
+        Blocks for up to `timeout` seconds, call it in a thread from the event
+        loop.
+        """
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            self.logger.warning(
+                f"Worker thread for I2C bus '{self.name}' did not stop within "
+                f"{timeout} s, a device is probably stuck. Leaving it behind.")
+        else:
+            self.logger.debug(f"Worker thread for I2C bus '{self.name}' stopped.")
+        self._thread = None
@@ -12,7 +12,7 @@ from pathlib import Path
 import textwrap
 from types import EllipsisType
 import typing as t
-from typing import Any, Awaitable, Callable, ClassVar, NamedTuple, Self, Type
+from typing import Any, Awaitable, Callable, ClassVar, NamedTuple, Self, Type, TypeVar
 from uuid import UUID, uuid4
 import warnings
 from weakref import WeakValueDictionary
@@ -29,7 +29,8 @@ from gaia.dependencies.camera import check_dependencies, SerializableImage
 from gaia.exceptions import DeviceError, HardwareNotFound
 from gaia.hardware._websocket import WebSocketHardwareManager
 from gaia.hardware.multiplexers import Multiplexer
-from gaia.hardware.utils import get_i2c, hardware_logger, is_raspi
+from gaia.hardware.utils import (
+    get_i2c, get_i2c_bus_scheduler, hardware_logger, is_raspi)
 from gaia.utils import pin_bcm_to_board, pin_board_to_bcm, pin_translation
 
 
@@ -43,6 +44,9 @@ if t.TYPE_CHECKING:  # pragma: no cover
         from gaia.hardware._compatibility import busio, Pin
 
 
+T = TypeVar("T")
+
+
 class InvalidAddressError(ValueError):
     """Raised when an invalid address is provided."""
     pass
@@ -689,6 +693,7 @@ class HardwareTypeHint(ABC):
         _on_check_requirements: Callable[[], Awaitable[None | Exception]]
         _on_initialize: Callable[[], Awaitable[None]]
         _on_terminate: Callable[[], Awaitable[None]]
+        _run_io: Callable[..., Awaitable[Any]]
 
 # ---------------------------------------------------------------------------
 #   Mixins for each address type
@@ -696,6 +701,13 @@ class HardwareTypeHint(ABC):
 class HardwareAddressMixin(HardwareTypeHint):
     """Marker base for hardware address-protocol mixins."""
 
+    async def _run_io(self, func: Callable[..., T], *args: Any) -> T:
+        """Run a blocking device call without blocking the event loop.
+
+        Address mixins sharing a bus can override it to serialize the calls.
+        """
+        return await run_sync(func, *args)
+
 
 class gpioAddressMixin(HardwareAddressMixin):
     """Protocol mixin for GPIO-addressed hardware. Expects `self.address: GPIOAddress`."""
@@ -793,6 +805,10 @@ class i2cAddressMixin(HardwareAddressMixin):
         else:
             return get_i2c()
 
+    async def _run_io(self, func: Callable[..., T], *args: Any) -> T:
+        # All the I2C devices, multiplexed or not, share the same physical bus
+        return await get_i2c_bus_scheduler().run(func, *args)
+
 
 class OneWireAddressMixin(HardwareAddressMixin):
     """Protocol mixin for 1-Wire-addressed hardware. Expects `self.address: OneWireAddress`."""
@@ -1091,6 +1107,8 @@ class SensorMixin(HardwareTypeMixin):
     """Mixin for sensor-type hardware."""
 
     measures_available: ClassVar[dict[Measure, Unit | None] | EllipsisType | None] = None
+    # Shortest interval between two reads supported by the device, in seconds
+    min_sampling_period: ClassVar[float] = 0.0
 
     def __init__(self, *args, **kwargs) -> None:
         if self.measures_available is None:
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+from enum import Enum
+from time import monotonic
+
+
+# Number of consecutive failures before the breaker opens
+FAILURES_BEFORE_OPEN = 3
+# Smoothing factor of the latency exponentially weighted moving average
+LATENCY_EWMA_ALPHA = 0.2
+# The read deadline of a hardware is this many times its average latency ...
+LATENCY_MARGIN = 3.0
+# ... bounded by these values, in seconds
+MIN_READ_DEADLINE = 0.5
+MAX_READ_DEADLINE = 5.0
+
+
+class BreakerState(Enum):
+    closed = "closed"  # The hardware is used normally
+    open = "open"  # The hardware is skipped until the back-off delay expires
+    half_open = "half_open"  # The hardware is tried once
+
+
+class HardwareHealth:
+    """Track the health of a single hardware
+
+    The outcome of each call to the hardware feeds a latency moving average
+    and a consecutive-failure count. After `FAILURES_BEFORE_OPEN` consecutive
+    failures the breaker opens and the hardware should not be used until the
+    back-off delay expires. It is then tried once (half-open): a success closes
+    the breaker, a failure opens it again for twice as long.
+
+    :param backoff_base: the first back-off delay, in seconds.
+    :param backoff_max: the longest back-off delay, in seconds.
+    """
+    __slots__ = (
+        "backoff_base", "backoff_max", "latency", "consecutive_failures",
+        "state", "_trips", "_retry_at",
+    )
+
+    def __init__(self, backoff_base: float, backoff_max: float) -> None:
+        self.backoff_base: float = backoff_base
+        self.backoff_max: float = backoff_max
+        self.latency: float | None = None
+        self.consecutive_failures: int = 0
+        self.state: BreakerState = BreakerState.closed
+        self._trips: int = 0  # Number of times the breaker opened in a row
+        self._retry_at: float = 0.0
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return (
+            f"{self.__class__.__name__}(state={self.state.name}, "
+            f"latency={self.latency}, failures={self.consecutive_failures})"
+        )
+
+    @property
+    def retry_at(self) -> float | None:
+        """The monotonic time after which an open breaker allows a new try."""
+        if self.state is BreakerState.open:
+            return self._retry_at
+        return None
+
+    @property
+    def read_deadline(self) -> float:
+        """The time to wait for the hardware, derived from its latency."""
+        if self.latency is None:
+            return MAX_READ_DEADLINE
+        return min(max(self.latency * LATENCY_MARGIN, MIN_READ_DEADLINE), MAX_READ_DEADLINE)
+
+    def allow(self, now: float | None = None) -> bool:
+        """Return whether the hardware can be used."""
+        if self.state is BreakerState.open:
+            now = monotonic() if now is None else now
+            if now < self._retry_at:
+                return False
+            self.state = BreakerState.half_open
+        return True
+
+    def record_latency(self, latency: float) -> None:
+        """Update the latency of the hardware without recording an outcome.
+
+        Used for the calls whose outcome has already been recorded, e.g. the
+        ones that finished after missing their deadline.
+        """
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += LATENCY_EWMA_ALPHA * (latency - self.latency)
+
+    def record_success(self, latency: float) -> None:
+        self.record_latency(latency)
+        self.consecutive_failures = 0
+        self.state = BreakerState.closed
+        self._trips = 0
+
+    def record_failure(self, latency: float | None = None, now: float | None = None) -> None:
+        """Record a failed call.
+
+        :param latency: the duration of the call, if it finished.
+        :param now: the monotonic time of the failure. Defaults to now.
+        """
+        if latency is not None:
+            self.record_latency(latency)
+        self.consecutive_failures += 1
+        if (
+                self.state is BreakerState.half_open
+                or self.consecutive_failures >= FAILURES_BEFORE_OPEN
+        ):
+            now = monotonic() if now is None else now
+            backoff = min(self.backoff_base * 2 ** self._trips, self.backoff_max)
+            self._trips += 1
+            self._retry_at = now + backoff
+            self.state = BreakerState.open
+
+
+class HardwareHealthTracker:
+    """The `HardwareHealth` of a group of hardware, created on first use
+
+    :param backoff_base: the first back-off delay, in seconds.
+    :param backoff_max: the longest back-off delay, in seconds.
+    """
+    def __init__(self, backoff_base: float, backoff_max: float) -> None:
+        if not 0 < backoff_base <= backoff_max:
+            raise ValueError("backoff_base should be strictly positive and "
+                             "lower than backoff_max")
+        self.backoff_base: float = backoff_base
+        self.backoff_max: float = backoff_max
+        self._health: dict[str, HardwareHealth] = {}
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"{self.__class__.__name__}(hardware={len(self._health)})"
+
+    def __contains__(self, hardware_uid: str) -> bool:
+        return hardware_uid in self._health
+
+    def __getitem__(self, hardware_uid: str) -> HardwareHealth:
+        try:
+            return self._health[hardware_uid]
+        except KeyError:
+            health = self._health[hardware_uid] = HardwareHealth(
+                self.backoff_base, self.backoff_max)
+            return health
+
+    def get_read_deadline(self, hardware_uids: list[str]) -> float:
+        """The time to wait for a group of hardware read concurrently."""
+        if not hardware_uids:
+            return 0.0
+        return max(self[hardware_uid].read_deadline for hardware_uid in hardware_uids)
+
+    def get_open(self) -> list[str]:
+        return [
+            hardware_uid
+            for hardware_uid, health in self._health.items()
+            if health.state is BreakerState.open
+        ]
+
+    def retain(self, hardware_uids: set[str]) -> None:
+        """Drop the health of the hardware not in `hardware_uids`."""
+        self._health = {
+            hardware_uid: health
+            for hardware_uid, health in self._health.items()
+            if hardware_uid in hardware_uids
+        }
+
+    def clear(self) -> None:
+        self._health.clear()
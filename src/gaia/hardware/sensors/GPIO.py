@@ -47,6 +47,8 @@ class DHTSensor(TempHumSensor, gpioSensor):
 
 
 class DHT11(DHTSensor):
+    min_sampling_period = 1.0
+
     @classmethod
     async def _on_check_requirements(cls) -> None | Exception:
         maybe_error = await super()._on_check_requirements()
@@ -79,6 +81,8 @@ class DHT11(DHTSensor):
 
 
 class DHT22(DHTSensor):
+    min_sampling_period = 2.0
+
     @classmethod
     async def _on_check_requirements(cls) -> None | Exception:
         maybe_error = await super()._on_check_requirements()
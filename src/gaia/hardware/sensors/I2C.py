@@ -4,8 +4,6 @@ from time import sleep
 import typing as t
 from typing import Type
 
-from anyio.to_thread import run_sync
-
 from gaia.hardware.abc import (
     i2cAddressMixin, Measure, PlantLevelMixin, Sensor, SensorRead, Unit)
 from gaia.hardware.sensors.abc import LightSensorBase, TempHumSensor
@@ -141,7 +139,7 @@ class ENS160(i2cSensor):
     async def get_data(self) -> list[SensorRead]:
         # TODO: access temperature and humidity data to compensate
         data = []
-        AQI, eCO2, TVOC = await run_sync(self._get_raw_data)
+        AQI, eCO2, TVOC = await self._run_io(self._get_raw_data)
         if Measure.aqi in self.measures:
             data.append(
                 SensorRead(
@@ -313,7 +311,7 @@ class CapacitiveMoisture(PlantLevelMixin, CapacitiveSensorMixin):
 
     async def get_data(self) -> list[SensorRead]:
         try:
-            moisture, raw_temperature = await run_sync(self._get_raw_data)
+            moisture, raw_temperature = await self._run_io(self._get_raw_data)
         except RuntimeError:
             moisture = raw_temperature = None
         data = []
@@ -2,8 +2,6 @@ from __future__ import annotations
 
 from abc import abstractmethod
 
-from anyio.to_thread import run_sync
-
 from gaia.hardware.abc import (
     LightSensorMixin, Measure, SensorMixin, SensorRead, Unit)
 from gaia.utils import (
@@ -19,7 +17,7 @@ class TemperatureSensor(SensorMixin):
     def _get_raw_data(self) -> float | None: ...
 
     async def get_data(self) -> list[SensorRead]:
-        raw_temperature = await run_sync(self._get_raw_data)
+        raw_temperature = await self._run_io(self._get_raw_data)
         data = []
         if Measure.temperature in self.measures:
             data.append(
@@ -44,7 +42,7 @@ class TempHumSensor(SensorMixin):
     def _get_raw_data(self) -> tuple[float | None, float | None]: ...
 
     async def get_data(self) -> list[SensorRead]:
-        raw_humidity, raw_temperature = await run_sync(self._get_raw_data)
+        raw_humidity, raw_temperature = await self._run_io(self._get_raw_data)
         data = []
         if Measure.humidity in self.measures:
             data.append(
@@ -95,7 +93,7 @@ class LightSensorBase(LightSensorMixin):
 
     async def get_lux(self) -> float | None:
         try:
-            lux = await run_sync(self._get_lux)
+            lux = await self._run_io(self._get_lux)
             return round(lux, 2)
         except Exception as e:
             self._logger.error(
@@ -4,6 +4,9 @@ import logging
 import typing as t
 
 from adafruit_platformdetect import Board, Detector
+from anyio.to_thread import run_sync
+
+from gaia.hardware._i2c_bus import I2CBusScheduler
 
 
 if t.TYPE_CHECKING:  # pragma: no cover
@@ -12,6 +15,7 @@ if t.TYPE_CHECKING:  # pragma: no cover
 
 _is_raspi: bool | None = None
 _i2c: I2C | None = None
+_i2c_bus_scheduler: I2CBusScheduler | None = None
 
 
 hardware_logger = logging.getLogger("gaia.hardware.store")
@@ -35,3 +39,19 @@ def get_i2c() -> I2C:
         _i2c = busio.I2C(board.SCL, board.SDA)  # ty: ignore[invalid-assignment]
     assert _i2c is not None
     return _i2c
+
+
+def get_i2c_bus_scheduler() -> I2CBusScheduler:
+    """Get the scheduler owning the bus returned by `get_i2c()`."""
+    global _i2c_bus_scheduler
+    if _i2c_bus_scheduler is None:
+        _i2c_bus_scheduler = I2CBusScheduler("main")
+    return _i2c_bus_scheduler
+
+
+async def stop_i2c_bus_scheduler() -> None:
+    global _i2c_bus_scheduler
+    if _i2c_bus_scheduler is not None:
+        scheduler = _i2c_bus_scheduler
+        _i2c_bus_scheduler = None
+        await run_sync(scheduler.stop)
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import asyncio
+from asyncio import AbstractEventLoop, Event, Future, Task
+from collections import deque
+from enum import Enum, IntEnum
+from logging import getLogger, Logger
+from time import monotonic
+from typing import Any, Awaitable, Callable, NamedTuple
+
+
+class Priority(IntEnum):
+    """The priority classes of the outbound messages, lower is more urgent"""
+    control = 0  # Registration, heartbeat, CRUD results and configuration
+    state = 1  # Actuators state
+    data = 2  # Sensors and health data
+    bulk = 3  # Pictures
+
+
+class DropPolicy(Enum):
+    block = "block"  # The producer waits until there is room in the queue
+    drop_oldest = "drop_oldest"  # The oldest messages are dropped to make room
+    drop_newest = "drop_newest"  # The new message is dropped
+
+
+class PriorityPolicy(NamedTuple):
+    max_bytes: int  # Estimated size of the messages queued
+    ttl: float | None  # Time a message can wait in the queue, in seconds
+    drop_policy: DropPolicy
+    max_in_flight: int  # Messages of the class being sent at the same time
+
+
+default_policies: dict[Priority, PriorityPolicy] = {
+    Priority.control: PriorityPolicy(1024 ** 2, None, DropPolicy.block, 4),
+    Priority.state: PriorityPolicy(1024 ** 2, 60.0, DropPolicy.drop_oldest, 2),
+    Priority.data: PriorityPolicy(4 * 1024 ** 2, 60.0, DropPolicy.drop_oldest, 2),
+    # A single picture in flight so that it never holds all the send slots
+    Priority.bulk: PriorityPolicy(16 * 1024 ** 2, 30.0, DropPolicy.drop_oldest, 1),
+}
+
+
+# Size assumed for the messages whose size cannot be cheaply known, in bytes
+DEFAULT_MESSAGE_SIZE = 1024
+
+
+def estimate_size(data: Any) -> int:
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return len(data)
+    return DEFAULT_MESSAGE_SIZE
+
+
+class _OutboundMessage:
+    __slots__ = ("event", "kwargs", "size", "enqueued_at", "result")
+
+    def __init__(self, event: str, kwargs: dict[str, Any], size: int) -> None:
+        self.event: str = event
+        self.kwargs: dict[str, Any] = kwargs
+        self.size: int = size
+        self.enqueued_at: float = monotonic()
+        self.result: Future[bool] = asyncio.get_running_loop().create_future()
+
+    def resolve(self, result: bool) -> None:
+        if not self.result.done():
+            self.result.set_result(result)
+
+
+class PriorityMetrics:
+    __slots__ = ("queued", "queued_bytes", "in_flight", "sent", "failed", "dropped", "expired")
+
+    def __init__(self) -> None:
+        self.queued: int = 0
+        self.queued_bytes: int = 0
+        self.in_flight: int = 0
+        self.sent: int = 0
+        self.failed: int = 0
+        self.dropped: int = 0
+        self.expired: int = 0
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"{self.__class__.__name__}({self.as_dict()})"
+
+    def as_dict(self) -> dict[str, int]:
+        return {attr: getattr(self, attr) for attr in self.__slots__}
+
+
+class OutboundQueue:
+    """Send messages by priority class, with back-pressure
+
+    Messages are queued in their priority class and sent by a single task,
+    the most urgent class first, with at most `max_in_flight` messages being
+    sent at the same time. Each class has a size budget, a time to live and a
+    policy applied when the budget is exceeded (cf. `PriorityPolicy`).
+
+    :param send: the coroutine function sending a message. It receives the
+                 event name and the keyword arguments given to `put()`, and
+                 returns whether the message was sent.
+    :param policies: the policy of each priority class. Defaults to
+                     `default_policies`.
+    :param max_in_flight: the number of messages sent at the same time.
+    """
+    def __init__(
+            self,
+            send: Callable[..., Awaitable[bool]],
+            policies: dict[Priority, PriorityPolicy] | None = None,
+            max_in_flight: int = 4,
+    ) -> None:
+        self._send: Callable[..., Awaitable[bool]] = send
+        self.policies: dict[Priority, PriorityPolicy] = {
+            **default_policies, **(policies or {})}
+        self.max_in_flight: int = max_in_flight
+        self.logger: Logger = getLogger("gaia.engine.events_handler.outbound_queue")
+        self._queues: dict[Priority, deque[_OutboundMessage]] = {
+            priority: deque() for priority in Priority}
+        self._metrics: dict[Priority, PriorityMetrics] = {
+            priority: PriorityMetrics() for priority in Priority}
+        self._in_flight: int = 0
+        self._wake: Event | None = None
+        self._room: dict[Priority, Event] = {}
+        self._loop: AbstractEventLoop | None = None
+        self._task: Task | None = None
+        self._send_tasks: set[Task] = set()
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"{self.__class__.__name__}(queued={len(self)}, in_flight={self._in_flight})"
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def metrics(self) -> dict[str, dict[str, int]]:
+        return {
+            priority.name: metrics.as_dict()
+            for priority, metrics in self._metrics.items()
+        }
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self.running:
+            return
+        if self._loop is not loop:
+            # The messages queued in another event loop cannot be sent anymore
+            self._fail_queued()
+            self._in_flight = 0
+            for metrics in self._metrics.values():
+                metrics.in_flight = 0
+        self._loop = loop
+        self._wake = Event()
+        self._room = {priority: Event() for priority in Priority}
+        self._task = loop.create_task(self._run(), name="events_handler-outbound_queue")
+
+    def _pop(self, priority: Priority, left: bool = True) -> _OutboundMessage:
+        queue = self._queues[priority]
+        message = queue.popleft() if left else queue.pop()
+        metrics = self._metrics[priority]
+        metrics.queued -= 1
+        metrics.queued_bytes -= message.size
+        self._room[priority].set()
+        return message
+
+    def _expire(self, priority: Priority, now: float) -> None:
+        ttl = self.policies[priority].ttl
+        if ttl is None:
+            return
+        queue = self._queues[priority]
+        while queue and now - queue[0].enqueued_at > ttl:
+            message = self._pop(priority)
+            self._metrics[priority].expired += 1
+            message.resolve(False)
+
+    def _has_room(self, priority: Priority, size: int) -> bool:
+        metrics = self._metrics[priority]
+        # An oversized message is accepted once its class queue is empty
+        return (
+            not metrics.queued
+            or metrics.queued_bytes + size <= self.policies[priority].max_bytes
+        )
+
+    async def put(
+            self,
+            event: str,
+            priority: Priority,
+            size: int | None = None,
+            **kwargs: Any,
+    ) -> bool:
+        """Queue a message and wait until it is sent.
+
+        :param event: the name of the event to send.
+        :param priority: the priority class of the message.
+        :param size: the size of the message, in bytes. Estimated from the
+                     'data' keyword argument if not given.
+        :param kwargs: the keyword arguments passed to the send function.
+        :return: Whether the message was sent. False if it was dropped or
+                 expired in the queue.
+        """
+        self._ensure_running()
+        if size is None:
+            size = estimate_size(kwargs.get("data"))
+        policy = self.policies[priority]
+        metrics = self._metrics[priority]
+        self._expire(priority, monotonic())
+        while not self._has_room(priority, size):
+            if policy.drop_policy is DropPolicy.drop_newest:
+                metrics.dropped += 1
+                self.logger.warning(
+                    f"Outbound queue '{priority.name}' is full, dropping event "
+                    f"'{event}'.")
+                return False
+            elif policy.drop_policy is DropPolicy.drop_oldest:
+                dropped = self._pop(priority)
+                metrics.dropped += 1
+                self.logger.warning(
+                    f"Outbound queue '{priority.name}' is full, dropping the "
+                    f"oldest event '{dropped.event}'.")
+                dropped.resolve(False)
+            else:
+                room = self._room[priority]
+                room.clear()
+                await room.wait()
+                self._expire(priority, monotonic())
+        message = _OutboundMessage(event, kwargs, size)
+        self._queues[priority].append(message)
+        metrics.queued += 1
+        metrics.queued_bytes += size
+        assert self._wake is not None
+        self._wake.set()
+        return await asyncio.shield(message.result)
+
+    def _next_message(self) -> tuple[Priority, _OutboundMessage] | None:
+        if self._in_flight >= self.max_in_flight:
+            return None
+        now = monotonic()
+        for priority in Priority:
+            self._expire(priority, now)
+            if not self._queues[priority]:
+                continue
+            if self._metrics[priority].in_flight >= self.policies[priority].max_in_flight:
+                continue
+            return priority, self._pop(priority)
+        return None
+
+    async def _send_message(self, priority: Priority, message: _OutboundMessage) -> None:
+        metrics = self._metrics[priority]
+        try:
+            result = bool(await self._send(message.event, **message.kwargs))
+        except Exception as e:
+            self.logger.error(
+                f"Encountered an error while sending event '{message.event}'. "
+                f"ERROR msg: `{e.__class__.__name__}: {e}`.")
+            result = False
+        finally:
+            self._in_flight -= 1
+            metrics.in_flight -= 1
+            if self._wake is not None:
+                self._wake.set()
+        if result:
+            metrics.sent += 1
+        else:
+            metrics.failed += 1
+        message.resolve(result)
+
+    async def _run(self) -> None:
+        assert self._wake is not None
+        while True:
+            self._wake.clear()
+            next_message = self._next_message()
+            if next_message is None:
+                await self._wake.wait()
+                continue
+            priority, message = next_message
+            self._in_flight += 1
+            self._metrics[priority].in_flight += 1
+            task = asyncio.create_task(
+                self._send_message(priority, message),
+                name=f"events_handler-send-{message.event}")
+            self._send_tasks.add(task)
+            task.add_done_callback(self._send_tasks.discard)
+
+    def _fail_queued(self) -> None:
+        for priority, queue in self._queues.items():
+            while queue:
+                self._pop(priority).resolve(False)
+
+    async def stop(self) -> None:
+        """Stop sending messages. The messages still queued are not sent."""
+        self._fail_queued()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Let the messages being sent complete
+        if self._send_tasks:
+            await asyncio.wait([*self._send_tasks])
+        self._loop = None
+        self._wake = None
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from logging import getLogger, Logger
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+from time import monotonic
+import typing as t
+from typing import Any, NamedTuple
+
+from anyio.to_thread import run_sync
+
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from gaia_validators.image import SerializableImage
+
+
+# Number of worker processes encoding the pictures
+PICTURE_ENCODER_WORKERS = 1
+# Number of times a broken pool is recreated within `POOL_RESTARTS_WINDOW`
+#  before encoding in a thread
+MAX_POOL_RESTARTS = 3
+POOL_RESTARTS_WINDOW = 600.0  # in s
+
+
+class _SharedImage(NamedTuple):
+    shm_name: str
+    shape: tuple[int, ...]
+    dtype: str
+    metadata: dict[str, Any]
+
+
+def _load_and_encode(
+        shared_images: list[_SharedImage],
+        shms: list[SharedMemory],
+        resize_ratio: float,
+        compression_format: str | None,
+        payload_uid: str | None,
+) -> bytes:
+    import numpy as np
+    from gaia_validators.image import SerializableImage, SerializableImagePayload
+
+    images: list[SerializableImage] = []
+    for shared_image in shared_images:
+        shm = SharedMemory(name=shared_image.shm_name)
+        shms.append(shm)
+        array = np.ndarray(shared_image.shape, dtype=shared_image.dtype, buffer=shm.buf)
+        image = SerializableImage(array, metadata=shared_image.metadata)
+        if resize_ratio != 1.0:
+            image = image.resize(ratio=resize_ratio)
+        images.append(image)
+    if payload_uid is None:
+        return images[0].serialize(compression_format=compression_format)
+    payload = SerializableImagePayload(uid=payload_uid, data=images)
+    return payload.serialize(compression_format=compression_format)
+
+
+def _encode_shared_images(
+        shared_images: list[_SharedImage],
+        resize_ratio: float,
+        compression_format: str | None,
+        payload_uid: str | None,
+) -> bytes:
+    """Resize and serialize images whose pixels are in shared memory.
+
+    Runs in a worker process. If `payload_uid` is given, the images are
+    serialized as a `SerializableImagePayload`, otherwise the single image is
+    serialized.
+    """
+    shms: list[SharedMemory] = []
+    try:
+        # The arrays viewing the shared memory must be released before closing
+        #  it, keep them in the scope of another function
+        return _load_and_encode(
+            shared_images, shms, resize_ratio, compression_format, payload_uid)
+    finally:
+        for shm in shms:
+            shm.close()
+
+
+def _encode_images(
+        images: list[SerializableImage],
+        resize_ratio: float,
+        compression_format: str | None,
+        payload_uid: str | None,
+) -> bytes:
+    from gaia_validators.image import SerializableImagePayload
+
+    if resize_ratio != 1.0:
+        images = [image.resize(ratio=resize_ratio) for image in images]
+    if payload_uid is None:
+        return images[0].serialize(compression_format=compression_format)
+    payload = SerializableImagePayload(uid=payload_uid, data=images)
+    return payload.serialize(compression_format=compression_format)
+
+
+class PictureEncoder:
+    """Resize and serialize pictures in worker processes
+
+    The pixels are copied once into shared memory and only the encoded bytes
+    come back from the workers, so the event loop never runs codec work. The
+    workers are started with 'spawn' so they do not inherit the event loop or
+    the threads of the engine. If the pool breaks, it is recreated up to
+    `MAX_POOL_RESTARTS` times in `POOL_RESTARTS_WINDOW` seconds, after which
+    the pictures are encoded in a thread until the oldest break leaves the
+    window.
+
+    :param max_workers: the number of worker processes.
+    """
+    def __init__(self, max_workers: int = PICTURE_ENCODER_WORKERS) -> None:
+        self.max_workers: int = max_workers
+        self.logger: Logger = getLogger("gaia.engine.picture_encoder")
+        self._executor: ProcessPoolExecutor | None = None
+        # Monotonic times at which the pool broke
+        self._breaks: deque[float] = deque()
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"{self.__class__.__name__}(max_workers={self.max_workers})"
+
+    @property
+    def use_processes(self) -> bool:
+        window_start = monotonic() - POOL_RESTARTS_WINDOW
+        while self._breaks and self._breaks[0] < window_start:
+            self._breaks.popleft()
+        return len(self._breaks) <= MAX_POOL_RESTARTS
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _discard_executor(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _encode_in_process(
+            self,
+            images: list[SerializableImage],
+            resize_ratio: float,
+            compression_format: str | None,
+            payload_uid: str | None,
+    ) -> bytes:
+        import numpy as np
+
+        shms: list[SharedMemory] = []
+        try:
+            shared_images: list[_SharedImage] = []
+            for image in images:
+                array = image.array
+                shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+                shms.append(shm)
+                view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+                view[...] = array
+                del view
+                shared_images.append(_SharedImage(
+                    shm.name, array.shape, array.dtype.str, image.metadata))
+            future = self._get_executor().submit(
+                _encode_shared_images, shared_images, resize_ratio,
+                compression_format, payload_uid)
+            return await asyncio.wrap_future(future)
+        finally:
+            for shm in shms:
+                shm.close()
+                shm.unlink()
+
+    async def _encode(
+            self,
+            images: list[SerializableImage],
+            resize_ratio: float,
+            compression_format: str | None,
+            payload_uid: str | None,
+    ) -> bytes:
+        while self.use_processes:
+            try:
+                return await self._encode_in_process(
+                    images, resize_ratio, compression_format, payload_uid)
+            except BrokenProcessPool:
+                self._breaks.append(monotonic())
+                self._discard_executor()
+                self.logger.warning(
+                    f"The picture encoder pool broke, restarting it "
+                    f"({len(self._breaks)}/{MAX_POOL_RESTARTS} in the last "
+                    f"{POOL_RESTARTS_WINDOW:.0f} s).")
+        return await run_sync(
+            _encode_images, images, resize_ratio, compression_format, payload_uid)
+
+    async def encode_image(
+            self,
+            image: SerializableImage,
+            resize_ratio: float = 1.0,
+            compression_format: str | None = None,
+    ) -> bytes:
+        """Resize and serialize an image."""
+        return await self._encode([image], resize_ratio, compression_format, None)
+
+    async def encode_payload(
+            self,
+            uid: str,
+            images: list[SerializableImage],
+            resize_ratio: float = 1.0,
+            compression_format: str | None = None,
+    ) -> bytes:
+        """Resize images and serialize them as a `SerializableImagePayload`."""
+        return await self._encode(images, resize_ratio, compression_format, uid)
+
+    async def stop(self) -> None:
+        if self._executor is not None:
+            executor = self._executor
+            self._executor = None
+            await run_sync(executor.shutdown)
+
+
+_picture_encoder: PictureEncoder | None = None
+
+
+def get_picture_encoder() -> PictureEncoder:
+    global _picture_encoder
+    if _picture_encoder is None:
+        _picture_encoder = PictureEncoder()
+    return _picture_encoder
+
+
+async def stop_picture_encoder() -> None:
+    global _picture_encoder
+    if _picture_encoder is not None:
+        await _picture_encoder.stop()
+        _picture_encoder = None
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from array import array
+from datetime import datetime
+import typing as t
+from typing import Iterable, Iterator, Literal, Mapping, NamedTuple
+
+import gaia_validators as gv
+
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from gaia.hardware.abc import SensorRead
+
+
+class FrameRecord(NamedTuple):
+    sensor_uid: str
+    measure: str
+    value: float
+
+
+class AlarmThreshold(NamedTuple):
+    lower: float  # target - hysteresis
+    upper: float  # target + hysteresis
+    alarm: float
+
+
+class AlarmTable:
+    """The alarm thresholds of an ecosystem, keyed by measure
+
+    The table is compiled once from the climate config for a given period of
+    the day and evaluated against a whole `SensorsFrame`: the thresholds are
+    mapped once on the frame measures table, then the values column is scanned.
+    """
+    __slots__ = ("thresholds",)
+
+    def __init__(self, thresholds: dict[str, AlarmThreshold]) -> None:
+        self.thresholds: dict[str, AlarmThreshold] = thresholds
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"{self.__class__.__name__}(measures={[*self.thresholds.keys()]})"
+
+    def __bool__(self) -> bool:
+        return bool(self.thresholds)
+
+    @classmethod
+    def compile(
+            cls,
+            climate: Mapping[str, Mapping],
+            period_of_day: Literal["day", "night"],
+    ) -> AlarmTable:
+        """Compile the thresholds of the climate parameters with an alarm."""
+        return cls({
+            parameter: AlarmThreshold(
+                values[period_of_day] - values["hysteresis"],
+                values[period_of_day] + values["hysteresis"],
+                values["alarm"],
+            )
+            for parameter, values in climate.items()
+            if values["alarm"]
+        })
+
+    def evaluate(self, frame: SensorsFrame) -> list[gv.SensorAlarm]:
+        # Map the thresholds on the frame measures table
+        frame_thresholds: list[AlarmThreshold | None] = [
+            self.thresholds.get(measure) for measure in frame.measures]
+        if not any(frame_thresholds):
+            return []
+        measures = frame.measures
+        alarms: list[gv.SensorAlarm] = []
+        for sensor_uid, measure_id, value in zip(
+                frame.sensor_uids, frame.measure_ids, frame.values):
+            threshold = frame_thresholds[measure_id]
+            if threshold is None:
+                continue
+            lower, upper, alarm = threshold
+            if lower <= value <= upper:
+                continue
+            direction: gv.Position
+            delta: float
+            if value < lower:
+                direction = gv.Position.under
+                delta = lower - value
+            else:
+                direction = gv.Position.above
+                delta = lower - value
+            level: gv.WarningLevel
+            if alarm < delta <= 1.5 * alarm:
+                level = gv.WarningLevel.moderate
+            elif 1.5 * alarm < delta <= 2.0 * alarm:
+                level = gv.WarningLevel.high
+            else:
+                level = gv.WarningLevel.critical
+            alarms.append(
+                gv.SensorAlarm(
+                    sensor_uid=sensor_uid,
+                    measure=measures[measure_id],
+                    position=direction,
+                    delta=delta,
+                    level=level,
+                )
+            )
+        return alarms
+
+
+class SensorsFrame:
+    """A struct-of-arrays snapshot of the sensors reads of an ecosystem
+
+    Each read is stored as a sensor uid, an index in the frame's measures table
+    and a float value, instead of one pydantic object per read. Averages are
+    computed in one pass over the columns, and the `gv.SensorsData` model is
+    only built (and cached) when needed, usually when it is sent to Ouranos.
+    """
+    __slots__ = (
+        "timestamp", "sensor_uids", "measures", "measure_ids", "values",
+        "alarms", "_measures_index", "_averages", "_model",
+    )
+
+    def __init__(self, timestamp: datetime) -> None:
+        self.timestamp: datetime = timestamp
+        self.sensor_uids: list[str] = []
+        self.measures: list[str] = []  # The measures table
+        self.measure_ids: array[int] = array("H")
+        self.values: array[float] = array("d")
+        self.alarms: list[gv.SensorAlarm] = []
+        self._measures_index: dict[str, int] = {}
+        self._averages: dict[str, float] | None = None
+        self._model: gv.SensorsData | None = None
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return (
+            f"{self.__class__.__name__}({self.timestamp}, records={len(self)}, "
+            f"measures={self.measures})"
+        )
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self) -> Iterator[FrameRecord]:
+        measures = self.measures
+        for sensor_uid, measure_id, value in zip(
+                self.sensor_uids, self.measure_ids, self.values):
+            yield FrameRecord(sensor_uid, measures[measure_id], value)
+
+    def _invalidate(self) -> None:
+        self._averages = None
+        self._model = None
+
+    def get_measure_id(self, measure: str) -> int:
+        try:
+            return self._measures_index[measure]
+        except KeyError:
+            measure_id = self._measures_index[measure] = len(self.measures)
+            self.measures.append(measure)
+            return measure_id
+
+    def add(self, sensor_uid: str, measure: str, value: float) -> None:
+        self.sensor_uids.append(sensor_uid)
+        self.measure_ids.append(self.get_measure_id(measure))
+        self.values.append(value)
+        self._invalidate()
+
+    def extend(self, sensor_reads: Iterable[SensorRead]) -> None:
+        """Add the reads with a value, skipping the failed ones."""
+        for sensor_read in sensor_reads:
+            if sensor_read.value is None:
+                continue
+            self.sensor_uids.append(sensor_read.sensor_uid)
+            self.measure_ids.append(self.get_measure_id(sensor_read.measure))
+            self.values.append(sensor_read.value)
+        self._invalidate()
+
+    def set_alarms(self, alarms: list[gv.SensorAlarm]) -> None:
+        self.alarms = alarms
+        self._model = None
+
+    @property
+    def averages(self) -> dict[str, float]:
+        """The average value of each measure, rounded to 2 digits."""
+        if self._averages is None:
+            sums: list[float] = [0.0] * len(self.measures)
+            counts: list[int] = [0] * len(self.measures)
+            for measure_id, value in zip(self.measure_ids, self.values):
+                sums[measure_id] += value
+                counts[measure_id] += 1
+            self._averages = {
+                measure: round(sums[measure_id] / counts[measure_id], 2)
+                for measure_id, measure in enumerate(self.measures)
+                if counts[measure_id]
+            }
+        return self._averages
+
+    def to_model(self) -> gv.SensorsData:
+        if self._model is None:
+            self._model = gv.SensorsData(
+                timestamp=self.timestamp,
+                records=[
+                    gv.SensorRecord(record.sensor_uid, record.measure, record.value)
+                    for record in self
+                ],
+                average=[
+                    gv.MeasureAverage(measure=measure, value=value, timestamp=None)
+                    for measure, value in self.averages.items()
+                ],
+                alarms=self.alarms,
+            )
+        return self._model
+
+    @classmethod
+    def from_model(cls, sensors_data: gv.SensorsData) -> SensorsFrame:
+        frame = cls(sensors_data.timestamp)
+        for record in sensors_data.records:
+            if record.value is None:
+                continue
+            frame.add(record.sensor_uid, record.measure, record.value)
+        frame.alarms = [*sensors_data.alarms]
+        frame._averages = {
+            average.measure: average.value
+            for average in sensors_data.average
+        }
+        frame._model = sensors_data
+        return frame
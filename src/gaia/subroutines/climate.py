@@ -15,6 +15,7 @@ from gaia.subroutines.template import SubroutineTemplate
 
 if t.TYPE_CHECKING:  # pragma: no cover
     from gaia.actuator_handler import ActuatorHandler
+    from gaia.data_bus import SensorsFrameMessage
     from gaia.subroutines.sensors import Sensors
 
 
@@ -41,6 +42,12 @@ class Climate(SubroutineTemplate[Actuator]):
         self._actuator_handlers: dict[ClimateDirection, ActuatorHandler] | None = None
         self._pids: dict[gv.ClimateParameter, HystericalPID] | None = None
         self._sensor_miss: int = 0
+        # Monotonic time of the last routine triggered by a sensors frame
+        self._last_routine: float | None = None
+        # Cached regulation plan, see `expected_actuators`
+        self._expected_actuators: dict[ClimateDirection, str] | None = None
+        self._parameter_measures: dict[gv.ClimateParameter, str] = {}
+        self._plan_generation: int = -1
 
     """SubroutineTemplate methods"""
     async def _routine(self) -> None:
@@ -82,17 +89,27 @@ class Climate(SubroutineTemplate[Actuator]):
             self.pids[climate_parameter] = pid
         # Mount required actuator handlers
         self._actuator_handlers = {}
-        climate_directions = self.compute_expected_actuators()
+        self.reset_cached_plan()
+        climate_directions = self.expected_actuators
         for climate_direction in climate_directions:
             await self._mount_actuator_handler(climate_direction)
+        # The routine is triggered by the sensors frames published on the bus
+        self._last_routine = None
+        self.ecosystem.engine.data_bus.subscribe(
+            "sensors_frame", self._bus_subscriber_name, self._on_sensors_frame,
+            ecosystem_uid=self.ecosystem.uid)
 
     async def _stop(self) -> None:
+        self.ecosystem.engine.data_bus.unsubscribe(
+            "sensors_frame", self._bus_subscriber_name)
+        self._last_routine = None
         # Deactivate activated actuator handlers
         for climate_direction in [*self.actuator_handlers.keys()]:
             await self._unmount_actuator_handler(climate_direction)
         # Reset actuator handlers and PIDs
         self._actuator_handlers = None
         self._pids = None
+        self.reset_cached_plan()
 
     def get_hardware_needed_uid(self) -> set[str]:
         hardware_needed: set[str] = set()
@@ -104,8 +121,10 @@ class Climate(SubroutineTemplate[Actuator]):
     async def _refresh(self) -> None:
         # Make sure PIDs are in sync with actuator handlers
         assert self._pids is not None
+        # Hardware or config changed, recompute the regulation plan
+        self.reset_cached_plan()
         # Activate, deactivate and reset actuator handlers if required
-        currently_expected: set[ClimateDirection] = set(self.compute_expected_actuators())
+        currently_expected: set[ClimateDirection] = set(self.expected_actuators)
         currently_mounted: set[ClimateDirection] = set(self.actuator_handlers.keys())
         for climate_direction in currently_expected - currently_mounted:
             await self._mount_actuator_handler(climate_direction)
@@ -119,6 +138,24 @@ class Climate(SubroutineTemplate[Actuator]):
             pid.reset()
 
     """Routine specific methods"""
+    @property
+    def _bus_subscriber_name(self) -> str:
+        return f"{self.ecosystem.uid}-climate"
+
+    async def _on_sensors_frame(self, message: SensorsFrameMessage) -> None:
+        if message.ecosystem_uid != self.ecosystem.uid:
+            return
+        now = monotonic()
+        if self._last_routine is not None:
+            # Allow half a sensors loop period of tolerance so that the jitter
+            #  of the sensors routine does not skip a whole climate period
+            sensors_subroutine: Sensors = self.ecosystem.get_subroutine("sensors")
+            tolerance = sensors_subroutine._loop_period / 2
+            if now - self._last_routine < self._loop_period - tolerance:
+                return
+        self._last_routine = now
+        await self.routine()
+
     def get_actuator_handler(self, actuator_group: str) -> ActuatorHandler:
         return self.ecosystem.actuator_hub.get_handler(actuator_group)
 
@@ -230,11 +267,31 @@ class Climate(SubroutineTemplate[Actuator]):
             return {}
         return rv
 
+    def reset_cached_plan(self) -> None:
+        self._expected_actuators = None
+        self._parameter_measures = {}
+
+    def _check_cached_plan(self) -> None:
+        # The plan only depends on the config and the mounted hardware, which
+        #  is refreshed via `_refresh()`
+        if self._plan_generation != self.config.generation:
+            self.reset_cached_plan()
+            self._plan_generation = self.config.generation
+
+    @property
+    def expected_actuators(self) -> dict[ClimateDirection, str]:
+        """A cached version of `compute_expected_actuators()`, reset when the
+        config or the hardware changes."""
+        self._check_cached_plan()
+        if self._expected_actuators is None:
+            self._expected_actuators = self.compute_expected_actuators()
+        return self._expected_actuators
+
     @property
     def regulated_parameters(self) -> list[gv.ClimateParameter]:
         if not self.started:
             return []
-        expected_actuators = self.compute_expected_actuators()
+        expected_actuators = self.expected_actuators
         return [*set([
             climate_direction[0] for climate_direction
             in expected_actuators.keys()
@@ -250,21 +307,30 @@ class Climate(SubroutineTemplate[Actuator]):
             return True
         return False
 
-    def _get_measure_for_parameter(self, parameter: gv.ClimateParameter) -> str:
+    def _compute_measure_for_parameter(self, parameter: gv.ClimateParameter) -> str:
         climate_cfg = self.config.get_climate_parameter(parameter)
         return (
             climate_cfg.linked_measure
             if climate_cfg.linked_measure else parameter.name
         )
 
+    def _get_measure_for_parameter(self, parameter: gv.ClimateParameter) -> str:
+        self._check_cached_plan()
+        try:
+            return self._parameter_measures[parameter]
+        except KeyError:
+            measure = self._parameter_measures[parameter] = \
+                self._compute_measure_for_parameter(parameter)
+            return measure
+
     async def _get_sensors_average(self) -> dict[str, float]:
         # Get the sensors average
         prior_sensor_miss = self._sensor_miss
         sensors_subroutine: Sensors = self.ecosystem.get_subroutine("sensors")
-        sensors_data = sensors_subroutine.sensors_data
+        sensors_frame = sensors_subroutine.sensors_frame
         sensors_average: dict[str, float]
 
-        if isinstance(sensors_data, gv.Empty):
+        if sensors_frame is None:
             self.logger.debug(
                 f"No sensor data found, climate subroutine will try again "
                 f"{MISSES_BEFORE_STOP - self._sensor_miss} times before "
@@ -272,10 +338,7 @@ class Climate(SubroutineTemplate[Actuator]):
             self._sensor_miss += 1
             sensors_average = {}
         else:
-            sensors_average = {
-                data.measure: data.value
-                for data in sensors_data.average
-            }
+            sensors_average = sensors_frame.averages
 
         # Make sure we have sensors data for all the regulated parameters
         missing_parameter: bool = False
@@ -237,16 +237,19 @@ class Health(SubroutineTemplate[Camera]):
             if gv.is_empty(self._plants_health):
                 self.logger.info("No health data to log.")
                 return
-            for record in self._plants_health.records:
-                session.add(
-                    db_model(
-                        ecosystem_uid=self.ecosystem.uid,
-                        sensor_uid=record.sensor_uid,
-                        measure=record.measure,
-                        value=record.value,
-                        timestamp=record.timestamp,
-                    )
-                )
+            await db_model.insert_many(
+                session,
+                [
+                    {
+                        "ecosystem_uid": self.ecosystem.uid,
+                        "sensor_uid": record.sensor_uid,
+                        "measure": record.measure,
+                        "value": record.value,
+                        "timestamp": record.timestamp,
+                    }
+                    for record in self._plants_health.records
+                ],
+            )
             await session.commit()
 
     async def log_data(self) -> None:
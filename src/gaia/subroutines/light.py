@@ -17,6 +17,7 @@ from gaia.subroutines.template import SubroutineTemplate
 
 if typing.TYPE_CHECKING:
     from gaia.actuator_handler import ActuatorHandler
+    from gaia.data_bus import SensorsFrameMessage
 
 
 class Light(SubroutineTemplate[Actuator]):
@@ -36,6 +37,8 @@ class Light(SubroutineTemplate[Actuator]):
             self.ecosystem.engine.config.app_config.LIGHT_LOOP_PERIOD)
         self._get_lux_futures: list[Task] = []
         self._task: Task | None = None
+        # (monotonic time, light level) from the last sensors frame
+        self._frame_light_level: tuple[float, float] | None = None
 
     """SubroutineTemplate methods"""
     async def _routine(self) -> None:
@@ -88,9 +91,16 @@ class Light(SubroutineTemplate[Actuator]):
             f"{self._loop_period:.2f} s.")
         self._task = asyncio.create_task(
             self.routine_task(), name=f"{self.ecosystem.uid}-light-routine")
+        # Reuse the light levels read by the sensors subroutine
+        self.ecosystem.engine.data_bus.subscribe(
+            "sensors_frame", self._bus_subscriber_name, self._on_sensors_frame,
+            ecosystem_uid=self.ecosystem.uid)
 
     async def _stop(self) -> None:
         self.logger.info("Stopping light loop.")
+        self.ecosystem.engine.data_bus.unsubscribe(
+            "sensors_frame", self._bus_subscriber_name)
+        self._frame_light_level = None
         # Stop light routine
         assert self._task is not None
         self._task.cancel()
@@ -128,6 +138,7 @@ class Light(SubroutineTemplate[Actuator]):
         self.pid.reset()
         self.reset_light_sensors()
         self.reset_any_dimmable_light()
+        self._frame_light_level = None
 
     """Routine specific methods"""
     def _get_actuator_group(self) -> str:
@@ -182,11 +193,44 @@ class Light(SubroutineTemplate[Actuator]):
     def reset_any_dimmable_light(self) -> None:
         self._any_dimmable_light = None
 
+    @property
+    def _bus_subscriber_name(self) -> str:
+        return f"{self.ecosystem.uid}-light"
+
+    async def _on_sensors_frame(self, message: SensorsFrameMessage) -> None:
+        if message.ecosystem_uid != self.ecosystem.uid or message.frame is None:
+            return
+        light_sensor_uids = {light_sensor.uid for light_sensor in self.light_sensors}
+        # Only use the frame if all the light sensors have just been read
+        if not light_sensor_uids or not light_sensor_uids <= message.fresh_sensor_uids:
+            return
+        light_level: list[float] = [
+            record.value
+            for record in message.frame
+            if record.measure == "light" and record.sensor_uid in light_sensor_uids
+        ]
+        if light_level:
+            self._frame_light_level = (monotonic(), mean(light_level))
+
+    def _pop_frame_light_level(self) -> float | None:
+        if self._frame_light_level is None:
+            return None
+        received, light_level = self._frame_light_level
+        self._frame_light_level = None
+        if monotonic() - received > self._loop_period:
+            return None
+        return light_level
+
     async def _get_ambient_light_level(self) -> float:
         # If there isn't any light sensors we cannot get the info
         # If there isn't any dimmable light, the info cannot be properly used
         if not self.light_sensors or not self.any_dimmable_light:
             return 0.0  # Fallback value
+        # Don't read the sensors again if they have just been read by the
+        #  sensors subroutine
+        frame_light_level = self._pop_frame_light_level()
+        if frame_light_level is not None:
+            return frame_light_level
         self._get_lux_futures = [
             asyncio.create_task(light_sensor.get_lux())
             for light_sensor in self.light_sensors
@@ -3,8 +3,6 @@ from __future__ import annotations
 import asyncio
 from asyncio import CancelledError, Task
 from datetime import datetime, timezone
-from math import floor
-from statistics import mean
 from time import monotonic
 import typing as t
 from typing import cast, Literal, Type
@@ -13,9 +11,14 @@ from apscheduler.triggers.interval import IntervalTrigger
 
 import gaia_validators as gv
 
+from gaia.data_bus import SensorsFrameMessage
+from gaia.exceptions import HardwareNotFound
 from gaia.hardware import sensor_models
 from gaia.hardware.abc import Sensor, SensorRead
+from gaia.hardware.health import HardwareHealthTracker
+from gaia.sensors_frame import AlarmTable, SensorsFrame
 from gaia.subroutines.template import SubroutineTemplate
+from gaia.time_series import SensorsHistory
 
 
 if t.TYPE_CHECKING:  # pragma: no cover
@@ -25,6 +28,8 @@ if t.TYPE_CHECKING:  # pragma: no cover
 
 class _SensorFuture(Task):
     hardware_uid: str
+    # Set when the read missed its deadline and was counted as a failure
+    timed_out: bool
 
 
 class Sensors(SubroutineTemplate[Sensor]):
@@ -32,21 +37,33 @@ class Sensors(SubroutineTemplate[Sensor]):
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
-        loop_period = float(self.ecosystem.engine.config.app_config.SENSORS_LOOP_PERIOD)
+        app_config = self.ecosystem.engine.config.app_config
+        loop_period = float(app_config.SENSORS_LOOP_PERIOD)
         self._loop_period: float = max(loop_period, 10.0)
+        self._history: SensorsHistory = SensorsHistory(
+            window=float(app_config.SENSORS_HISTORY_WINDOW),
+            sampling_period=self._loop_period,
+        )
         self._get_sensor_records_futures: list[_SensorFuture] = []
         self._slow_sensor_futures: set[_SensorFuture] = set()
-        self._sensors_data: gv.SensorsData | gv.Empty = gv.Empty()
+        # Monotonic time at which each sensor should be read next
+        self._next_reads: dict[str, float] = {}
+        # Last reads, used for the sensors that were not due during a routine
+        self._last_reads: dict[str, list[SensorRead]] = {}
+        # The `gv.SensorsData` model is only built from the frame when needed
+        self._sensors_frame: SensorsFrame | None = None
+        # Uids of the sensors read during the last routine
+        self._fresh_sensor_uids: set[str] = set()
+        # Alarm thresholds, compiled for the current config and period of day
+        self._alarm_table: AlarmTable | None = None
+        self._alarm_table_generation: int = -1
+        self._alarm_table_expiration: float = 0.0
+        # Sensors that keep failing are skipped for 1, 2, 4, ... up to 64 loops
+        self._health: HardwareHealthTracker = HardwareHealthTracker(
+            backoff_base=self._loop_period,
+            backoff_max=self._loop_period * 64,
+        )
         #self._data_lock = Lock()
-        self._sending_data_task: Task | None = None
-        self._climate_routine_counter: int = 0
-        self._climate_routine_task: Task | None = None
-
-    @property
-    def _climate_routine_ratio(self) -> int:
-        climate_subroutine: Climate = self.ecosystem.get_subroutine("climate")
-        climate_loop_period: float = climate_subroutine._loop_period
-        return floor(max(1.0, climate_loop_period / self._loop_period))
 
     async def _routine(self) -> None:
         start_time = monotonic()
@@ -61,14 +78,9 @@ class Sensors(SubroutineTemplate[Sensor]):
         finally:
             update_time = monotonic() - start_time
             self.logger.debug(f"Sensors data update finished in {update_time:.1f} s.")
-        if self.ecosystem.engine.use_message_broker:
-            try:
-                await self.schedule_send_data()
-            except Exception as e:
-                self.logger.error(
-                    f"Encountered an error while sending sensors data and warnings. "
-                    f"ERROR msg: `{e.__class__.__name__}: {e}`."
-                )
+        # Climate, Light, the database logger and the Ouranos sender are
+        #  subscribed to the data bus
+        self.publish_sensors_frame()
         loop_time = monotonic() - start_time
         if loop_time > self._loop_period:  # pragma: no cover
             self.logger.warning(
@@ -76,8 +88,6 @@ class Sensors(SubroutineTemplate[Sensor]):
                 f"indicates errors while data retrieval or the need to "
                 f"adapt 'SENSOR_LOOP_PERIOD'."
             )
-        if self.ecosystem.get_subroutine_status("climate"):
-            await self.trigger_climate_routine()
 
     def _compute_if_manageable(self) -> bool:
         if self.ecosystem.get_hardware_group_uids(gv.HardwareType.sensor):
@@ -117,13 +127,27 @@ class Sensors(SubroutineTemplate[Sensor]):
                 # Futures created via `anyio.run_sync()` raise `CancelledError`
                 #  when a parent task is cancelled
                 pass
-        self._sending_data_task = None
+        self._next_reads.clear()
+        self._last_reads.clear()
+        self._fresh_sensor_uids.clear()
+        self._health.clear()
+        self._alarm_table = None
 
     """API calls"""
     def get_hardware_needed_uid(self) -> set[str]:
         return set(self.ecosystem.get_hardware_group_uids(gv.HardwareType.sensor))
 
     async def _refresh(self) -> None:
+        # Sampling periods might have changed, read all the sensors during the
+        #  next routine
+        self._next_reads.clear()
+        self._last_reads = {
+            hardware_uid: sensor_reads
+            for hardware_uid, sensor_reads in self._last_reads.items()
+            if hardware_uid in self.hardware
+        }
+        self._history.retain(set(self.hardware.keys()))
+        self._health.retain(set(self.hardware.keys()))
         # Refresh climate and light subroutines if they are running
         if self.ecosystem.get_subroutine_status("climate"):
             climate_subroutine: Climate = self.ecosystem.get_subroutine("climate")
@@ -132,123 +156,179 @@ class Sensors(SubroutineTemplate[Sensor]):
             light_subroutine: Light = self.ecosystem.get_subroutine("light")
             light_subroutine.reset_light_sensors()
 
+    @property
+    def sensors_frame(self) -> SensorsFrame | None:
+        return self._sensors_frame
+
     @property
     def sensors_data(self) -> gv.SensorsData | gv.Empty:
-        #async with self._data_lock:
-        return self._sensors_data
+        if self._sensors_frame is None:
+            return gv.Empty()
+        return self._sensors_frame.to_model()
 
     @sensors_data.setter
     def sensors_data(self, data: gv.SensorsData | gv.Empty) -> None:
-        #async with self._data_lock:
-        self._sensors_data = data
+        if isinstance(data, gv.Empty):
+            self._sensors_frame = None
+        else:
+            self._sensors_frame = SensorsFrame.from_model(data)
+
+    @property
+    def health(self) -> HardwareHealthTracker:
+        """The latency and failures of each sensor."""
+        return self._health
+
+    @property
+    def history(self) -> SensorsHistory:
+        """The recent values of each (sensor uid, measure) pair."""
+        return self._history
+
+    def _add_to_history(self, sensor_reads: list[SensorRead], timestamp: float) -> None:
+        for sensor_read in sensor_reads:
+            if sensor_read.value is None:
+                continue
+            self._history.append(
+                sensor_read.sensor_uid, sensor_read.measure, sensor_read.value, timestamp)
+
+    def get_sampling_period(self, hardware: Sensor) -> float:
+        try:
+            sampling_period = self.config.get_hardware_sampling_period(hardware.uid)
+        except HardwareNotFound:  # pragma: no cover
+            # The config changed and the hardware has not been refreshed yet
+            sampling_period = None
+        if sampling_period is None:
+            sampling_period = self._loop_period
+        return max(sampling_period, hardware.min_sampling_period)
+
+    def _is_due(self, hardware_uid: str, now: float) -> bool:
+        # Allow half a loop period of tolerance so that the jitter of the
+        #  routine does not delay the reads by a whole loop period
+        return self._next_reads.get(hardware_uid, 0.0) <= now + self._loop_period / 2
+
+    async def _read_sensor(self, hardware: Sensor) -> list[SensorRead]:
+        health = self._health[hardware.uid]
+        task = asyncio.current_task()
+        start = monotonic()
+        try:
+            sensor_reads = await hardware.get_data()
+        except Exception as e:
+            self.logger.error(
+                f"Encountered an error while reading sensor '{hardware.uid}'. "
+                f"ERROR msg: `{e.__class__.__name__}: {e}`.")
+            sensor_reads = []
+            failed = True
+        else:
+            failed = bool(sensor_reads) and all(
+                sensor_read.value is None for sensor_read in sensor_reads)
+        latency = monotonic() - start
+        if getattr(task, "timed_out", False):
+            # The read has already been counted as a failure when it missed
+            #  its deadline, only keep track of its latency
+            health.record_latency(latency)
+        elif failed:
+            health.record_failure(latency)
+        else:
+            health.record_success(latency)
+        return sensor_reads
 
-    async def _add_sensor_records(
-            self,
-            cache: gv.SensorsDataDict,
-    ) -> gv.SensorsDataDict:
+    async def _add_sensor_records(self, frame: SensorsFrame) -> SensorsFrame:
         slow_sensors: list[str] = [
             future.hardware_uid
             for future in self._slow_sensor_futures
         ]
+        now = monotonic()
         self._get_sensor_records_futures: list[_SensorFuture] = []
         for hardware in self.hardware.values():
             # Do not try to get data from sensors still trying to get their measures
             if hardware.uid in slow_sensors:
+                self._last_reads.pop(hardware.uid, None)
                 continue
+            # Sensors not due keep their last reads
+            if not self._is_due(hardware.uid, now):
+                continue
+            self._last_reads.pop(hardware.uid, None)
+            # Skip the sensors that keep failing until their back-off expires
+            if not self._health[hardware.uid].allow(now):
+                continue
+            self._next_reads[hardware.uid] = now + self.get_sampling_period(hardware)
             future = asyncio.create_task(
-                hardware.get_data(),
+                self._read_sensor(hardware),
                 name=f"{self.ecosystem.uid}-sensors-{hardware.uid}-get_data"
             )
             future = cast(_SensorFuture, future)
             future.hardware_uid = hardware.uid
+            future.timed_out = False
             self._get_sensor_records_futures.append(future)
-        # Try to get data from sensors that took too long during last loop
-        self._get_sensor_records_futures.extend(self._slow_sensor_futures)
-        # Wait for 5 secs for sensors to get data. This allows GPIO sensors to fail once
-        done, pending = await asyncio.wait(self._get_sensor_records_futures, timeout=5)
-        new_slow_futures = pending - self._slow_sensor_futures
-        # Log the sensors that took too long
-        for future in new_slow_futures:
+        # Wait for the sensors for a duration derived from their usual latency,
+        #  at most half a loop period
+        done: set[_SensorFuture] = set()
+        pending: set[_SensorFuture] = set()
+        if self._get_sensor_records_futures:
+            deadline = min(
+                self._health.get_read_deadline([
+                    future.hardware_uid
+                    for future in self._get_sensor_records_futures
+                ]),
+                self._loop_period / 2,
+            )
+            done, pending = await asyncio.wait(
+                self._get_sensor_records_futures, timeout=deadline)
+        # Log the sensors that took too long, they count as failing
+        for future in pending:
+            future.timed_out = True
+            self._health[future.hardware_uid].record_failure(now=now)
             self.logger.warning(
                 f"Sensor with uid '{future.hardware_uid}' took too long to "
                 f"fetch data. Will try to gather data during next routine.")
+        # Sensors that took too long during last loop are not waited for again,
+        #  only collected if they finished in the meantime
+        for future in self._slow_sensor_futures:
+            if future.done():
+                done.add(future)
+            else:
+                pending.add(future)
         self._slow_sensor_futures = pending
         # Gather the data
-        sensors_reads: list[list[SensorRead]] = [future.result() for future in done]
-        for sensor_reads in sensors_reads:
-            cache["records"].extend(
-                gv.SensorRecord(
-                    sensor_read.sensor_uid,
-                    sensor_read.measure,
-                    sensor_read.value
-                )
-                for sensor_read in sensor_reads
-                if sensor_read.value is not None
-            )
-        return cache
-
-    def _add_sensor_averages(self, cache: gv.SensorsDataDict) -> gv.SensorsDataDict:
-        to_average: dict[str, list[float]] = {}
-        for record in cache["records"]:
-            try:
-                to_average[record.measure].append(record.value)
-            except KeyError:
-                to_average[record.measure] = [record.value]
-        average = [
-            gv.MeasureAverage(
-                measure=measure,
-                value=round(mean(value), 2),
-                timestamp=None,
-            )
-            for measure, value in to_average.items()
-        ]
-        cache["average"] = average
-        return cache
-
-    def _add_sensor_warnings(self, cache: gv.SensorsDataDict) -> gv.SensorsDataDict:
-        # Get the target, the hysteresis and the alarm threshold
-        pod: Literal["day", "night"] = "day" if self.config.is_day() else "night"
-        parameter_limits: dict[str, tuple[float, float, float]] = {
-            parameter: (values[pod], values["hysteresis"], values["alarm"])
-            for parameter, values in self.config.climate.items()
-            if values["alarm"]
-        }
-        # If no `parameter_limits`: stop
-        if not parameter_limits:
-            return cache
-        sensor_warnings: list[gv.SensorAlarm] = []
-        for record in cache["records"]:
-            if record.measure not in parameter_limits:
+        read_time = monotonic()
+        self._fresh_sensor_uids = set()
+        for future in done:
+            if future.cancelled():  # pragma: no cover
                 continue
-            p_lim = parameter_limits[record.measure]
-            direction: gv.Position
-            delta: float
-            if record.value < p_lim[0] - p_lim[1]:
-                direction = gv.Position.under
-                delta = p_lim[0] - p_lim[1] - record.value
-            elif record.value > p_lim[0] + p_lim[1]:
-                direction = gv.Position.above
-                delta = p_lim[0] - p_lim[1] - record.value
-            else:
+            sensor_reads = future.result()
+            if not sensor_reads:
                 continue
-            level: gv.WarningLevel
-            if p_lim[2] < delta <= 1.5 * p_lim[2]:
-                level = gv.WarningLevel.moderate
-            elif 1.5 * p_lim[2] < delta <= 2.0 * p_lim[2]:
-                level = gv.WarningLevel.high
-            else:
-                level = gv.WarningLevel.critical
-            sensor_warnings.append(
-                gv.SensorAlarm(
-                    sensor_uid=record.sensor_uid,
-                    measure=record.measure,
-                    position=direction,
-                    delta=delta,
-                    level=level,
-                )
-            )
-        cache["alarms"] = sensor_warnings
-        return cache
+            self._last_reads[future.hardware_uid] = sensor_reads
+            self._fresh_sensor_uids.add(future.hardware_uid)
+            # Only fresh reads go to the history, not the carried forward ones
+            self._add_to_history(sensor_reads, read_time)
+        for hardware_uid in self.hardware:
+            sensor_reads = self._last_reads.get(hardware_uid)
+            if sensor_reads is None:
+                continue
+            frame.extend(sensor_reads)
+        return frame
+
+    def _get_alarm_table(self) -> AlarmTable:
+        # Only recompile the table when the config or the period of day changed
+        now = monotonic()
+        if (
+                self._alarm_table is None
+                or self._alarm_table_generation != self.config.generation
+                or now >= self._alarm_table_expiration
+        ):
+            pod: Literal["day", "night"] = "day" if self.config.is_day() else "night"
+            self._alarm_table = AlarmTable.compile(self.config.climate, pod)
+            self._alarm_table_generation = self.config.generation
+            self._alarm_table_expiration = now + self.config.get_time_to_phase_change()
+        return self._alarm_table
+
+    def _add_sensor_warnings(self, frame: SensorsFrame) -> SensorsFrame:
+        alarm_table = self._get_alarm_table()
+        # If no alarm threshold: stop
+        if not alarm_table:
+            return frame
+        frame.set_alarms(alarm_table.evaluate(frame))
+        return frame
 
     async def update_sensors_data(self) -> None:
         """
@@ -258,21 +338,15 @@ class Sensors(SubroutineTemplate[Sensor]):
             raise RuntimeError(
                 "Sensors subroutine has to be started to update the sensors data"
             )
-        cache: gv.SensorsDataDict = {
-            "timestamp": datetime.now(timezone.utc).replace(microsecond=0),
-            "records": [],
-            "average": [],
-            "alarms": [],
-        }
-        cache = await self._add_sensor_records(cache)
-        cache = self._add_sensor_averages(cache)
+        frame = SensorsFrame(datetime.now(timezone.utc).replace(microsecond=0))
+        frame = await self._add_sensor_records(frame)
         alarms_flag = gv.ManagementFlags.alarms
         if (self.config.management_flag & alarms_flag) == alarms_flag:
-            cache = self._add_sensor_warnings(cache)
-        if len(cache["records"]) > 0:
-            self.sensors_data = gv.SensorsData(**cache)  # ty: ignore[invalid-argument-type]
+            frame = self._add_sensor_warnings(frame)
+        if len(frame) > 0:
+            self._sensors_frame = frame
         else:
-            self.sensors_data = gv.Empty()
+            self._sensors_frame = None
 
     async def send_data(self) -> None:
         # Check if we use the message broker
@@ -282,25 +356,14 @@ class Sensors(SubroutineTemplate[Sensor]):
         await self.ecosystem.engine.event_handler.send_payload_if_connected(
             "sensors_data", ecosystem_uids=[self.ecosystem.uid])
 
-    async def schedule_send_data(self) -> None:
-        if not (
-                self._sending_data_task is None
-                or self._sending_data_task.done()
-        ):
-            self.logger.warning(
-                "There is already a sensors data sending task running. It will "
-                "be cancelled to start a new one."
-            )
-            self._sending_data_task.cancel()
-        self._sending_data_task = asyncio.create_task(
-            self.send_data(), name=f"{self.ecosystem.uid}-sensors-send_data")
+    def publish_sensors_frame(self) -> int:
+        """Publish the current sensors frame on the engine data bus.
 
-    async def trigger_climate_routine(self) -> None:
-        if self._climate_routine_counter % self._climate_routine_ratio == 0:
-            self._climate_routine_counter = 0
-            climate_subroutine: Climate = self.ecosystem.get_subroutine("climate")
-            self._climate_routine_task = asyncio.create_task(
-                climate_subroutine.routine(),
-                name=f"{self.ecosystem.uid}-climate-routine",
-            )
-        self._climate_routine_counter += 1
+        :return: The number of subscribers the frame was published to.
+        """
+        message = SensorsFrameMessage(
+            ecosystem_uid=self.ecosystem.uid,
+            frame=self._sensors_frame,
+            fresh_sensor_uids=frozenset(self._fresh_sensor_uids),
+        )
+        return self.ecosystem.engine.data_bus.publish("sensors_frame", message)
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from math import ceil
+from time import monotonic
+
+
+class RingBuffer:
+    """A fixed-capacity time series of floats
+
+    Values and their monotonic timestamps are stored in preallocated
+    `array('d')`, so the memory used does not grow over time. Appending a value
+    and computing the mean, min and max of the values held are O(1) (amortized
+    for min and max, which rely on monotonic queues).
+
+    :param capacity: the maximum number of values held.
+    :param window: the maximum age of the values held, in seconds. If None,
+                   values are only dropped when the buffer is full.
+    """
+    __slots__ = (
+        "_capacity", "_window", "_values", "_timestamps", "_start", "_size",
+        "_count", "_sum", "_min_queue", "_max_queue",
+    )
+
+    def __init__(self, capacity: int, window: float | None = None) -> None:
+        if capacity < 1:
+            raise ValueError("capacity should be a strictly positive integer")
+        self._capacity: int = capacity
+        self._window: float | None = window
+        self._values: array[float] = array("d", bytes(8 * capacity))
+        self._timestamps: array[float] = array("d", bytes(8 * capacity))
+        self._start: int = 0  # Index of the oldest value
+        self._size: int = 0
+        self._count: int = 0  # Total number of values appended
+        self._sum: float = 0.0
+        # Monotonic queues of (sequence number, value)
+        self._min_queue: deque[tuple[int, float]] = deque()
+        self._max_queue: deque[tuple[int, float]] = deque()
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return (
+            f"{self.__class__.__name__}(size={self._size}, "
+            f"capacity={self._capacity}, window={self._window})"
+        )
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def window(self) -> float | None:
+        return self._window
+
+    def _pop_oldest(self) -> None:
+        sequence = self._count - self._size
+        self._sum -= self._values[self._start]
+        if self._min_queue[0][0] == sequence:
+            self._min_queue.popleft()
+        if self._max_queue[0][0] == sequence:
+            self._max_queue.popleft()
+        self._start = (self._start + 1) % self._capacity
+        self._size -= 1
+        if self._size == 0:
+            # Reset the sum to avoid the accumulation of rounding errors
+            self._sum = 0.0
+
+    def _drop_expired(self, now: float) -> None:
+        if self._window is None:
+            return
+        limit = now - self._window
+        while self._size and self._timestamps[self._start] < limit:
+            self._pop_oldest()
+
+    def append(self, value: float, timestamp: float | None = None) -> None:
+        """Append a value, dropping the oldest one if the buffer is full.
+
+        :param value: the value to append.
+        :param timestamp: the `time.monotonic()` time of the value. Defaults
+                          to now.
+        """
+        timestamp = monotonic() if timestamp is None else timestamp
+        self._drop_expired(timestamp)
+        if self._size == self._capacity:
+            self._pop_oldest()
+        index = (self._start + self._size) % self._capacity
+        self._values[index] = value
+        self._timestamps[index] = timestamp
+        sequence = self._count
+        self._count += 1
+        self._size += 1
+        self._sum += value
+        while self._min_queue and self._min_queue[-1][1] >= value:
+            self._min_queue.pop()
+        self._min_queue.append((sequence, value))
+        while self._max_queue and self._max_queue[-1][1] <= value:
+            self._max_queue.pop()
+        self._max_queue.append((sequence, value))
+
+    def refresh(self, now: float | None = None) -> None:
+        """Drop the values older than the window."""
+        self._drop_expired(monotonic() if now is None else now)
+
+    def clear(self) -> None:
+        self._start = 0
+        self._size = 0
+        self._sum = 0.0
+        self._min_queue.clear()
+        self._max_queue.clear()
+
+    @property
+    def last(self) -> float | None:
+        if not self._size:
+            return None
+        return self._values[(self._start + self._size - 1) % self._capacity]
+
+    @property
+    def mean(self) -> float | None:
+        if not self._size:
+            return None
+        return self._sum / self._size
+
+    @property
+    def min(self) -> float | None:
+        if not self._size:
+            return None
+        return self._min_queue[0][1]
+
+    @property
+    def max(self) -> float | None:
+        if not self._size:
+            return None
+        return self._max_queue[0][1]
+
+    def _ordered(self, data: array[float]) -> list[float]:
+        end = self._start + self._size
+        if end <= self._capacity:
+            return data[self._start:end].tolist()
+        return data[self._start:].tolist() + data[:end - self._capacity].tolist()
+
+    def values(self) -> list[float]:
+        """Return the values held, from the oldest to the newest."""
+        return self._ordered(self._values)
+
+    def timestamps(self) -> list[float]:
+        """Return the monotonic timestamps of the values held, from the oldest
+        to the newest."""
+        return self._ordered(self._timestamps)
+
+
+class SensorsHistory:
+    """Recent history of the sensors measures, one `RingBuffer` per
+    (sensor uid, measure) pair.
+
+    :param window: the duration of history kept, in seconds.
+    :param sampling_period: the shortest expected interval between two
+                            values, in seconds. Used to size the buffers.
+    """
+    def __init__(self, window: float, sampling_period: float) -> None:
+        if window <= 0 or sampling_period <= 0:
+            raise ValueError("window and sampling_period should be strictly positive")
+        self._window: float = window
+        self._capacity: int = ceil(window / sampling_period) + 1
+        self._buffers: dict[tuple[str, str], RingBuffer] = {}
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return (
+            f"{self.__class__.__name__}(window={self._window}, "
+            f"series={len(self._buffers)})"
+        )
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        return key in self._buffers
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    @property
+    def window(self) -> float:
+        return self._window
+
+    def keys(self) -> list[tuple[str, str]]:
+        return [*self._buffers.keys()]
+
+    def append(
+            self,
+            sensor_uid: str,
+            measure: str,
+            value: float,
+            timestamp: float | None = None,
+    ) -> None:
+        try:
+            buffer = self._buffers[(sensor_uid, measure)]
+        except KeyError:
+            buffer = self._buffers[(sensor_uid, measure)] = RingBuffer(
+                self._capacity, self._window)
+        buffer.append(value, timestamp)
+
+    def get(self, sensor_uid: str, measure: str) -> RingBuffer | None:
+        buffer = self._buffers.get((sensor_uid, measure))
+        if buffer is not None:
+            buffer.refresh()
+        return buffer
+
+    def get_series(self, sensor_uid: str, measure: str) -> list[tuple[datetime, float]]:
+        """Return the values of a series with their wall-clock timestamps."""
+        buffer = self.get(sensor_uid, measure)
+        if buffer is None:
+            return []
+        # Convert the monotonic timestamps to UTC datetimes
+        now = datetime.now(timezone.utc)
+        now_monotonic = monotonic()
+        return [
+            (now - timedelta(seconds=now_monotonic - timestamp), value)
+            for timestamp, value in zip(buffer.timestamps(), buffer.values())
+        ]
+
+    def retain(self, sensor_uids: set[str]) -> None:
+        """Drop the series of the sensors not in `sensor_uids`."""
+        self._buffers = {
+            key: buffer
+            for key, buffer in self._buffers.items()
+            if key[0] in sensor_uids
+        }
+
+    def clear(self) -> None:
+        self._buffers.clear()
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import asyncio
+from asyncio import AbstractEventLoop, Event, Task
+from logging import getLogger, Logger
+from math import ceil, floor
+from time import monotonic
+from typing import Any, Callable
+
+
+class TimerHandle:
+    """A callback scheduled on a `TimerWheel`
+
+    :param wheel: the wheel the callback is scheduled on.
+    :param callback: the callback to call. If it returns an awaitable, it is
+                     run in its own task.
+    :param deadline: the monotonic time at which to call the callback.
+    """
+    __slots__ = ("_wheel", "callback", "deadline", "_tick", "_slot", "_fired", "_cancelled")
+
+    def __init__(self, wheel: TimerWheel, callback: Callable[[], Any], deadline: float) -> None:
+        self._wheel: TimerWheel = wheel
+        self.callback: Callable[[], Any] = callback
+        self.deadline: float = deadline
+        self._tick: int = 0  # The wheel tick at which the callback is due
+        self._slot: set[TimerHandle] | None = None  # The wheel slot holding the handle
+        self._fired: bool = False
+        self._cancelled: bool = False
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"{self.__class__.__name__}(time_left={self.time_left()})"
+
+    @property
+    def done(self) -> bool:
+        """Whether the callback was called or cancelled."""
+        return self._fired or self._cancelled
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def time_left(self) -> float | None:
+        if self.done:
+            return None
+        return max(self.deadline - monotonic(), 0.0)
+
+    def cancel(self) -> None:
+        if self.done:
+            return
+        self._cancelled = True
+        self._wheel._remove(self)
+
+    def adjust(self, delta: float) -> None:
+        """Move the deadline by `delta` seconds, earlier if negative."""
+        if self.done:
+            raise RuntimeError("The timer is already done.")
+        self._wheel._remove(self)
+        self.deadline += delta
+        self._wheel._insert(self)
+
+
+class TimerWheel:
+    """A hierarchical timer wheel calling callbacks after a delay
+
+    All the callbacks are managed by a single task ticking every `resolution`
+    seconds while callbacks are scheduled, and sleeping otherwise. Each level
+    of the wheel has `slots` slots, each slot of a level covering a whole
+    turn of the level below. Scheduling, cancelling and adjusting a callback
+    are O(1).
+
+    :param resolution: the duration of a tick, in seconds.
+    :param slots: the number of slots in each level.
+    :param levels: the number of levels. Longer delays are clamped in the last
+                   level and re-inserted when it turns.
+    """
+    def __init__(self, resolution: float = 0.05, slots: int = 64, levels: int = 4) -> None:
+        self.resolution: float = resolution
+        self.slots: int = slots
+        self.levels: int = levels
+        self.logger: Logger = getLogger("gaia.engine.timer_wheel")
+        self._wheel: list[list[set[TimerHandle]]] = [
+            [set() for _ in range(slots)] for _ in range(levels)
+        ]
+        self._origin: float = monotonic()
+        self._tick: int = 0  # The last tick processed
+        self._count: int = 0
+        self._wake: Event | None = None
+        self._loop: AbstractEventLoop | None = None
+        self._task: Task | None = None
+        self._callback_tasks: set[Task] = set()
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"{self.__class__.__name__}(timers={self._count})"
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _current_tick(self) -> int:
+        return floor((monotonic() - self._origin) / self.resolution)
+
+    def _insert(self, handle: TimerHandle, cascading: bool = False) -> None:
+        tick = ceil((handle.deadline - self._origin) / self.resolution)
+        # The slot of the current tick has already been processed, unless the
+        #  handle is cascaded from an upper level while processing the tick
+        tick = max(tick, self._tick if cascading else self._tick + 1)
+        handle._tick = tick
+        delta = tick - self._tick
+        span = self.slots
+        for level in range(self.levels):
+            if delta < span or level == self.levels - 1:
+                break
+            span *= self.slots
+        step = span // self.slots  # Number of ticks covered by a slot of the level
+        if delta >= span:
+            # Too far in the future, park it in the last slot of the last level
+            index = (self._tick // step + self.slots - 1) % self.slots
+        else:
+            index = (tick // step) % self.slots
+        slot = self._wheel[level][index]
+        slot.add(handle)
+        handle._slot = slot
+        self._count += 1
+        if self._wake is not None:
+            self._wake.set()
+
+    def _remove(self, handle: TimerHandle) -> None:
+        if handle._slot is not None:
+            handle._slot.discard(handle)
+            handle._slot = None
+            self._count -= 1
+
+    def _fire(self, handle: TimerHandle) -> None:
+        handle._fired = True
+        try:
+            result = handle.callback()
+        except Exception as e:
+            self.logger.error(
+                f"Encountered an error while calling a timer callback. "
+                f"ERROR msg: `{e.__class__.__name__}: {e}`.")
+            return
+        if asyncio.iscoroutine(result):
+            task = asyncio.create_task(result)
+            self._callback_tasks.add(task)
+            task.add_done_callback(self._callback_done)
+
+    def _callback_done(self, task: Task) -> None:
+        self._callback_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            e = task.exception()
+            self.logger.error(
+                f"Encountered an error while calling a timer callback. "
+                f"ERROR msg: `{e.__class__.__name__}: {e}`.")
+
+    def _advance(self) -> None:
+        self._tick += 1
+        tick = self._tick
+        # Cascade the slots of the upper levels that are starting a new turn
+        step = 1
+        for level in range(1, self.levels):
+            step *= self.slots
+            if tick % step:
+                break
+            slot = self._wheel[level][(tick // step) % self.slots]
+            handles = [*slot]
+            slot.clear()
+            self._count -= len(handles)
+            for handle in handles:
+                handle._slot = None
+                self._insert(handle, cascading=True)
+        slot = self._wheel[0][tick % self.slots]
+        due = [handle for handle in slot if handle._tick <= tick]
+        for handle in due:
+            self._remove(handle)
+            self._fire(handle)
+
+    async def _run(self) -> None:
+        assert self._wake is not None
+        while True:
+            if not self._count:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            next_tick_time = self._origin + (self._tick + 1) * self.resolution
+            await asyncio.sleep(max(next_tick_time - monotonic(), 0.0))
+            current_tick = self._current_tick()
+            while self._tick < current_tick and self._count:
+                self._advance()
+            if not self._count:
+                # Nothing left to process, skip the remaining ticks
+                self._tick = max(self._tick, current_tick)
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self.running:
+            return
+        if self._loop is not loop:
+            # The previous event loop is gone with its callbacks
+            self.clear()
+        self._loop = loop
+        self._wake = Event()
+        if not self._count:
+            self._tick = self._current_tick()
+        self._task = loop.create_task(self._run(), name="timer_wheel-run")
+
+    def call_later(self, delay: float, callback: Callable[[], Any]) -> TimerHandle:
+        """Call `callback` in `delay` seconds."""
+        self._ensure_running()
+        if not self._count:
+            self._tick = max(self._tick, self._current_tick())
+        handle = TimerHandle(self, callback, monotonic() + delay)
+        self._insert(handle)
+        return handle
+
+    def clear(self) -> None:
+        for level in self._wheel:
+            for slot in level:
+                for handle in slot:
+                    handle._cancelled = True
+                    handle._slot = None
+                slot.clear()
+        self._count = 0
+
+    async def stop(self) -> None:
+        """Cancel the scheduled callbacks, the coroutine callbacks still running
+        and stop the task driving the wheel."""
+        self.clear()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # The callbacks already running would outlive their owners
+        if self._callback_tasks:
+            for task in self._callback_tasks:
+                task.cancel()
+            await asyncio.wait([*self._callback_tasks])
+            self._callback_tasks.clear()
+        self._loop = None
+        self._wake = None
+
+
+_timer_wheel: TimerWheel | None = None
+
+
+def get_timer_wheel() -> TimerWheel:
+    global _timer_wheel
+    if _timer_wheel is None:
+        _timer_wheel = TimerWheel()
+    return _timer_wheel
+
+
+async def stop_timer_wheel() -> None:
+    global _timer_wheel
+    if _timer_wheel is not None:
+        await _timer_wheel.stop()
+        _timer_wheel = None
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from struct import Struct
+from typing import Any, Iterable, TypedDict
+import zlib
+
+import orjson
+
+import gaia_validators as gv
+
+from gaia.sensors_frame import SensorsFrame
+
+
+# Names of the wire formats, advertised during the registration
+COMPACT_SENSORS_DATA = "compact_sensors_data.v1"
+COMPRESSED_PAYLOADS = "zlib_payloads.v1"
+# Wire formats Gaia can use in place of the default payloads
+SUPPORTED_WIRE_FORMATS: frozenset[str] = frozenset({
+    COMPACT_SENSORS_DATA,
+    COMPRESSED_PAYLOADS,
+})
+
+# Prefix of the compressed payloads, followed by the zlib stream of the JSON
+#  serialized payload
+COMPRESSED_MAGIC = b"GZP\x01"
+# Serialized payloads smaller than this are sent uncompressed, in bytes
+COMPRESSION_THRESHOLD = 2048
+COMPRESSION_LEVEL = 6
+
+MAGIC = b"GSD"
+FORMAT_VERSION = 1
+
+# All the fields are little-endian
+# magic, format version, dictionary version, number of frames
+HEADER = Struct("<3sBIH")
+# ecosystem id, timestamp, number of records, of averages and of alarms
+FRAME_HEADER = Struct("<HdHHH")
+# sensor id, measure id, value
+RECORD = Struct("<HHf")
+# measure id, value
+AVERAGE = Struct("<Hf")
+# sensor id, measure id, position id, delta, level id
+ALARM = Struct("<HHBfB")
+
+_positions: list[gv.Position] = [*gv.Position]
+_positions_index: dict[gv.Position, int] = {
+    position: i for i, position in enumerate(_positions)}
+_levels: list[gv.WarningLevel] = [*gv.WarningLevel]
+_levels_index: dict[gv.WarningLevel, int] = {
+    level: i for i, level in enumerate(_levels)}
+
+
+class SensorsDataDictionaryDict(TypedDict):
+    version: int
+    ecosystems: list[str]
+    sensors: list[str]
+    measures: list[str]
+    positions: list[str]
+    levels: list[str]
+
+
+class _InternTable:
+    __slots__ = ("values", "_index")
+
+    def __init__(self) -> None:
+        self.values: list[str] = []
+        self._index: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def get_id(self, value: str) -> tuple[int, bool]:
+        """Return the id of `value` and whether it was added to the table."""
+        try:
+            return self._index[value], False
+        except KeyError:
+            value_id = self._index[value] = len(self.values)
+            self.values.append(value)
+            return value_id, True
+
+
+class SensorsDataDictionary:
+    """The strings interned by the compact sensors data format
+
+    The ecosystem uids, sensor uids and measures are replaced by their index
+    in the dictionary tables, which is sent once to Ouranos, and again when new
+    entries are added. The tables are append-only so the data encoded with an
+    older version of the dictionary can still be decoded with a newer one.
+    """
+    __slots__ = ("version", "_ecosystems", "_sensors", "_measures")
+
+    def __init__(self) -> None:
+        self.version: int = 0  # Incremented each time an entry is added
+        self._ecosystems: _InternTable = _InternTable()
+        self._sensors: _InternTable = _InternTable()
+        self._measures: _InternTable = _InternTable()
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return (
+            f"{self.__class__.__name__}(version={self.version}, "
+            f"sensors={len(self._sensors)}, measures={len(self._measures)})"
+        )
+
+    def _get_id(self, table: _InternTable, value: str) -> int:
+        value_id, added = table.get_id(value)
+        if added:
+            self.version += 1
+        return value_id
+
+    def ecosystem_id(self, ecosystem_uid: str) -> int:
+        return self._get_id(self._ecosystems, ecosystem_uid)
+
+    def sensor_id(self, sensor_uid: str) -> int:
+        return self._get_id(self._sensors, sensor_uid)
+
+    def measure_id(self, measure: str) -> int:
+        return self._get_id(self._measures, measure)
+
+    def as_dict(self) -> SensorsDataDictionaryDict:
+        return {
+            "version": self.version,
+            "ecosystems": [*self._ecosystems.values],
+            "sensors": [*self._sensors.values],
+            "measures": [*self._measures.values],
+            "positions": [position.name for position in _positions],
+            "levels": [level.name for level in _levels],
+        }
+
+
+def encode_sensors_frames(
+        frames: Iterable[tuple[str, SensorsFrame]],
+        dictionary: SensorsDataDictionary,
+) -> bytes:
+    """Encode the sensors frames of ecosystems in the compact format
+
+    The strings are replaced by their id in `dictionary`, which is updated
+    with the new ones, and the values are packed as 32-bit floats.
+
+    :param frames: the (ecosystem uid, sensors frame) pairs to encode.
+    :param dictionary: the dictionary interning the strings.
+    :return: the encoded frames.
+    """
+    chunks: list[bytes] = []
+    frames_count = 0
+    for ecosystem_uid, frame in frames:
+        frames_count += 1
+        # Map the frame measures table on the dictionary one
+        measure_ids = [dictionary.measure_id(measure) for measure in frame.measures]
+        averages = frame.averages
+        alarms = frame.alarms
+        chunks.append(FRAME_HEADER.pack(
+            dictionary.ecosystem_id(ecosystem_uid),
+            frame.timestamp.timestamp(),
+            len(frame),
+            len(averages),
+            len(alarms),
+        ))
+        chunks.extend(
+            RECORD.pack(dictionary.sensor_id(sensor_uid), measure_ids[measure_id], value)
+            for sensor_uid, measure_id, value in zip(
+                frame.sensor_uids, frame.measure_ids, frame.values)
+        )
+        chunks.extend(
+            AVERAGE.pack(dictionary.measure_id(measure), value)
+            for measure, value in averages.items()
+        )
+        chunks.extend(
+            ALARM.pack(
+                dictionary.sensor_id(alarm.sensor_uid),
+                dictionary.measure_id(alarm.measure),
+                _positions_index[alarm.position],
+                alarm.delta,
+                _levels_index[alarm.level],
+            )
+            for alarm in alarms
+        )
+    # The header is packed last so that it carries the version of the
+    #  dictionary including the entries added while encoding
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, dictionary.version, frames_count)
+    return header + b"".join(chunks)
+
+
+def decode_sensors_frames(
+        data: bytes,
+        dictionary: SensorsDataDictionaryDict,
+) -> list[tuple[str, gv.SensorsData]]:
+    """Decode sensors frames encoded by `encode_sensors_frames()`
+
+    :param data: the encoded frames.
+    :param dictionary: the dictionary used to encode the frames, or a more
+                       recent version of it.
+    :return: the (ecosystem uid, sensors data) pairs decoded.
+    """
+    magic, format_version, dictionary_version, frames_count = HEADER.unpack_from(data)
+    if magic != MAGIC or format_version != FORMAT_VERSION:
+        raise ValueError("Data is not in the compact sensors data format.")
+    if dictionary["version"] < dictionary_version:
+        raise ValueError(
+            f"Data was encoded with the version {dictionary_version} of the "
+            f"dictionary, got version {dictionary['version']}.")
+    ecosystems = dictionary["ecosystems"]
+    sensors = dictionary["sensors"]
+    measures = dictionary["measures"]
+    rv: list[tuple[str, gv.SensorsData]] = []
+    offset = HEADER.size
+    for _ in range(frames_count):
+        ecosystem_id, timestamp, records_count, averages_count, alarms_count = \
+            FRAME_HEADER.unpack_from(data, offset)
+        offset += FRAME_HEADER.size
+        frame = SensorsFrame(datetime.fromtimestamp(timestamp, tz=timezone.utc))
+        for sensor_id, measure_id, value in RECORD.iter_unpack(
+                data[offset:offset + records_count * RECORD.size]):
+            frame.add(sensors[sensor_id], measures[measure_id], value)
+        offset += records_count * RECORD.size
+        averages = {
+            measures[measure_id]: value
+            for measure_id, value in AVERAGE.iter_unpack(
+                data[offset:offset + averages_count * AVERAGE.size])
+        }
+        offset += averages_count * AVERAGE.size
+        frame.set_alarms([
+            gv.SensorAlarm(
+                sensor_uid=sensors[sensor_id],
+                measure=measures[measure_id],
+                position=_positions[position_id],
+                delta=delta,
+                level=_levels[level_id],
+            )
+            for sensor_id, measure_id, position_id, delta, level_id in ALARM.iter_unpack(
+                data[offset:offset + alarms_count * ALARM.size])
+        ])
+        offset += alarms_count * ALARM.size
+        frame._averages = averages
+        rv.append((ecosystems[ecosystem_id], frame.to_model()))
+    return rv
+
+
+def serialize_payload(data: Any) -> bytes:
+    return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS, default=str)
+
+
+def compress_serialized_payload(serialized: bytes) -> bytes | None:
+    """Compress a serialized payload
+
+    :param serialized: the payload serialized by `serialize_payload()`.
+    :return: the compressed payload, or None if compressing did not make it
+             smaller.
+    """
+    compressed = COMPRESSED_MAGIC + zlib.compress(serialized, COMPRESSION_LEVEL)
+    if len(compressed) >= len(serialized):
+        return None
+    return compressed
+
+
+def is_compressed_payload(data: Any) -> bool:
+    return isinstance(data, bytes) and data.startswith(COMPRESSED_MAGIC)
+
+
+def decompress_payload(data: bytes) -> Any:
+    """Decompress a payload compressed by `compress_serialized_payload()`."""
+    if not is_compressed_payload(data):
+        raise ValueError("Data is not a compressed payload.")
+    return orjson.loads(zlib.decompress(data[len(COMPRESSED_MAGIC):]))
@@ -1,9 +1,11 @@
+from asyncio import sleep
 from datetime import time
 
 import pytest
 
 import gaia_validators as gv
 
+import gaia.events
 from gaia.events import Events
 
 from tests import data as test_data
@@ -58,6 +60,7 @@ class TestCRUDGeneral:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         error_msg = "Create hardware requires the 'ecosystem_uid' field to be set."
         assert error_msg in caplog.text
@@ -74,10 +77,51 @@ class TestCRUDGeneral:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         assert_success(events_handler, caplog)
 
 
+    async def test_coalesced_requests(
+            self,
+            events_handler: Events,
+            caplog: pytest.LogCaptureFixture,
+            monkeypatch,
+    ):
+        saved = 0
+
+        async def save(*args) -> None:
+            nonlocal saved
+            saved += 1
+
+        monkeypatch.setattr(events_handler.engine.config, "save", save)
+        monkeypatch.setattr(gaia.events, "CRUD_SETTLE_DELAY", 0.05)
+
+        for place, coordinates in (("home", (0, 0)), ("work", (4, 2))):
+            message = gv.CrudPayloadDict = gv.CrudPayload(
+                routing={"engine_uid": test_data.engine_uid},
+                action=gv.CrudAction.create,
+                target="place",
+                kwargs={"place": place, "coordinates": coordinates},
+            ).model_dump()
+            await events_handler.on_crud(message)
+
+        # Each request is acknowledged right away ...
+        emitted = events_handler._dispatcher.emit_store
+        assert [emitted_event["event"] for emitted_event in emitted] == [
+            "crud_result", "crud_result"]
+        assert saved == 0
+
+        # ... and the changes are saved and sent once the burst is over
+        await sleep(0.25)
+        async with events_handler._crud_flush_lock:
+            pass
+        assert saved == 1
+        assert [emitted_event["event"] for emitted_event in emitted[2:]] == ["places_list"]
+        places = {place["name"] for place in emitted[2]["data"]["data"]}
+        assert {"home", "work"} <= places
+
+
 @pytest.mark.asyncio
 class TestCRUDEcosystem:
     async def test_create(
@@ -93,6 +137,7 @@ class TestCRUDEcosystem:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         assert_success(events_handler, caplog)
 
@@ -114,6 +159,7 @@ class TestCRUDEcosystem:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         result_msg = events_handler._dispatcher.emit_store[0]["data"]
         assert result_msg["status"] == gv.Result.failure
@@ -129,6 +175,7 @@ class TestCRUDEcosystem:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         assert_success(events_handler, caplog)
 
@@ -145,6 +192,7 @@ class TestCRUDEcosystem:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         result_msg = events_handler._dispatcher.emit_store[0]["data"]
         assert result_msg["status"] == gv.Result.failure
@@ -159,6 +207,7 @@ class TestCRUDEcosystem:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         assert_success(events_handler, caplog, 1)
 
@@ -178,6 +227,7 @@ class TestCRUDPlace:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         assert_success(events_handler, caplog)
 
@@ -197,6 +247,7 @@ class TestCRUDPlace:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         result_msg = events_handler._dispatcher.emit_store[0]["data"]
         assert result_msg["status"] == gv.Result.failure
@@ -213,6 +264,7 @@ class TestCRUDPlace:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         assert_success(events_handler, caplog)
 
@@ -232,6 +284,7 @@ class TestCRUDPlace:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         result_msg = events_handler._dispatcher.emit_store[0]["data"]
         assert result_msg["status"] == gv.Result.failure
@@ -248,6 +301,7 @@ class TestCRUDPlace:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         assert_success(events_handler, caplog)
 
@@ -276,6 +330,7 @@ class TestCRUDChaos:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         assert_success(events_handler, caplog)
 
@@ -314,6 +369,7 @@ class TestCRUDNychthemeralConfig:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         assert_success(events_handler, caplog, 2, 0)  # crud_result and nycthemeral_info
 
@@ -342,6 +398,7 @@ class TestCRUDManagement:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         assert_success(events_handler, caplog)
 
@@ -374,6 +431,7 @@ class TestCRUDClimateParameter:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         assert_success(events_handler, caplog)
 
@@ -408,6 +466,7 @@ class TestCRUDClimateParameter:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         result_msg = events_handler._dispatcher.emit_store[0]["data"]
         assert result_msg["status"] == gv.Result.failure
@@ -442,6 +501,7 @@ class TestCRUDClimateParameter:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         assert_success(events_handler, caplog)
 
@@ -471,6 +531,7 @@ class TestCRUDClimateParameter:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         result_msg = events_handler._dispatcher.emit_store[0]["data"]
         assert result_msg["status"] == gv.Result.failure
@@ -497,6 +558,7 @@ class TestCRUDClimateParameter:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         assert_success(events_handler, caplog)
 
@@ -529,6 +591,7 @@ class TestCRUDWeatherEvent:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         assert_success(events_handler, caplog)
 
@@ -562,6 +625,7 @@ class TestCRUDWeatherEvent:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         result_msg = events_handler._dispatcher.emit_store[0]["data"]
         assert result_msg["status"] == gv.Result.failure
@@ -588,6 +652,7 @@ class TestCRUDWeatherEvent:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         assert_success(events_handler, caplog)
 
@@ -614,6 +679,7 @@ class TestCRUDWeatherEvent:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         result_msg = events_handler._dispatcher.emit_store[0]["data"]
         assert result_msg["status"] == gv.Result.failure
@@ -639,6 +705,7 @@ class TestCRUDWeatherEvent:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         assert_success(events_handler, caplog)
 
@@ -665,6 +732,7 @@ class TestCRUDHardware:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         assert_success(events_handler, caplog)
 
@@ -692,6 +760,7 @@ class TestCRUDHardware:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         result_msg = events_handler._dispatcher.emit_store[0]["data"]
         assert result_msg["status"] == gv.Result.failure
@@ -712,6 +781,7 @@ class TestCRUDHardware:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         assert_success(events_handler, caplog)
 
@@ -734,6 +804,7 @@ class TestCRUDHardware:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         result_msg = events_handler._dispatcher.emit_store[0]["data"]
         assert result_msg["status"] == gv.Result.failure
@@ -749,6 +820,7 @@ class TestCRUDHardware:
         ).model_dump()
 
         await events_handler.on_crud(message)
+        await events_handler.flush_crud_changes()
 
         assert_success(events_handler, caplog)
 
@@ -1,6 +1,7 @@
+import asyncio
 from asyncio import sleep
 from collections import deque
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from math import isclose
 from time import monotonic
 from typing import cast
@@ -9,14 +10,21 @@ import uuid
 
 from pydantic import ValidationError
 import pytest
-from sqlalchemy import delete
+from sqlalchemy import delete, select
 
 import gaia_validators as gv
 
 from gaia import Ecosystem, EngineConfig
 from gaia.config.from_files import PrivateConfigValidator
 from gaia.database.models import ActuatorBuffer, SensorBuffer
-from gaia.events import Events, validate_payload
+from gaia import events as events_module
+from gaia.events import (
+    BUFFERED_DATA_MIN_PAGE, BUFFERED_DATA_WINDOW, Events, MAX_CONCURRENT_EMITS,
+    validate_payload)
+from gaia.sensors_frame import SensorsFrame
+from gaia.wire_format import (
+    COMPACT_SENSORS_DATA, COMPRESSED_PAYLOADS, decode_sensors_frames,
+    decompress_payload, is_compressed_payload, serialize_payload)
 
 from tests import data as test_data
 
@@ -30,6 +38,43 @@ camera_dict = {
 }
 
 
+async def init_sensor_buffer(ecosystem: Ecosystem, rows: int) -> None:
+    ecosystem.config.set_management("database", True)
+    ecosystem.engine.config.app_config.USE_DATABASE = True
+    await ecosystem.engine.init_database()
+    now = datetime.now(timezone.utc)
+    async with ecosystem.engine.db.scoped_session() as session:
+        await session.execute(delete(SensorBuffer))
+        await session.execute(delete(ActuatorBuffer))
+        for i in range(rows):
+            session.add(
+                SensorBuffer(
+                    ecosystem_uid=test_data.ecosystem_uid,
+                    sensor_uid=test_data.sensor_uid,
+                    measure="temperature",
+                    timestamp=now - timedelta(minutes=i),
+                    value=21.0,
+                )
+            )
+        await session.commit()
+
+
+async def wait_for_emitted(events_handler: Events, count: int) -> None:
+    for _ in range(100):
+        if len(events_handler.dispatcher.emit_store) >= count:
+            return
+        await sleep(0.01)
+    raise AssertionError(f"{count} events were not emitted in time")
+
+
+async def count_buffered_rows(ecosystem: Ecosystem) -> tuple[int, int]:
+    """Count the sensor buffer rows, and the ones part of an exchange."""
+    async with ecosystem.engine.db.scoped_session() as session:
+        result = await session.execute(select(SensorBuffer))
+        rows = result.scalars().all()
+    return len(rows), len([row for row in rows if row.exchange_uuid is not None])
+
+
 @pytest.mark.asyncio
 class TestGeneral:
     async def test_validate_payload(self, events_handler: Events):
@@ -95,6 +140,29 @@ class TestGeneral:
         assert "uid" in result
         assert "data" in result
 
+    async def test_get_payload_cached(self, events_handler: Events, ecosystem: Ecosystem):
+        uids = [test_data.ecosystem_uid]
+        management = events_handler.get_payload("management", uids)[0]
+        places_list = events_handler.get_payload("places_list")
+
+        # Unchanged payloads are served from the cache
+        assert events_handler.get_payload("management", uids)[0] is management
+        assert events_handler.get_payload("places_list") is places_list
+
+        # Config mutators invalidate the cached payloads
+        light_management = ecosystem.config.get_management("light")
+        ecosystem.config.set_management("light", not light_management)
+        updated = events_handler.get_payload("management", uids)[0]
+        assert updated is not management
+        assert updated["data"]["light"] is not light_management
+
+        events_handler.engine.config.set_place("cache_test", (4.2, 2.1))
+        assert events_handler.get_payload("places_list") is not places_list
+
+        # Payloads holding live data are not cached
+        actuators_data = events_handler.get_payload("actuators_data", uids)[0]
+        assert events_handler.get_payload("actuators_data", uids)[0] is not actuators_data
+
     async def test_send_payload(self, events_handler: Events, ecosystem: Ecosystem):
         # Test sending a valid payload
         payload_name = "management"
@@ -418,6 +486,153 @@ class TestOnEvent:
 
 @pytest.mark.asyncio
 class TestSendEvent:
+    async def test_send_ecosystems_info_only_changed(
+            self,
+            events_handler: Events,
+            ecosystem: Ecosystem,
+    ):
+        def emitted_events() -> list[str]:
+            # Actuators data are timestamped and thus always sent
+            events = [
+                emitted["event"] for emitted in events_handler.dispatcher.emit_store
+                if emitted["event"] != "actuators_data"
+            ]
+            events_handler.dispatcher.clear_store()
+            return events
+
+        await events_handler.send_ecosystems_info()
+        assert "management" in emitted_events()
+
+        # Nothing changed since the last send
+        await events_handler.send_ecosystems_info(only_changed=True)
+        assert emitted_events() == []
+
+        # Only the payloads that changed are sent
+        light_management = ecosystem.config.get_management("light")
+        ecosystem.config.set_management("light", not light_management)
+        await events_handler.send_ecosystems_info(only_changed=True)
+        assert emitted_events() == ["management"]
+
+        # Everything is sent again after a disconnection
+        await events_handler.on_disconnect()
+        await events_handler.send_ecosystems_info(only_changed=True)
+        assert "base_info" in emitted_events()
+
+    async def test_send_ecosystems_info_concurrently(
+            self,
+            events_handler: Events,
+            ecosystem: Ecosystem,
+            monkeypatch,
+    ):
+        in_flight = 0
+        max_in_flight = 0
+        emitted: list[str] = []
+
+        async def slow_emit(event: str, **kwargs) -> bool:
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await sleep(0.01)
+            in_flight -= 1
+            emitted.append(event)
+            return True
+
+        monkeypatch.setattr(events_handler, "emit", slow_emit)
+        await events_handler.send_ecosystems_info()
+
+        assert 1 < max_in_flight <= MAX_CONCURRENT_EMITS
+        # The places and base info are emitted before the payloads depending on them
+        assert set(emitted[:2]) == {"places_list", "base_info"}
+        assert "management" in emitted[2:]
+
+    async def test_send_compact_sensors_data(
+            self,
+            events_handler: Events,
+            ecosystem: Ecosystem,
+            monkeypatch,
+    ):
+        frame = SensorsFrame(datetime.now(timezone.utc).replace(microsecond=0))
+        frame.add(test_data.sensor_uid, "temperature", 21.5)
+        monkeypatch.setattr(Ecosystem, "sensors_frame", property(lambda self: frame))
+        monkeypatch.setattr(events_handler, "is_connected", lambda: True)
+
+        # Ouranos did not advertise the compact format
+        await events_handler.register()
+        host_uid = events_handler._dispatcher.host_uid.__str__()
+        payload = gv.EngineRegistrationAck(
+            host_uid=host_uid,
+            contract_version=0,
+            status=gv.Result.success,
+        ).model_dump()
+        await events_handler.on_registration_ack(payload)
+        assert events_handler.wire_formats == frozenset()
+        events_handler.dispatcher.clear_store()
+        await events_handler.send_payload("sensors_data", test_data.ecosystem_uid)
+        emitted = events_handler.dispatcher.emit_store
+        assert [emitted_event["event"] for emitted_event in emitted] == ["sensors_data"]
+
+        # Ouranos advertised the compact format
+        await events_handler.register()
+        assert events_handler.dispatcher.emit_store[-1]["data"]["wire_formats"] == [
+            COMPACT_SENSORS_DATA]
+        await events_handler.on_registration_ack(
+            {**payload, "wire_formats": [COMPACT_SENSORS_DATA, "unknown_format"]})
+        assert events_handler.wire_formats == frozenset({COMPACT_SENSORS_DATA})
+        for _ in range(2):
+            events_handler.dispatcher.clear_store()
+            await events_handler.send_payload("sensors_data", test_data.ecosystem_uid)
+        # The dictionary is only sent once
+        emitted = events_handler.dispatcher.emit_store
+        assert [emitted_event["event"] for emitted_event in emitted] == ["compact_sensors_data"]
+        dictionary = events_handler._sensors_data_dictionary.as_dict()
+        decoded = decode_sensors_frames(emitted[0]["data"], dictionary)
+        assert decoded == [(test_data.ecosystem_uid, frame.to_model())]
+
+    async def test_emit_compressed(self, events_handler: Events):
+        large_data = [{"uid": f"uid_{i}", "value": i} for i in range(500)]
+        small_data = {"uid": "uid"}
+
+        # Compression is not negotiated
+        await events_handler.emit("buffered_sensors_data", data=large_data)
+        assert events_handler.dispatcher.emit_store[-1]["data"] == large_data
+
+        events_handler.wire_formats = frozenset({COMPRESSED_PAYLOADS})
+        await events_handler.emit("buffered_sensors_data", data=large_data)
+        compressed = events_handler.dispatcher.emit_store[-1]["data"]
+        assert is_compressed_payload(compressed)
+        assert decompress_payload(compressed) == large_data
+        # Small payloads are not worth compressing
+        await events_handler.emit("buffered_sensors_data", data=small_data)
+        assert events_handler.dispatcher.emit_store[-1]["data"] == small_data
+        # Only the events with potentially large payloads are compressed
+        await events_handler.emit("base_info", data=large_data)
+        assert events_handler.dispatcher.emit_store[-1]["data"] == large_data
+
+    async def test_emit_sizes(self, events_handler: Events, ecosystem: Ecosystem):
+        put = events_handler._outbound_queue.put
+        sizes: dict[str, int | None] = {}
+
+        async def recording_put(event, priority, size=None, **kwargs):
+            sizes[event] = size
+            return await put(event, priority, size, **kwargs)
+
+        events_handler._outbound_queue.put = recording_put
+        try:
+            # The size of the ecosystem payloads is known from their hash
+            await events_handler.send_payload("hardware", test_data.ecosystem_uid)
+            payload = events_handler.dispatcher.emit_store[-1]["data"]
+            payload_dicts = payload if isinstance(payload, list) else [payload]
+            assert sizes["hardware"] == sum(
+                len(serialize_payload(payload_dict)) for payload_dict in payload_dicts)
+            # The size of the compressed payloads is known after compression
+            events_handler.wire_formats = frozenset({COMPRESSED_PAYLOADS})
+            large_data = [{"uid": f"uid_{i}", "value": i} for i in range(500)]
+            await events_handler.emit("buffered_sensors_data", data=large_data)
+            compressed = events_handler.dispatcher.emit_store[-1]["data"]
+            assert sizes["buffered_sensors_data"] == len(compressed)
+        finally:
+            del events_handler._outbound_queue.put
+
     async def test_send_buffered_data_and_ack(
             self,
             events_handler: Events,
@@ -495,6 +710,155 @@ class TestSendEvent:
             async for _ in remaining_actuators_data:
                 assert False
 
+    async def test_buffered_data_window(
+            self,
+            events_handler: Events,
+            ecosystem: Ecosystem,
+    ):
+        await init_sensor_buffer(ecosystem, BUFFERED_DATA_WINDOW + 2)
+        events_handler._buffered_page_size = 1
+        emitted = events_handler.dispatcher.emit_store
+
+        async def acknowledge(index: int) -> None:
+            await events_handler.on_buffered_data_ack({
+                "uuid": emitted[index]["data"]["uuid"],
+                "status": gv.Result.success,
+                "message": None,
+            })
+
+        replay = asyncio.create_task(events_handler.send_buffered_data())
+        await wait_for_emitted(events_handler, BUFFERED_DATA_WINDOW)
+        # Only a window of exchanges wait for their acknowledgment
+        await sleep(0.05)
+        assert len(emitted) == BUFFERED_DATA_WINDOW
+        assert not replay.done()
+
+        # Each acknowledgment advances the window, and exchanges acknowledged
+        #  quickly make the pages grow
+        await acknowledge(0)
+        await wait_for_emitted(events_handler, BUFFERED_DATA_WINDOW + 1)
+        assert len(emitted[-1]["data"]["data"]) == 2
+
+        acknowledged = 1
+        while acknowledged < len(emitted):
+            await acknowledge(acknowledged)
+            acknowledged += 1
+            await sleep(0.05)
+        await replay
+        assert await count_buffered_rows(ecosystem) == (0, 0)
+
+    async def test_buffered_data_ack_timeout(
+            self,
+            events_handler: Events,
+            ecosystem: Ecosystem,
+            monkeypatch: pytest.MonkeyPatch,
+    ):
+        monkeypatch.setattr(events_module, "BUFFERED_DATA_ACK_TIMEOUT", 0.05)
+        await init_sensor_buffer(ecosystem, BUFFERED_DATA_WINDOW + 2)
+        events_handler._buffered_page_size = 1
+        emitted = events_handler.dispatcher.emit_store
+
+        # Ouranos never acknowledges the exchanges
+        await events_handler.send_buffered_data()
+        assert len(emitted) == BUFFERED_DATA_WINDOW
+        # The rows of the exchanges are available again
+        assert await count_buffered_rows(ecosystem) == (BUFFERED_DATA_WINDOW + 2, 0)
+        assert not events_handler._buffered_exchanges
+        assert events_handler._buffered_page_size == BUFFERED_DATA_MIN_PAGE
+
+        # A late acknowledgment resumes the replay
+        emitted.clear()
+        await events_handler.on_buffered_data_ack({
+            "uuid": uuid.uuid4(),
+            "status": gv.Result.success,
+            "message": None,
+        })
+        await events_handler._buffered_replay_task
+        assert len(emitted) == 1
+        assert len(emitted[0]["data"]["data"]) == BUFFERED_DATA_WINDOW + 2
+
+    async def test_buffered_data_emit_failure(
+            self,
+            events_handler: Events,
+            ecosystem: Ecosystem,
+            monkeypatch: pytest.MonkeyPatch,
+    ):
+        await init_sensor_buffer(ecosystem, 3)
+
+        async def failing_emit(*args, **kwargs) -> bool:
+            return False
+
+        monkeypatch.setattr(events_handler, "emit", failing_emit)
+        await events_handler.send_buffered_data()
+        # The rows are not part of an exchange anymore and the window is free
+        assert await count_buffered_rows(ecosystem) == (3, 0)
+        assert not events_handler._buffered_exchanges
+        assert events_handler._buffered_data_window._value == BUFFERED_DATA_WINDOW
+        assert events_handler._buffered_replay_paused
+
+    async def test_buffered_data_reconnection(
+            self,
+            events_handler: Events,
+            ecosystem: Ecosystem,
+    ):
+        await init_sensor_buffer(ecosystem, BUFFERED_DATA_WINDOW + 2)
+        events_handler._buffered_page_size = 1
+        emitted = events_handler.dispatcher.emit_store
+
+        # The replay runs in the background, waiting on the window
+        await events_handler.on_initialization_ack(None)
+        replay = events_handler._buffered_replay_task
+        assert replay is not None
+        await wait_for_emitted(events_handler, BUFFERED_DATA_WINDOW)
+        assert not replay.done()
+        window = events_handler._buffered_data_window
+
+        # A reconnection stops the previous replay before resetting the
+        #  exchanges, so it cannot fail the exchanges of the new connection
+        await events_handler.on_disconnect()
+        assert replay.cancelled()
+        assert events_handler._buffered_replay_task is None
+        await events_handler.register()
+        assert events_handler._buffered_data_window is not window
+        assert events_handler._buffered_data_window._value == BUFFERED_DATA_WINDOW
+        assert not events_handler._buffered_exchanges
+        assert not events_handler._buffered_replay_paused
+        assert await count_buffered_rows(ecosystem) == (BUFFERED_DATA_WINDOW + 2, 0)
+
+        # The next replay starts from scratch
+        emitted.clear()
+        await events_handler.on_initialization_ack(None)
+        await wait_for_emitted(events_handler, BUFFERED_DATA_WINDOW)
+        assert len(events_handler._buffered_exchanges) == BUFFERED_DATA_WINDOW
+        await events_handler._cancel_buffered_replay()
+
+    async def test_actuators_data_outbox(
+            self,
+            registered_events_handler: Events,
+            ecosystem: Ecosystem,
+    ):
+        outbox = ecosystem.engine.actuators_outbox
+        light_handler = ecosystem.actuator_hub.get_handler("light")
+        heater_handler = ecosystem.actuator_hub.get_handler("heater")
+
+        # States of the same actuator group are merged
+        outbox.put(ecosystem.uid, light_handler.as_record(datetime.now(timezone.utc)))
+        outbox.put(ecosystem.uid, light_handler.as_record(datetime.now(timezone.utc)))
+        outbox.put(ecosystem.uid, heater_handler.as_record(datetime.now(timezone.utc)))
+        assert len(outbox) == 2
+
+        await outbox.stop()
+        assert len(outbox) == 0
+
+        # All the states are sent in a single event
+        emit_store = registered_events_handler.dispatcher.emit_store
+        assert len(emit_store) == 1
+        assert emit_store[0]["event"] == "actuators_data"
+        payloads = emit_store[0]["data"]
+        assert len(payloads) == 1
+        assert payloads[0]["uid"] == ecosystem.uid
+        assert len(payloads[0]["data"]) == 2
+
     @pytest.mark.parametrize("ecosystem_config", [{"hardware": camera_dict}], indirect=True)
     async def test_send_picture_arrays(self, events_handler: Events, ecosystem: Ecosystem):
         pictures_subroutine = ecosystem.get_subroutine("pictures")
@@ -539,10 +903,12 @@ class TestUpload:
         test_token = "test_token_123"
         events_handler.camera_token = test_token
 
-        # Mock the response
+        # Mock the session and the response
+        mock_session.return_value.closed = False
+        mock_session.return_value.close = AsyncMock()
         mock_response = AsyncMock()
         mock_response.json.return_value = {"status": "success"}
-        mock_session.return_value.__aenter__.return_value.post.return_value.__aenter__.return_value = mock_response
+        mock_session.return_value.post.return_value.__aenter__.return_value = mock_response
 
         # Enable camera and take a picture
         pictures_subroutine = ecosystem.get_subroutine("pictures")
@@ -556,3 +922,15 @@ class TestUpload:
 
         # Verify the request was made with the correct token
         assert mock_session.call_args[1]["headers"]["token"] == test_token
+        assert mock_session.return_value.post.called
+
+        # The session is reused ...
+        await events_handler.upload_picture_arrays()
+        assert mock_session.call_count == 1
+
+        # ... until the token changes
+        events_handler.camera_token = "new_test_token"
+        await events_handler.upload_picture_arrays()
+        assert mock_session.call_count == 2
+        assert mock_session.call_args[1]["headers"]["token"] == "new_test_token"
+        await events_handler.close_http_session()
@@ -142,6 +142,26 @@ class TestClimateSubroutine:
         measure = climate_subroutine._get_measure_for_parameter(gv.ClimateParameter.humidity)
         assert measure == "absolute_humidity"
 
+    async def test_cached_plan(self, climate_subroutine: Climate):
+        climate_subroutine.enable()
+        await climate_subroutine.start()
+
+        expected_actuators = climate_subroutine.expected_actuators
+        # The plan is cached ...
+        assert climate_subroutine.expected_actuators is expected_actuators
+        # ... until the config changes
+        config = climate_subroutine.config
+        config.delete_climate_parameter(gv.ClimateParameter.humidity)
+        assert climate_subroutine.expected_actuators == {
+            (gv.ClimateParameter.temperature, "increase"): "heater",
+        }
+        config.set_climate_parameter(
+            gv.ClimateParameter.humidity, **test_data.humidity_cfg)
+        assert climate_subroutine.expected_actuators == expected_actuators
+
+        await climate_subroutine.stop()
+        climate_subroutine.disable()
+
     async def test_update_pid_targets_its_own_parameter(
             self,
             climate_subroutine: Climate,
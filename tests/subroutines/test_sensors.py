@@ -1,8 +1,13 @@
+import asyncio
+from datetime import datetime, timezone
+
 import pytest
 
 import gaia_validators as gv
 
 from gaia import Ecosystem
+from gaia.hardware.health import BreakerState, FAILURES_BEFORE_OPEN
+from gaia.sensors_frame import SensorsFrame
 from gaia.subroutines import Sensors
 
 from tests import data as test_data
@@ -52,8 +57,82 @@ class TestSensorsSubroutine:
 
         assert sensors_subroutine.ecosystem.sensors_data.records
 
+        history = sensors_subroutine.ecosystem.sensors_history
+        assert history is sensors_subroutine.history
+        record = sensors_subroutine.sensors_data.records[0]
+        buffer = history.get(record.sensor_uid, record.measure)
+        assert buffer is not None
+        assert buffer.last == record.value
+
         await sensors_subroutine.refresh()
 
         await sensors_subroutine.stop()
 
         sensors_subroutine.disable()
+
+    async def test_sampling_period(self, sensors_subroutine: Sensors):
+        sensors_subroutine.config.update_hardware(
+            test_data.sensor_uid, sampling_period=3600.0)
+        hardware = sensors_subroutine.hardware[test_data.sensor_uid]
+        assert sensors_subroutine.get_sampling_period(hardware) == 3600.0
+
+        sensors_subroutine.enable()
+        await sensors_subroutine.start()
+
+        await sensors_subroutine.routine()
+        first_records = sensors_subroutine.sensors_data.records
+        assert first_records
+
+        # The sensor is not due anymore, its last reads are carried forward
+        reads_count = 0
+        get_data = hardware.get_data
+
+        async def counting_get_data():
+            nonlocal reads_count
+            reads_count += 1
+            return await get_data()
+
+        hardware.get_data = counting_get_data
+        try:
+            await sensors_subroutine.routine()
+        finally:
+            del hardware.get_data
+        assert reads_count == 0
+        assert sensors_subroutine.sensors_data.records == first_records
+
+        await sensors_subroutine.stop()
+        sensors_subroutine.disable()
+
+    async def test_slow_sensor(self, sensors_subroutine: Sensors):
+        sensors_subroutine.enable()
+        await sensors_subroutine.start()
+        # Read deadline of 0.5 s at most
+        sensors_subroutine._loop_period = 1.0
+        hardware = sensors_subroutine.hardware[test_data.sensor_uid]
+        health = sensors_subroutine._health[test_data.sensor_uid]
+        get_data = hardware.get_data
+
+        async def slow_get_data():
+            await asyncio.sleep(0.6)
+            return await get_data()
+
+        hardware.get_data = slow_get_data
+        try:
+            # A read missing its deadline counts as a single failure, even if
+            #  it succeeds afterward
+            for failures in range(1, FAILURES_BEFORE_OPEN + 1):
+                sensors_subroutine._next_reads.clear()
+                await sensors_subroutine._add_sensor_records(
+                    SensorsFrame(datetime.now(timezone.utc)))
+                await asyncio.wait(sensors_subroutine._slow_sensor_futures)
+                assert health.consecutive_failures == failures
+                # Collect the late read
+                frame = await sensors_subroutine._add_sensor_records(
+                    SensorsFrame(datetime.now(timezone.utc)))
+                assert len(frame) > 0
+            assert health.state is BreakerState.open
+        finally:
+            del hardware.get_data
+
+        await sensors_subroutine.stop()
+        sensors_subroutine.disable()
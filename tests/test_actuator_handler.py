@@ -7,9 +7,11 @@ import pytest
 
 import gaia_validators as gv
 
+import gaia.actuator_handler as actuator_handler_module
 from gaia.actuator_handler import ActuatorHandler, Timer
 from gaia.events import Events
 from gaia.hardware.abc import DimmableSwitchMixin
+from gaia.timer_wheel import TimerWheel
 
 import tests.data as test_data
 from tests.utils import yield_control
@@ -36,6 +38,55 @@ class TestTimer:
         await sleep(countdown + 0.1)
         assert x is True
 
+    async def test_timer_wheel(self):
+        timer_wheel = TimerWheel(resolution=0.01, slots=4, levels=2)
+        fired: list[str] = []
+
+        short = timer_wheel.call_later(0.05, lambda: fired.append("short"))
+        # Longer than a turn of the wheel: parked then cascaded
+        long = timer_wheel.call_later(0.25, lambda: fired.append("long"))
+        cancelled = timer_wheel.call_later(0.05, lambda: fired.append("cancelled"))
+        adjusted = timer_wheel.call_later(0.2, lambda: fired.append("adjusted"))
+        assert len(timer_wheel) == 4
+        assert math.isclose(long.time_left(), 0.25, abs_tol=0.01)
+
+        cancelled.cancel()
+        assert cancelled.cancelled
+        assert cancelled.time_left() is None
+        adjusted.adjust(-0.1)
+        assert math.isclose(adjusted.time_left(), 0.1, abs_tol=0.01)
+        with pytest.raises(RuntimeError):
+            await sleep(0.3)
+            adjusted.adjust(0.1)
+
+        assert fired == ["short", "adjusted", "long"]
+        assert short.done and not short.cancelled
+        assert len(timer_wheel) == 0
+        await timer_wheel.stop()
+        assert not timer_wheel.running
+
+    async def test_timer_wheel_stop(self):
+        timer_wheel = TimerWheel(resolution=0.01)
+        cancelled: list[bool] = []
+
+        async def long_callback():
+            try:
+                await sleep(10)
+            except BaseException:
+                cancelled.append(True)
+                raise
+
+        timer_wheel.call_later(0.01, long_callback)
+        timer_wheel.call_later(10, long_callback)
+        await sleep(0.05)
+        assert len(timer_wheel._callback_tasks) == 1
+
+        # The scheduled callbacks and the ones running are cancelled
+        await timer_wheel.stop()
+        assert cancelled == [True]
+        assert not timer_wheel._callback_tasks
+        assert len(timer_wheel) == 0
+
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize("ecosystem_config", [{"hardware": hardware_dict}], indirect=True)
@@ -90,6 +141,29 @@ class TestActuatorHandler:
         assert light_handler.level == 0
         assert (await light.get_pwm_level()) == 0.0
 
+    async def test_failing_actuator(
+            self,
+            light_handler: ActuatorHandler,
+            monkeypatch: pytest.MonkeyPatch,
+    ):
+        light: DimmableSwitchMixin = light_handler.ecosystem.hardware[test_data.light_uid]
+        monkeypatch.setattr(actuator_handler_module, "ACTUATOR_COMMAND_TIMEOUT", 0.05)
+
+        async def hanging_turn_on() -> bool:
+            await sleep(1.0)
+            return True
+
+        async def failing_set_pwm_level(level: float) -> bool:
+            raise ConnectionError("Device unreachable")
+
+        monkeypatch.setattr(light, "turn_on", hanging_turn_on)
+        monkeypatch.setattr(light, "set_pwm_level", failing_set_pwm_level)
+
+        # Failures are reported instead of blocking or raising
+        async with light_handler.update_status_transaction():
+            assert not await light_handler.set_status(True)
+            assert not await light_handler.set_level(42)
+
     async def test_handler_timer_modification(self, light_handler: ActuatorHandler):
         # Test default countdown
         assert light_handler.countdown is None
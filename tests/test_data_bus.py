@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from gaia.data_bus import DataBus, SensorsFrameMessage, Subscription
+
+
+class TestSubscription:
+    @pytest.mark.asyncio
+    async def test_drop_oldest(self):
+        received: list[int] = []
+
+        async def callback(message: int) -> None:
+            received.append(message)
+
+        subscription = Subscription("sensors_frame", "test", callback, maxsize=2)
+        # Fill the queue before the consumer task is started
+        for i in range(5):
+            subscription.put(i)
+        assert subscription.dropped == 3
+        subscription.start()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert received == [3, 4]
+        subscription.stop()
+        assert not subscription.running
+
+    def test_drop_oldest_per_ecosystem(self):
+        async def callback(message: SensorsFrameMessage) -> None:
+            pass
+
+        def get_message(ecosystem_uid: str) -> SensorsFrameMessage:
+            return SensorsFrameMessage(ecosystem_uid, None, frozenset())
+
+        subscription = Subscription("sensors_frame", "test", callback, maxsize=2)
+        for _ in range(3):
+            subscription.put(get_message("first"))
+        subscription.put(get_message("second"))
+        # The frames of an ecosystem do not evict the ones of another
+        assert subscription.dropped == 1
+        assert len(subscription) == 3
+
+        filtered = Subscription(
+            "sensors_frame", "test", callback, ecosystem_uid="first")
+        assert filtered.put(get_message("first"))
+        assert not filtered.put(get_message("second"))
+        assert len(filtered) == 1
+
+
+class TestDataBus:
+    @pytest.mark.asyncio
+    async def test_publish(self):
+        data_bus = DataBus()
+        received: dict[str, list[int]] = {"first": [], "second": []}
+
+        def get_callback(name: str):
+            async def callback(message: int) -> None:
+                received[name].append(message)
+            return callback
+
+        for name in received:
+            data_bus.subscribe("sensors_frame", name, get_callback(name))
+        with pytest.raises(ValueError):
+            data_bus.subscribe("sensors_frame", "first", get_callback("first"))
+
+        assert data_bus.publish("sensors_frame", 1) == 2
+        await asyncio.sleep(0)
+        assert received == {"first": [1], "second": [1]}
+
+        data_bus.unsubscribe("sensors_frame", "first")
+        assert not data_bus.is_subscribed("sensors_frame", "first")
+        assert data_bus.publish("sensors_frame", 2) == 1
+        await asyncio.sleep(0)
+        assert received == {"first": [1], "second": [1, 2]}
+
+        data_bus.clear()
+        assert data_bus.publish("sensors_frame", 3) == 0
+
+    @pytest.mark.asyncio
+    async def test_callback_error(self):
+        data_bus = DataBus()
+        received: list[int] = []
+
+        async def callback(message: int) -> None:
+            if message == 0:
+                raise ValueError
+            received.append(message)
+
+        data_bus.subscribe("sensors_frame", "test", callback)
+        data_bus.publish("sensors_frame", 0)
+        data_bus.publish("sensors_frame", 1)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert received == [1]
+        data_bus.clear()
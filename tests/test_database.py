@@ -1,19 +1,32 @@
 from __future__ import annotations
 
+from asyncio import sleep
 from datetime import datetime, timedelta, timezone
+import logging
+from pathlib import Path
 from typing import AsyncGenerator
 
 import pytest
 import pytest_asyncio
-from sqlalchemy import select
+from sqlalchemy import delete, select, text
+from sqlalchemy.exc import OperationalError
 
 import gaia_validators as gv
 from sqlalchemy_wrapper import AsyncSQLAlchemyWrapper
 
 from gaia import Ecosystem, EngineConfig, Engine
+from gaia.data_bus import SensorsFrameMessage
 from gaia.database import db as gaia_db
-from gaia.database.models import SensorBuffer, SensorRecord
-from gaia.database.routines import log_sensors_data
+from gaia.database.compaction import (
+    prune_records, roll_up_sensor_records, SENSORS_ROLLUP)
+from gaia.database.models import (
+    CompactionState, SensorBuffer, SensorDailyRollup, SensorHourlyRollup,
+    SensorRecord)
+from gaia.database.routines import SensorsDataLogger
+from gaia.database.sqlite import checkpoint_wal, get_sqlite_pragmas
+from gaia.database import write_behind
+from gaia.database.write_behind import WriteBehindQueue
+from gaia.sensors_frame import SensorsFrame
 
 from tests import data as test_data
 
@@ -95,12 +108,131 @@ async def test_buffer(db: AsyncSQLAlchemyWrapper):
         assert empty
 
 
+@pytest.mark.asyncio
+async def test_buffer_pages(db: AsyncSQLAlchemyWrapper):
+    timestamp = datetime.now().astimezone(timezone.utc)
+    async with db.scoped_session() as session:
+        for i in range(5):
+            session.add(SensorBuffer(**generate_sensor_data(timestamp - timedelta(minutes=i))))
+        await session.commit()
+
+        # Pages are contiguous and do not skip rows already part of an exchange
+        exchanges = []
+        last_id = 0
+        while (page := await SensorBuffer.get_buffered_page(session, last_id, per_page=2)):
+            payload, last_id = page
+            exchanges.append(payload.uuid)
+            await session.commit()
+        assert len(exchanges) == 3
+        assert await SensorBuffer.get_buffered_page(session) is None
+
+        # Failed exchanges are replayed, acknowledged ones are not
+        await SensorBuffer.mark_exchange_as_failed(session, exchanges[1])
+        for exchange_uuid in (exchanges[0], exchanges[2]):
+            await SensorBuffer.mark_exchange_as_success(session, exchange_uuid)
+        await session.commit()
+        payload, _ = await SensorBuffer.get_buffered_page(session)
+        assert len(payload.data) == 2
+        await SensorBuffer.mark_exchange_as_success(session, payload.uuid)
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_insert_many(db: AsyncSQLAlchemyWrapper):
+    timestamp = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=1)
+    records = [
+        {**generate_sensor_data(timestamp), "value": value}
+        for value in (1.0, 2.0)
+    ]
+    async with db.scoped_session() as session:
+        await SensorRecord.insert_many(session, records)
+        await session.commit()
+        # Records already logged are skipped without failing the transaction
+        await SensorRecord.insert_many(
+            session, [*records, {**records[0], "value": 3.0}])
+        await session.commit()
+
+        stmt = select(SensorRecord).where(SensorRecord.timestamp == timestamp)
+        result = await session.execute(stmt)
+        assert sorted(row.value for row in result.scalars().all()) == [1.0, 2.0, 3.0]
+
+
+
+@pytest.mark.asyncio
+async def test_compaction(db: AsyncSQLAlchemyWrapper):
+    sensor_uid = "compacted"
+    start = (datetime.now(timezone.utc) - timedelta(days=100)).replace(
+        hour=10, minute=0, second=0, microsecond=0)
+    records = [
+        {
+            **generate_sensor_data(start + timedelta(minutes=20 * i)),
+            "sensor_uid": sensor_uid,
+            "value": float(i),
+        }
+        for i in range(6)
+    ]
+
+    async def get_rollups(rollup_model) -> list[tuple]:
+        async with db.scoped_session() as session:
+            stmt = (
+                select(rollup_model)
+                .where(rollup_model.sensor_uid == sensor_uid)
+                .order_by(rollup_model.timestamp)
+            )
+            result = await session.execute(stmt)
+            return [
+                (rollup.timestamp, rollup.min, rollup.max, rollup.mean, rollup.count)
+                for rollup in result.scalars().all()
+            ]
+
+    # Records are pruned in the order they were logged, start from a table
+    #  only holding the records of this test
+    async with db.scoped_session() as session:
+        await session.execute(delete(SensorRecord))
+        await session.commit()
+        await SensorRecord.insert_many(session, records[:4])
+        await session.commit()
+    assert await roll_up_sensor_records(db, batch_size=3) >= 4
+    assert await get_rollups(SensorHourlyRollup) == [
+        (start, 0.0, 2.0, 1.0, 3),
+        (start + timedelta(hours=1), 3.0, 3.0, 3.0, 1),
+    ]
+
+    # New records of a period already rolled up are merged in its rollup
+    recent_record = {**generate_sensor_data(), "sensor_uid": "recent"}
+    async with db.scoped_session() as session:
+        await SensorRecord.insert_many(session, [*records[4:], recent_record])
+        await session.commit()
+    assert await roll_up_sensor_records(db, batch_size=3) == 3
+    assert await roll_up_sensor_records(db) == 0
+    assert await get_rollups(SensorHourlyRollup) == [
+        (start, 0.0, 2.0, 1.0, 3),
+        (start + timedelta(hours=1), 3.0, 5.0, 4.0, 3),
+    ]
+    assert await get_rollups(SensorDailyRollup) == [
+        (start.replace(hour=0), 0.0, 5.0, 2.5, 6),
+    ]
+
+    # Only the old records already rolled up are deleted
+    async with db.scoped_session() as session:
+        state = await session.get(CompactionState, SENSORS_ROLLUP)
+        last_id = state.last_id
+    before = datetime.now(timezone.utc) - timedelta(days=30)
+    assert await prune_records(db, SensorRecord, before, last_id, batch_size=4) == 6
+    async with db.scoped_session() as session:
+        result = await session.execute(select(SensorRecord))
+        assert [row.sensor_uid for row in result.scalars().all()] == ["recent"]
+
+    # The last record is kept so that its id is not reused
+    in_the_future = datetime.now(timezone.utc) + timedelta(days=30)
+    assert await prune_records(db, SensorRecord, in_the_future) == 0
+
+
 @pytest.mark.asyncio
 async def test_log_sensors_data(
         db: AsyncSQLAlchemyWrapper,
         engine_with_db: Engine,
         ecosystem: Ecosystem,
-        monkeypatch: pytest.MonkeyPatch,
 ):
     # Store the state
     db_management = ecosystem.config.get_management("database")
@@ -108,32 +240,165 @@ async def test_log_sensors_data(
     # Set everything to the desired state
     ecosystem.config.set_management("database", True)
 
-    # Patch sensors_data
-    sensors_subroutine = ecosystem.get_subroutine("sensors")
-    monkeypatch.setattr(sensors_subroutine, "_started", True)
-    sensors_data: gv.SensorsData = gv.SensorsData(**{
-        "timestamp": datetime.now(timezone.utc),
-        "records": [gv.SensorRecord(test_data.sensor_uid, "temperature", 42.0)],
-        "average": [gv.MeasureAverage("temperature", 42.0)],
-        "alarms": [],
-    })
-    monkeypatch.setattr(sensors_subroutine, "sensors_data", sensors_data)
-
-    # Test the DB routine
-    await log_sensors_data(engine_with_db)
-
-    # Make sure we logged something
-    async with db.scoped_session() as session:
-        # SensorRecord
-        stmt = select(SensorRecord)
-        result = await session.execute(stmt)
-        records = result.all()
-        assert len(records) > 0
-        # SensorBuffer
-        stmt = select(SensorBuffer)
-        result = await session.execute(stmt)
-        buffers = result.all()
-        assert len(buffers) > 0
+    sensors_data_logger = SensorsDataLogger(engine_with_db, "*")
+    timestamp = datetime.now(timezone.utc).replace(second=30, microsecond=0)
+
+    def get_message(frame_timestamp: datetime) -> SensorsFrameMessage:
+        frame = SensorsFrame(frame_timestamp)
+        frame.add(test_data.sensor_uid, "temperature", 42.0)
+        return SensorsFrameMessage(
+            ecosystem.uid, frame, frozenset({test_data.sensor_uid}))
+
+    async def count(db_model) -> int:
+        async with db.scoped_session() as session:
+            stmt = select(db_model).where(db_model.timestamp == timestamp + timedelta(minutes=1))
+            result = await session.execute(stmt)
+            return len(result.all())
+
+    # The first frame only sets the next logging slot ...
+    await sensors_data_logger(get_message(timestamp))
+    assert not sensors_data_logger.is_due(ecosystem.uid, timestamp)
+    # ... and the first frame published in the slot is logged
+    await sensors_data_logger(get_message(timestamp + timedelta(minutes=1)))
+    assert await count(SensorRecord) == 1
+    assert await count(SensorBuffer) == 1
 
     # Restore the previous state
     ecosystem.config.set_management("database", db_management)
+
+
+def test_sqlite_pragmas():
+    pragmas = get_sqlite_pragmas("balanced", {"cache_size": -4000})
+    assert pragmas["journal_mode"] == "WAL"
+    assert pragmas["cache_size"] == -4000
+    assert get_sqlite_pragmas("default") == {}
+
+    with pytest.raises(ValueError, match="Unknown database storage profile"):
+        get_sqlite_pragmas("unknown")
+    with pytest.raises(ValueError, match="Invalid PRAGMA"):
+        get_sqlite_pragmas("default", {"cache_size": "0; DROP TABLE sensor_records"})
+
+
+@pytest_asyncio.fixture(scope="function")
+async def file_db(
+        engine: Engine,
+        db: AsyncSQLAlchemyWrapper,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: Path,
+) -> AsyncGenerator[AsyncSQLAlchemyWrapper]:
+    # The PRAGMAs are only applied on file-backed databases
+    config_cls = type(engine.config.app_config)
+    monkeypatch.setattr(
+        config_cls, "SQLALCHEMY_DATABASE_URI",
+        f"sqlite+aiosqlite:///{tmp_path / 'gaia_data.db'}")
+    monkeypatch.setattr(engine.config.app_config, "USE_DATABASE", True)
+    await engine.init_database()
+
+    yield engine.db
+
+    # Restore the in-memory database used by the other tests
+    monkeypatch.undo()
+    dict_cfg = {
+        key: getattr(engine.config.app_config, key)
+        for key in dir(engine.config.app_config)
+        if key.isupper()
+    }
+    db.init(dict_cfg)
+    await db.create_all()
+    engine._db = None
+
+
+@pytest.mark.asyncio
+async def test_sqlite_pragmas_applied(file_db: AsyncSQLAlchemyWrapper):
+    async with file_db.scoped_session() as session:
+        result = await session.execute(
+            text("PRAGMA journal_mode"), bind_arguments={"mapper": SensorRecord})
+        assert result.scalar() == "wal"
+        result = await session.execute(
+            text("PRAGMA synchronous"), bind_arguments={"mapper": SensorRecord})
+        assert result.scalar() == 1  # NORMAL
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_wal(
+        file_db: AsyncSQLAlchemyWrapper,
+        caplog: pytest.LogCaptureFixture,
+):
+    async with file_db.scoped_session() as session:
+        session.add(SensorRecord(**generate_sensor_data()))
+        await session.commit()
+
+    with caplog.at_level(logging.DEBUG, logger="gaia.engine.db"):
+        await checkpoint_wal(file_db, SensorRecord)
+        await checkpoint_wal(file_db, SensorRecord, "TRUNCATE")
+    assert "Database checkpoint" in caplog.text
+    assert not [
+        record for record in caplog.records
+        if record.levelno >= logging.ERROR
+    ]
+
+
+@pytest.mark.asyncio
+async def test_write_behind_queue(db: AsyncSQLAlchemyWrapper):
+    async with db.scoped_session() as session:
+        result = await session.execute(select(SensorRecord))
+        records_before = len(result.all())
+
+    db_writer = WriteBehindQueue(db, batch_size=2, flush_interval=60.0)
+    db_writer.start()
+
+    # Rows are kept pending until the batch size is reached ...
+    db_writer.add(SensorRecord, **generate_sensor_data())
+    assert len(db_writer) == 1
+    db_writer.add(SensorRecord, **generate_sensor_data())
+    for _ in range(100):
+        if not len(db_writer):
+            break
+        await sleep(0.01)
+    assert len(db_writer) == 0
+
+    # ... or the queue is stopped
+    db_writer.add(SensorRecord, **generate_sensor_data())
+    await db_writer.stop()
+    assert len(db_writer) == 0
+    assert not db_writer.running
+
+    async with db.scoped_session() as session:
+        result = await session.execute(select(SensorRecord))
+        assert len(result.all()) == records_before + 3
+
+
+@pytest.mark.asyncio
+async def test_write_behind_queue_errors(
+        db: AsyncSQLAlchemyWrapper,
+        monkeypatch: pytest.MonkeyPatch,
+):
+    db_writer = WriteBehindQueue(db, batch_size=64, flush_interval=60.0)
+    timestamp = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=2)
+
+    # Transient errors keep the rows for the next flush
+    async def locked(rows):
+        raise OperationalError("INSERT", None, Exception("database is locked"))
+
+    db_writer.add(SensorRecord, **generate_sensor_data(timestamp))
+    with monkeypatch.context() as m:
+        m.setattr(db_writer, "_write", locked)
+        assert await db_writer.flush() == 0
+    assert len(db_writer) == 1
+
+    # Other errors only drop the invalid rows
+    db_writer.add(SensorRecord, **generate_sensor_data(timestamp))  # Duplicate
+    db_writer.add(SensorRecord, **{**generate_sensor_data(timestamp), "value": 43})
+    assert await db_writer.flush() == 2
+    assert len(db_writer) == 0
+
+    # The oldest rows are dropped on overflow
+    monkeypatch.setattr(write_behind, "MAX_PENDING_ROWS", 3)
+    for value in range(5):
+        db_writer.add(SensorRecord, **{**generate_sensor_data(timestamp), "value": value})
+    assert [values["value"] for _, values in db_writer._pending] == [2, 3, 4]
+    with monkeypatch.context() as m:
+        m.setattr(db_writer, "_write", locked)
+        db_writer.add(SensorRecord, **{**generate_sensor_data(timestamp), "value": 5})
+        await db_writer.flush()
+    assert [values["value"] for _, values in db_writer._pending] == [3, 4, 5]
@@ -1,8 +1,11 @@
-from asyncio import create_task, sleep
+from asyncio import create_task, gather, sleep
 
 import math
+import threading
+from time import monotonic
 from typing import cast, Type
 
+from anyio import to_thread
 import pytest
 from websockets.asyncio.client import connect
 from websockets.exceptions import ConnectionClosed
@@ -12,6 +15,10 @@ import gaia_validators as gv
 from gaia import Engine
 from gaia.exceptions import HardwareNotFound
 from gaia.hardware import hardware_models
+from gaia.hardware._i2c_bus import I2CBusScheduler
+from gaia.hardware.health import (
+    BreakerState, FAILURES_BEFORE_OPEN, HardwareHealth, MAX_READ_DEADLINE,
+    MIN_READ_DEADLINE)
 from gaia.hardware.multiplexers import Multiplexer, TCA9548A
 from gaia.hardware.abc import (
     _MetaHardware, Address, CameraMixin, DimmerMixin, gpioAddressMixin, GPIOAddress,
@@ -594,6 +601,86 @@ class TestWebsocketHardware:
         await hardware.terminate()
 
 
+class TestI2CBusScheduler:
+    @pytest.mark.asyncio
+    async def test_reads_share_one_thread(self):
+        scheduler = I2CBusScheduler("test")
+        try:
+            threads = await gather(*[
+                scheduler.run(lambda: threading.current_thread().name)
+                for _ in range(8)
+            ])
+            assert set(threads) == {"i2c-bus-test"}
+            assert await scheduler.run(pow, 2, 5) == 32
+        finally:
+            scheduler.stop()
+        assert not scheduler.running
+
+    @pytest.mark.asyncio
+    async def test_exception_propagation(self):
+        scheduler = I2CBusScheduler("test")
+
+        def faulty_read() -> None:
+            raise RuntimeError("Bus error")
+
+        try:
+            with pytest.raises(RuntimeError, match="Bus error"):
+                await scheduler.run(faulty_read)
+            # The worker survives the error
+            assert await scheduler.run(lambda: 42) == 42
+        finally:
+            scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_stuck_bus(self):
+        scheduler = I2CBusScheduler("test")
+        released = threading.Event()
+        read = create_task(scheduler.run(released.wait))
+        await sleep(0.01)
+        try:
+            # A device stuck in a transaction does not block the stop forever
+            start = monotonic()
+            await to_thread.run_sync(scheduler.stop, 0.1)
+            assert monotonic() - start < 1.0
+            assert not scheduler.running
+        finally:
+            released.set()
+            await read
+
+
+class TestHardwareHealth:
+    def test_read_deadline(self):
+        health = HardwareHealth(backoff_base=10.0, backoff_max=40.0)
+        assert health.read_deadline == MAX_READ_DEADLINE
+        health.record_success(0.01)
+        assert health.read_deadline == MIN_READ_DEADLINE
+        health.record_success(60.0)
+        assert health.read_deadline == MAX_READ_DEADLINE
+
+    def test_breaker(self):
+        health = HardwareHealth(backoff_base=10.0, backoff_max=40.0)
+        for _ in range(FAILURES_BEFORE_OPEN - 1):
+            health.record_failure(now=0.0)
+            assert health.state is BreakerState.closed
+        health.record_failure(now=0.0)
+        assert health.state is BreakerState.open
+        assert health.retry_at == 10.0
+        assert not health.allow(5.0)
+        # Half-open after the back-off, a new failure doubles the back-off
+        assert health.allow(10.0)
+        assert health.state is BreakerState.half_open
+        health.record_failure(now=10.0)
+        assert health.retry_at == 30.0
+        assert health.allow(30.0)
+        health.record_failure(now=30.0)
+        assert health.retry_at == 70.0  # Capped at `backoff_max`
+        # A success closes the breaker
+        assert health.allow(70.0)
+        health.record_success(0.1)
+        assert health.state is BreakerState.closed
+        assert health.consecutive_failures == 0
+
+
 @pytest.mark.asyncio
 async def test_cleanup(engine: Engine):
     assert not _MetaHardware.instances
@@ -0,0 +1,83 @@
+import asyncio
+from asyncio import sleep
+
+import pytest
+
+from gaia.outbound_queue import DropPolicy, OutboundQueue, Priority, PriorityPolicy
+
+
+@pytest.mark.asyncio
+async def test_outbound_queue_priorities():
+    sent: list[str] = []
+    release = asyncio.Event()
+
+    async def send(event: str, **kwargs) -> bool:
+        await release.wait()
+        sent.append(event)
+        return True
+
+    outbound_queue = OutboundQueue(send, max_in_flight=1)
+    # The first picture occupies the only send slot
+    tasks = [asyncio.create_task(outbound_queue.put("picture_1", Priority.bulk))]
+    await sleep(0)
+    tasks.append(asyncio.create_task(outbound_queue.put("picture_2", Priority.bulk)))
+    tasks.append(asyncio.create_task(outbound_queue.put("sensors_data", Priority.data)))
+    tasks.append(asyncio.create_task(outbound_queue.put("crud_result", Priority.control)))
+    await sleep(0)
+    release.set()
+    assert all(await asyncio.gather(*tasks))
+
+    # Control messages overtake the queued data and pictures
+    assert sent == ["picture_1", "crud_result", "sensors_data", "picture_2"]
+    metrics = outbound_queue.metrics
+    assert metrics["bulk"]["sent"] == 2
+    assert metrics["control"]["queued"] == 0
+    await outbound_queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_outbound_queue_back_pressure():
+    release = asyncio.Event()
+
+    async def send(event: str, **kwargs) -> bool:
+        await release.wait()
+        return True
+
+    outbound_queue = OutboundQueue(
+        send,
+        policies={
+            Priority.data: PriorityPolicy(2, None, DropPolicy.drop_oldest, 1),
+            Priority.bulk: PriorityPolicy(1, None, DropPolicy.drop_newest, 1),
+            Priority.state: PriorityPolicy(1, 0.01, DropPolicy.drop_oldest, 1),
+        },
+    )
+
+    # Drop the oldest message queued
+    in_flight = asyncio.create_task(outbound_queue.put("data_0", Priority.data, size=1))
+    await sleep(0)
+    oldest = asyncio.create_task(outbound_queue.put("data_1", Priority.data, size=2))
+    await sleep(0)
+    newest = asyncio.create_task(outbound_queue.put("data_2", Priority.data, size=2))
+    await sleep(0)
+    assert await oldest is False
+    assert outbound_queue.metrics["data"]["dropped"] == 1
+
+    # Drop the new message
+    bulk_in_flight = asyncio.create_task(outbound_queue.put("bulk_0", Priority.bulk, size=1))
+    await sleep(0)
+    queued = asyncio.create_task(outbound_queue.put("bulk_1", Priority.bulk, size=1))
+    await sleep(0)
+    assert await outbound_queue.put("bulk_2", Priority.bulk, size=1) is False
+    assert outbound_queue.metrics["bulk"]["dropped"] == 1
+
+    # Expire the messages waiting for too long
+    state_in_flight = asyncio.create_task(outbound_queue.put("state_0", Priority.state, size=1))
+    await sleep(0)
+    expired = asyncio.create_task(outbound_queue.put("state_1", Priority.state, size=1))
+    await sleep(0.02)
+    release.set()
+    assert await expired is False
+    assert outbound_queue.metrics["state"]["expired"] == 1
+
+    assert all(await asyncio.gather(in_flight, newest, bulk_in_flight, queued, state_in_flight))
+    await outbound_queue.stop()
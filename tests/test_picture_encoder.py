@@ -0,0 +1,123 @@
+import asyncio
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+import os
+
+import numpy as np
+import pytest
+
+from gaia_validators.image import SerializableImage
+
+from gaia import picture_encoder
+from gaia.picture_encoder import _encode_images, MAX_POOL_RESTARTS, PictureEncoder
+
+
+def get_image() -> SerializableImage:
+    array = np.arange(16 * 16 * 3, dtype=np.uint8).reshape((16, 16, 3))
+    return SerializableImage(array, metadata={"camera_uid": "camera"})
+
+
+@pytest.fixture
+def created_shms(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    names: list[str] = []
+
+    class RecordingSharedMemory(SharedMemory):
+        def __init__(self, *args, **kwargs) -> None:
+            super().__init__(*args, **kwargs)
+            if kwargs.get("create"):
+                names.append(self.name)
+
+    monkeypatch.setattr(picture_encoder, "SharedMemory", RecordingSharedMemory)
+    return names
+
+
+def assert_unlinked(names: list[str]) -> None:
+    assert names
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name=name)
+
+
+@pytest.mark.asyncio
+async def test_encode():
+    encoder = PictureEncoder()
+    image = get_image()
+    try:
+        encoded = await encoder.encode_image(image, resize_ratio=0.5)
+        assert encoded == _encode_images([image], 0.5, None, None)
+        encoded = await encoder.encode_payload("camera", [image, image])
+        assert encoded == _encode_images([image, image], 1.0, None, "camera")
+    finally:
+        await encoder.stop()
+
+
+@pytest.mark.asyncio
+async def test_broken_pool():
+    encoder = PictureEncoder()
+    image = get_image()
+    try:
+        # Kill the worker, the pool is recreated
+        with pytest.raises(BrokenProcessPool):
+            await asyncio.wrap_future(encoder._get_executor().submit(os._exit, 1))
+        assert await encoder.encode_image(image) == _encode_images([image], 1.0, None, None)
+        assert len(encoder._breaks) == 1
+        assert encoder.use_processes
+    finally:
+        await encoder.stop()
+
+
+@pytest.mark.asyncio
+async def test_thread_fallback(monkeypatch: pytest.MonkeyPatch):
+    encoder = PictureEncoder()
+    image = get_image()
+
+    async def encode_in_process(*args, **kwargs):
+        raise AssertionError("The pool should not be used")
+
+    monkeypatch.setattr(encoder, "_encode_in_process", encode_in_process)
+    encoder._breaks.extend([0.0] * (MAX_POOL_RESTARTS + 1))
+    monkeypatch.setattr(picture_encoder, "monotonic", lambda: 0.0)
+    assert not encoder.use_processes
+    assert await encoder.encode_image(image) == _encode_images([image], 1.0, None, None)
+    # Breaks older than the window are forgotten
+    monkeypatch.setattr(
+        picture_encoder, "monotonic", lambda: picture_encoder.POOL_RESTARTS_WINDOW + 1.0)
+    assert encoder.use_processes
+
+
+@pytest.mark.asyncio
+async def test_shared_memory_unlinked_on_error(
+        monkeypatch: pytest.MonkeyPatch,
+        created_shms: list[str],
+):
+    encoder = PictureEncoder()
+
+    class FailingExecutor:
+        def submit(self, *args, **kwargs):
+            raise RuntimeError("Submit failed")
+
+    monkeypatch.setattr(encoder, "_get_executor", FailingExecutor)
+    with pytest.raises(RuntimeError, match="Submit failed"):
+        await encoder.encode_image(get_image())
+    assert_unlinked(created_shms)
+
+
+@pytest.mark.asyncio
+async def test_shared_memory_unlinked_on_cancellation(
+        monkeypatch: pytest.MonkeyPatch,
+        created_shms: list[str],
+):
+    encoder = PictureEncoder()
+
+    class StuckExecutor:
+        def submit(self, *args, **kwargs):
+            return Future()
+
+    monkeypatch.setattr(encoder, "_get_executor", StuckExecutor)
+    task = asyncio.create_task(encoder.encode_image(get_image()))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert_unlinked(created_shms)
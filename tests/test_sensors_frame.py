@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+
+import gaia_validators as gv
+
+from gaia.hardware.abc import SensorRead
+from gaia.sensors_frame import AlarmTable, SensorsFrame
+
+
+def test_sensors_frame():
+    timestamp = datetime.now(timezone.utc).replace(microsecond=0)
+    frame = SensorsFrame(timestamp)
+    frame.extend([
+        SensorRead("sensor_1", "temperature", 20.0),
+        SensorRead("sensor_1", "humidity", 40.0),
+        SensorRead("sensor_1", "light", None),
+    ])
+    frame.add("sensor_2", "temperature", 23.0)
+
+    assert len(frame) == 3
+    assert frame.measures == ["temperature", "humidity"]
+    assert list(frame)[2] == ("sensor_2", "temperature", 23.0)
+    assert frame.averages == {"temperature": 21.5, "humidity": 40.0}
+
+    sensors_data = frame.to_model()
+    assert isinstance(sensors_data, gv.SensorsData)
+    assert sensors_data.timestamp == timestamp
+    assert len(sensors_data.records) == 3
+    assert len(sensors_data.average) == 2
+    # The model is cached until the frame is modified
+    assert frame.to_model() is sensors_data
+
+    round_trip = SensorsFrame.from_model(sensors_data)
+    assert list(round_trip) == list(frame)
+    assert round_trip.averages == frame.averages
+    assert round_trip.to_model() is sensors_data
+
+
+def test_alarm_table():
+    climate = {
+        "temperature": {"day": 25.0, "night": 20.0, "hysteresis": 1.0, "alarm": 0.5},
+        "humidity": {"day": 60.0, "night": 60.0, "hysteresis": 5.0, "alarm": None},
+    }
+    alarm_table = AlarmTable.compile(climate, "night")
+    # Only the parameters with an alarm are compiled
+    assert [*alarm_table.thresholds.keys()] == ["temperature"]
+    assert alarm_table.thresholds["temperature"] == (19.0, 21.0, 0.5)
+
+    frame = SensorsFrame(datetime.now(timezone.utc))
+    frame.add("sensor_1", "humidity", 10.0)
+    frame.add("sensor_1", "temperature", 20.0)
+    frame.add("sensor_2", "temperature", 18.2)
+    alarms = alarm_table.evaluate(frame)
+    assert len(alarms) == 1
+    assert alarms[0].sensor_uid == "sensor_2"
+    assert alarms[0].position == gv.Position.under
+    assert alarms[0].level == gv.WarningLevel.high
+
+    assert not AlarmTable.compile({}, "day")
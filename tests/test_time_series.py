@@ -0,0 +1,70 @@
+from statistics import mean
+
+import pytest
+
+from gaia.time_series import RingBuffer, SensorsHistory
+
+
+class TestRingBuffer:
+    def test_empty(self):
+        buffer = RingBuffer(4)
+        assert len(buffer) == 0
+        assert buffer.last is None
+        assert buffer.mean is None
+        assert buffer.min is None
+        assert buffer.max is None
+        assert buffer.values() == []
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            RingBuffer(0)
+
+    def test_rolling_statistics(self):
+        buffer = RingBuffer(4)
+        values = [3.0, 1.0, 4.0, 1.0, 5.0, 9.0, 2.0, 6.0, 5.0, 3.0]
+        for i, value in enumerate(values):
+            buffer.append(value, float(i))
+            window = values[max(0, i - 3):i + 1]
+            assert buffer.values() == window
+            assert buffer.last == value
+            assert buffer.mean == pytest.approx(mean(window))
+            assert buffer.min == min(window)
+            assert buffer.max == max(window)
+        assert buffer.timestamps() == [6.0, 7.0, 8.0, 9.0]
+
+    def test_window(self):
+        buffer = RingBuffer(100, window=5.0)
+        for i in range(20):
+            buffer.append(float(i), float(i))
+        assert buffer.values() == [14.0, 15.0, 16.0, 17.0, 18.0, 19.0]
+        assert buffer.min == 14.0
+        # Values expire when refreshing
+        buffer.refresh(now=22.0)
+        assert buffer.values() == [17.0, 18.0, 19.0]
+        assert buffer.mean == 18.0
+        buffer.refresh(now=100.0)
+        assert len(buffer) == 0
+        assert buffer.max is None
+
+
+class TestSensorsHistory:
+    def test_series(self):
+        history = SensorsHistory(window=60.0, sampling_period=10.0)
+        history.append("sensor_1", "temperature", 21.0)
+        history.append("sensor_1", "humidity", 42.0)
+        history.append("sensor_2", "temperature", 23.0)
+        assert len(history) == 3
+        assert ("sensor_1", "temperature") in history
+
+        buffer = history.get("sensor_1", "temperature")
+        assert buffer is not None
+        assert buffer.capacity == 7
+        assert buffer.last == 21.0
+        assert history.get("sensor_3", "temperature") is None
+
+        series = history.get_series("sensor_2", "temperature")
+        assert len(series) == 1
+        assert series[0][1] == 23.0
+
+        history.retain({"sensor_2"})
+        assert history.keys() == [("sensor_2", "temperature")]
@@ -0,0 +1,63 @@
+from datetime import datetime, timezone
+
+import gaia_validators as gv
+
+from gaia.sensors_frame import SensorsFrame
+from gaia.wire_format import (
+    compress_serialized_payload, COMPRESSION_THRESHOLD, decode_sensors_frames,
+    decompress_payload, encode_sensors_frames, is_compressed_payload, RECORD,
+    SensorsDataDictionary, serialize_payload)
+
+
+def test_compact_sensors_data():
+    timestamp = datetime.now(timezone.utc).replace(microsecond=0)
+    frame = SensorsFrame(timestamp)
+    frame.add("sensor_1", "temperature", 20.5)
+    frame.add("sensor_1", "humidity", 40.0)
+    frame.add("sensor_2", "temperature", 23.5)
+    frame.set_alarms([
+        gv.SensorAlarm(
+            sensor_uid="sensor_2",
+            measure="temperature",
+            position=gv.Position.above,
+            delta=1.5,
+            level=gv.WarningLevel.high,
+        ),
+    ])
+    other_frame = SensorsFrame(timestamp)
+    other_frame.add("sensor_3", "light", 1000.0)
+
+    dictionary = SensorsDataDictionary()
+    data = encode_sensors_frames(
+        [("ecosystem_1", frame), ("ecosystem_2", other_frame)], dictionary)
+    assert isinstance(data, bytes)
+    # 2 ecosystems, 3 sensors and 3 measures interned
+    assert dictionary.version == 8
+
+    decoded = decode_sensors_frames(data, dictionary.as_dict())
+    assert [uid for uid, _ in decoded] == ["ecosystem_1", "ecosystem_2"]
+    sensors_data = decoded[0][1]
+    assert sensors_data == frame.to_model()
+    assert decoded[1][1] == other_frame.to_model()
+
+    # Known strings are not added again
+    data = encode_sensors_frames([("ecosystem_1", frame)], dictionary)
+    assert dictionary.version == 8
+    # Only the values and the ids are sent for each record
+    records_size = len(frame) * RECORD.size
+    assert len(data) < records_size + 128
+
+
+def test_compressed_payload():
+    payload = [
+        {"uid": f"ecosystem_{i}", "data": {"measure": "temperature", "value": 21.5}}
+        for i in range(COMPRESSION_THRESHOLD // 16)
+    ]
+    serialized = serialize_payload(payload)
+    compressed = compress_serialized_payload(serialized)
+    assert is_compressed_payload(compressed)
+    assert len(compressed) < len(serialized) // 5
+    assert decompress_payload(compressed) == payload
+
+    # Incompressible data is not compressed
+    assert compress_serialized_payload(serialize_payload("a")) is None
@@ -52,6 +52,7 @@ class MockDispatcher(AsyncDispatcher):
                 "namespace": namespace,
             })
         )
+        return True
 
     def clear_store(self):
         self.emit_store.clear()